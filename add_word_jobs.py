@@ -0,0 +1,143 @@
+import time
+import queue
+import hashlib
+import logging
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+# Job states: waiting, being fetched, and the three outcomes.
+QUEUED, RUNNING, ADDED, EXISTS, FAILED = 'queued', 'running', 'added', 'exists', 'failed'
+ACTIVE_STATUSES = (QUEUED, RUNNING)
+
+JOB_MESSAGES = {
+    QUEUED: "Adding '{word}' in the background.",
+    RUNNING: "Fetching the definition and translations of '{word}'.",
+    ADDED: "Successfully added '{word}' to your vocabulary.",
+    EXISTS: "The word '{word}' already exists in your vocabulary.",
+    FAILED: "Could not find definition or translate the word '{word}'. Word not added.",
+}
+
+
+class AddWordJobQueue:
+    """Runs `VocabularyService.add_word()` on background threads, so requests do not wait for upstream APIs.
+
+    `submit()` records a job and returns at once; `workers` daemon threads fetch the
+    definition and translations and store the word. Job records are kept in a
+    `PersistentCache` shared by all worker processes, so any of them can report the
+    status of a job (`get()`), and resubmitting a word whose job is still queued or
+    running returns that job instead of adding the word twice. A job that has not
+    progressed for `stale_after` seconds (e.g. its process was restarted) no longer
+    blocks a resubmission.
+    """
+    def __init__(self, service, records=None, workers: int = 2, stale_after: float = 600.0):
+        """Initializes the queue. The worker threads start with the first submitted job.
+
+        Args:
+            service (VocabularyService): The service that adds the words.
+            records (Optional[PersistentCache]): Where job records are kept. None keeps them in this process only.
+            workers (int): The number of words added concurrently.
+            stale_after (float): Seconds after which a queued or running job is considered lost.
+        """
+        self.service = service
+        self.records = records
+        self.workers = max(workers, 1)
+        self.stale_after = stale_after
+        self._queue: queue.Queue = queue.Queue()
+        self._threads: List[threading.Thread] = []
+        self._local_records: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.RLock() # submit() reads and saves the record under it
+        self._stats = {'submitted': 0, 'deduplicated': 0, ADDED: 0, EXISTS: 0, FAILED: 0}
+
+    def job_id(self, word: str) -> str:
+        """Returns the job id of `word`; the same word (ignoring case and surrounding spaces) always gets the same id."""
+        return hashlib.sha256(self.service.store.normalize(word).encode('utf-8')).hexdigest()[:16]
+
+    def submit(self, word: str) -> Tuple[Dict[str, Any], bool]:
+        """Queues `word` to be added, unless a job for it is already queued or running.
+
+        Returns:
+            Tuple[Dict[str, Any], bool]: The job record, and whether a new job was queued (False if deduplicated).
+        """
+        word = word.strip()
+        job_id = self.job_id(word)
+        with self._lock:
+            record = self.get(job_id)
+            if record and record['status'] in ACTIVE_STATUSES and time.time() - record['updated_at'] < self.stale_after:
+                self._stats['deduplicated'] += 1
+                return record, False
+            now = time.time()
+            record = {'job_id': job_id, 'word': word, 'status': QUEUED, 'message': JOB_MESSAGES[QUEUED].format(word=word),
+                      'submitted_at': now, 'updated_at': now}
+            self._save(record)
+            self._stats['submitted'] += 1
+            self._queue.put((job_id, word))
+            self._start_workers()
+        logging.info(f"Queued add_word job {job_id} for '{word}'.")
+        return record, True
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Returns the record of a job submitted by any worker process, or None if it is unknown or expired."""
+        if self.records is not None:
+            try:
+                found, record = self.records.get(job_id)
+                if found:
+                    return record
+            except Exception as e:
+                logging.warning(f"Could not read add_word job {job_id}, using this process's record: {e}")
+        with self._lock:
+            record = self._local_records.get(job_id)
+            return dict(record) if record else None
+
+    def _save(self, record: Dict[str, Any]):
+        """Stores a job record in this process and, if possible, in the shared records."""
+        with self._lock:
+            self._local_records[record['job_id']] = dict(record)
+        if self.records is not None:
+            try:
+                self.records.set(record['job_id'], record)
+            except Exception as e:
+                logging.warning(f"Could not save add_word job {record['job_id']}: {e}")
+
+    def _update(self, job_id: str, word: str, status: str, submitted_at: float):
+        self._save({'job_id': job_id, 'word': word, 'status': status, 'message': JOB_MESSAGES[status].format(word=word),
+                    'submitted_at': submitted_at, 'updated_at': time.time()})
+
+    def _start_workers(self):
+        self._threads = [thread for thread in self._threads if thread.is_alive()]
+        while len(self._threads) < self.workers:
+            thread = threading.Thread(target=self._work, name=f'add-word-{len(self._threads)}', daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def _work(self):
+        while True:
+            job_id, word = self._queue.get()
+            try:
+                self._run(job_id, word)
+            finally:
+                self._queue.task_done()
+
+    def _run(self, job_id: str, word: str):
+        """Adds one word and records the outcome."""
+        record = self.get(job_id) or {}
+        submitted_at = record.get('submitted_at', time.time())
+        self._update(job_id, word, RUNNING, submitted_at)
+        try:
+            added = self.service.add_word(word, if_absent=True)
+            status = ADDED if added else (EXISTS if self.service.word_exists(word) else FAILED)
+        except Exception as e:
+            logging.error(f"add_word job {job_id} for '{word}' failed: {e}")
+            status = FAILED
+        self._update(job_id, word, status, submitted_at)
+        with self._lock:
+            self._stats[status] += 1
+        logging.info(f"add_word job {job_id} for '{word}' finished: {status}.")
+
+    def join(self):
+        """Waits until every submitted job has finished."""
+        self._queue.join()
+
+    def stats(self) -> Dict[str, int]:
+        """Returns this process's job counts by outcome, the deduplicated submissions and the jobs waiting."""
+        with self._lock:
+            return dict(self._stats, pending=self._queue.qsize())
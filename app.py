@@ -1,7 +1,15 @@
 import os
+import hashlib
 import logging
-from flask import Flask, render_template, request, redirect, url_for, flash, send_file, jsonify
-from vocabulary_service import VocabularyService
+import threading
+import click
+from flask import Flask, Response, render_template, request, redirect, url_for, flash, send_file, jsonify, session, stream_with_context
+from vocabulary_service import VocabularyService, IS_VERCEL, OFFLINE_DICTIONARY_FILE, REFRESH_COLUMNS
+from vocabulary_store import SqliteVocabularyStore
+from bulk_import import BulkImporter, read_word_list, IMPORT_WORKERS, IMPORT_BATCH_SIZE
+from audio_presynthesis import AudioPresynthesizer
+from offline_dictionary import build_index
+from quality_scan import QualityScanner
 
 # Configure logging to output to stdout/stderr for Vercel
 logging.basicConfig(
@@ -17,80 +25,289 @@ app = Flask(__name__)
 # It's good practice to set this from an environment variable in production.
 app.secret_key = os.environ.get("SESSION_SECRET", "default_vocabulary_secret_key")
 
+# Number of words rendered per page, and the largest page size a `limit` parameter may request.
+PAGE_SIZE = int(os.environ.get("PAGE_SIZE", "50"))
+MAX_PAGE_SIZE = int(os.environ.get("MAX_PAGE_SIZE", "500"))
+
+# Rows one `/refresh_rows` request may refresh.
+MAX_REFRESH_ROWS = int(os.environ.get("MAX_REFRESH_ROWS", "50"))
+
+# Seconds browsers and CDNs may cache synthesized audio files (they never change).
+AUDIO_MAX_AGE = 365 * 24 * 3600
+
 # Initialize vocabulary service, which handles all business logic related to vocabulary.
 vocab_service = VocabularyService()
 
+# Bulk imports started by uploads in this worker, by job id. They run in background threads.
+import_jobs = {}
+import_jobs_lock = threading.Lock()
+
+# The quality scan started from `/quality_scan` in this worker, if any, and its last report.
+quality_scan = {'scanner': None, 'thread': None, 'report': None}
+quality_scan_lock = threading.Lock()
+
+def get_page_args():
+    """Read the pagination parameters (`after`, `limit`, `sort`) from the request arguments."""
+    after = request.args.get('after') or None
+    limit = min(max(request.args.get('limit', PAGE_SIZE, type=int), 1), MAX_PAGE_SIZE)
+    sort = request.args.get('sort') or None
+    return after, limit, sort
+
 @app.route('/')
 def index():
     """Display the main vocabulary page.
     
-    Renders the `index.html` template, passing in the current vocabulary data.
+    Renders one page of the vocabulary with the `index.html` template. The page is
+    selected with the `after` (last word of the previous page), `limit` and `sort`
+    ('insertion' or 'alphabetical') request arguments.
     Handles potential errors during data loading and flashes an error message.
     """
+    after, limit, sort = get_page_args()
     try:
-        vocabulary_data = vocab_service.get_all_vocabulary()
-        return render_template('index.html', vocabulary_data=vocabulary_data)
+        vocabulary_data, next_cursor, total = vocab_service.get_vocabulary_page(after=after, limit=limit, sort=sort)
+        return render_template('index.html', vocabulary_data=vocabulary_data, next_cursor=next_cursor,
+                               total_count=total, sort=sort or 'insertion', page_limit=limit, after=after)
     except Exception as e:
         logging.error(f"Error loading vocabulary data: {e}")
         flash(f"Error loading vocabulary data: {str(e)}", "error")
         return render_template('index.html', vocabulary_data=[]) # Return empty list on error
 
+def wants_json() -> bool:
+    """Whether the client asked for a JSON response (the page's scripts do) rather than a redirect."""
+    return request.accept_mimetypes.best == 'application/json'
+
+def add_word_reply(message, category, status_code):
+    """Report the outcome of `/add_word`: as JSON with `status_code` to scripts, as a flash message and redirect to forms."""
+    if wants_json():
+        return jsonify({'success': category in ('success', 'info'), 'message': message, 'category': category}), status_code
+    flash(message, category)
+    return redirect(url_for('index'))
+
 @app.route('/add_word', methods=['POST'])
 def add_word():
-    """Handle the addition of a new English word to the vocabulary."""
+    """Handle the addition of a new English word to the vocabulary.
+
+    The definition and translations are fetched by a background job, so the request returns
+    at once: 202 with the job record (JSON clients) or a redirect with a flash message (forms).
+    The job's status is available as JSON from `/jobs/<job_id>`. Submitting a word whose job is
+    still running returns that job. On Vercel the word is added before responding, because
+    background threads do not outlive the response there.
+    """
     english_word = request.form.get('english_word', '').strip()
     
     if not english_word:
-        flash('Please enter an English word.', 'error')
-        return redirect(url_for('index'))
+        return add_word_reply('Please enter an English word.', 'error', 400)
     
     if not all(char.isalpha() or char.isspace() for char in english_word):
-        flash('Please enter a valid English word (letters and spaces only).', 'error')
-        return redirect(url_for('index'))
+        return add_word_reply('Please enter a valid English word (letters and spaces only).', 'error', 400)
     
     try:
         if vocab_service.word_exists(english_word):
-            flash(f"The word '{english_word}' already exists in your vocabulary.", 'warning')
-            return redirect(url_for('index'))
+            return add_word_reply(f"The word '{english_word}' already exists in your vocabulary.", 'warning', 409)
         
-        result = vocab_service.add_word(english_word)
+        # Catch likely misspellings of existing words before spending API calls on them.
+        # Submitting the same word again right after the warning adds it anyway.
+        similar_words = vocab_service.did_you_mean(english_word)
+        if similar_words and session.get('confirm_word') != english_word.casefold():
+            session['confirm_word'] = english_word.casefold()
+            suggestions = ', '.join(f"'{word}'" for word in similar_words)
+            return add_word_reply(f"Did you mean {suggestions}? '{english_word}' was not added. Submit it again to add it anyway.",
+                                  'warning', 409)
+        session.pop('confirm_word', None)
+        
+        if not IS_VERCEL:
+            job, created = vocab_service.add_word_jobs.submit(english_word)
+            if wants_json():
+                return jsonify(dict(job, success=True, created=created, status_url=url_for('job_status', job_id=job['job_id']))), 202
+            flash(f"{job['message']} Reload the page in a moment to see it.", 'info')
+            return redirect(url_for('index'))
+
+        result = vocab_service.add_word(english_word, if_absent=True)
         
         if result:
-            flash(f"Successfully added '{english_word}' to your vocabulary.", 'success')
+            return add_word_reply(f"Successfully added '{english_word}' to your vocabulary.", 'success', 200)
+        elif vocab_service.word_exists(english_word):
+            # Another request added the same word while definitions were being fetched.
+            return add_word_reply(f"The word '{english_word}' already exists in your vocabulary.", 'warning', 409)
         else:
-            flash('Could not find definition or translate the word. Word not added.', 'error')
+            return add_word_reply('Could not find definition or translate the word. Word not added.', 'error', 502)
             
     except Exception as e:
         logging.error(f"Error adding word '{english_word}': {e}")
-        flash(f"An unexpected error occurred: {str(e)}", 'error')
-    
-    return redirect(url_for('index'))
+        return add_word_reply(f"An unexpected error occurred: {str(e)}", 'error', 500)
+
+@app.route('/jobs')
+def job_stats():
+    """Return this worker's background `/add_word` job counts as JSON."""
+    return jsonify(vocab_service.add_word_jobs.stats())
+
+@app.route('/jobs/<job_id>')
+def job_status(job_id):
+    """Return the status of a background `/add_word` job as JSON.
+
+    `status` is 'queued' or 'running' while the job is in progress, then 'added', 'exists'
+    or 'failed'. Jobs of all workers are visible here until `ADD_WORD_JOB_TTL` expires.
+    """
+    job = vocab_service.add_word_jobs.get(job_id)
+    if job is None:
+        return jsonify({'success': False, 'message': 'Unknown job'}), 404
+    return jsonify(dict(job, success=True))
 
 @app.route('/search')
 def search():
     """Handle searching for words within the vocabulary.
     
     Retrieves the search query from the request arguments.
-    Uses `VocabularyService` to perform the search.
-    Flashes the number of results found.
-    Renders the `index.html` template with the filtered vocabulary data.
+    Uses `VocabularyService` to perform a ranked search over English and Vietnamese fields.
+    With `fuzzy=1`, English words within a small edit distance of the query also match.
+    Flashes the number of results found, or "did you mean" suggestions if there are none.
+    Renders one page of matches with the `index.html` template (see `index()` for the
+    paging arguments; `sort` may also be 'relevance', the default).
     """
     query = request.args.get('q', '').strip().lower()
+    fuzzy = request.args.get('fuzzy') == '1'
+    after, limit, sort = get_page_args()
     
     if not query:
         # If search query is empty, redirect to the main page (display all words)
         return redirect(url_for('index'))
     
     try:
-        vocabulary_data = vocab_service.search_vocabulary(query)
-        flash(f"Found {len(vocabulary_data)} results for '{query}'", "info")
-        return render_template('index.html', vocabulary_data=vocabulary_data, search_query=query)
+        vocabulary_data, next_cursor, total = vocab_service.get_vocabulary_page(query, after, limit, sort, fuzzy)
+        similar_words = vocab_service.did_you_mean(query) if not total else []
+        if similar_words:
+            suggestions = ', '.join(f"'{word}'" for word in similar_words)
+            flash(f"Found 0 results for '{query}'. Did you mean {suggestions}?", "info")
+        elif after is None:
+            flash(f"Found {total} results for '{query}'", "info")
+        return render_template('index.html', vocabulary_data=vocabulary_data, search_query=query, fuzzy=fuzzy,
+                               next_cursor=next_cursor, total_count=total, sort=sort or 'relevance',
+                               page_limit=limit, after=after)
     except Exception as e:
         logging.error(f"Error searching vocabulary: {e}")
         flash(f"Error searching vocabulary: {str(e)}", "error")
         # On error, redirect to index, showing all vocabulary might be better than showing none
         return redirect(url_for('index'))
 
+@app.route('/suggest')
+def suggest():
+    """Return type-ahead completions for the `prefix` query parameter as JSON.
+
+    The optional `limit` parameter (default 10, at most 50) caps the number of suggestions.
+    """
+    prefix = request.args.get('prefix', '')
+    limit = min(max(request.args.get('limit', 10, type=int), 1), 50)
+    return jsonify({'prefix': prefix, 'suggestions': vocab_service.suggest_words(prefix, limit)})
+
+@app.route('/cache_stats')
+def cache_stats():
+    """Return this worker's cache hit and miss counts as JSON."""
+    return jsonify(vocab_service.get_cache_stats())
+
+@app.route('/http_stats')
+def http_stats():
+    """Return this worker's upstream request, retry and connection reuse counts as JSON."""
+    return jsonify(vocab_service.get_http_stats())
+
+@app.route('/hedge_stats')
+def hedge_stats():
+    """Return this worker's hedged translation counts and current hedging delay as JSON."""
+    return jsonify(vocab_service.get_hedge_stats())
+
+@app.route('/provider_status')
+def provider_status():
+    """Return this worker's circuit breaker state and rate limiter counts per upstream provider as JSON."""
+    return jsonify(vocab_service.get_provider_status())
+
+@app.route('/import_words', methods=['POST'])
+def import_words():
+    """Start a bulk import of an uploaded word list in the background.
+
+    The `word_file` upload is a text file with one word per line, or a CSV file with the
+    words in its first column. The job id is derived from the words, so uploading the same
+    list again resumes an interrupted import from its checkpoint instead of starting over.
+    Progress is available as JSON from `/import_words/<job_id>`.
+    """
+    if IS_VERCEL:
+        flash('Bulk import is not available on this deployment (read-only filesystem).', 'error')
+        return redirect(url_for('index'))
+    upload = request.files.get('word_file')
+    if not upload or not upload.filename:
+        flash('Please choose a word list to import.', 'error')
+        return redirect(url_for('index'))
+    try:
+        words = read_word_list(upload.read().decode('utf-8-sig', errors='replace').splitlines())
+    except Exception as e:
+        logging.error(f"Error reading uploaded word list '{upload.filename}': {e}")
+        flash(f"Could not read the word list: {str(e)}", 'error')
+        return redirect(url_for('index'))
+    if not words:
+        flash('The uploaded file does not contain any words.', 'warning')
+        return redirect(url_for('index'))
+
+    job_id = hashlib.sha256('\n'.join(vocab_service.store.normalize(word) for word in words).encode('utf-8')).hexdigest()[:16]
+    with import_jobs_lock:
+        job = import_jobs.get(job_id)
+        if job and not job['importer'].progress()['finished']:
+            flash(f"This word list is already being imported (job {job_id}).", 'info')
+            return redirect(url_for('index'))
+        checkpoint_file = os.path.join(vocab_service.cache_dir, 'imports', f'{job_id}.json')
+        os.makedirs(os.path.dirname(checkpoint_file), exist_ok=True)
+        importer = BulkImporter(vocab_service, checkpoint_file)
+        thread = threading.Thread(target=importer.run, args=(words,), name=f'import-{job_id}', daemon=True)
+        import_jobs[job_id] = {'importer': importer, 'thread': thread}
+        thread.start()
+    flash(f"Importing {len(words)} words in the background (job {job_id}). Reload the page to see new words.", 'success')
+    return redirect(url_for('index'))
+
+@app.route('/import_words/<job_id>')
+def import_status(job_id):
+    """Return the progress of a bulk import started in this worker as JSON."""
+    with import_jobs_lock:
+        job = import_jobs.get(job_id)
+    if job is None:
+        return jsonify({'success': False, 'message': 'Unknown import job'}), 404
+    return jsonify(dict(job['importer'].progress(), job_id=job_id))
+
+@app.route('/quality_scan', methods=['GET', 'POST'])
+def quality_scan_route():
+    """Report or refresh vocabulary entries saved with fallback placeholders.
+
+    GET returns a dry-run report of the affected entries as JSON, with the progress and the
+    report of the last refresh started in this worker. POST starts a refresh of all affected
+    entries in the background (optionally only the first `limit`) and returns 202, or 409 if
+    one is already running.
+    """
+    if request.method == 'GET':
+        # Scanned without the lock, so a slow report does not hold up starting or checking a refresh
+        report = QualityScanner(vocab_service).run(dry_run=True)
+        with quality_scan_lock:
+            scanner, thread, last_run = quality_scan['scanner'], quality_scan['thread'], quality_scan['report']
+        return jsonify({'report': report, 'running': thread is not None and thread.is_alive(),
+                        'progress': scanner.progress() if scanner else None, 'last_run': last_run})
+    with quality_scan_lock:
+        running = quality_scan['thread'] is not None and quality_scan['thread'].is_alive()
+        if IS_VERCEL:
+            return jsonify({'success': False, 'message': 'Quality scans are not available on this deployment (read-only filesystem).'}), 400
+        if running:
+            return jsonify({'success': False, 'message': 'A quality scan is already running.'}), 409
+        limit = request.values.get('limit', type=int)
+        scanner = QualityScanner(vocab_service)
+
+        def run_scan():
+            try:
+                report = scanner.run(limit=limit)
+            except Exception as e:
+                logging.error(f"Quality scan failed: {e}")
+                report = {'error': str(e)}
+            with quality_scan_lock:
+                quality_scan['report'] = report
+
+        thread = threading.Thread(target=run_scan, name='quality-scan', daemon=True)
+        quality_scan.update(scanner=scanner, thread=thread)
+        thread.start()
+    return jsonify({'success': True, 'message': 'Quality scan started.'}), 202
+
 @app.route('/export')
 def export_csv():
     """Handle the export of the vocabulary list as a CSV file.
@@ -130,7 +347,10 @@ def delete_word(word):
 
 @app.route('/generate_audio', methods=['POST'])
 def generate_audio():
-    """Generate audio for a given text string using the selected TTS service (Google, ElevenLabs, or browser)."""
+    """Generate audio for a given text string using the selected TTS service (Google, ElevenLabs, or browser).
+
+    Returns the URL of the cached MP3 file (see `audio_file()`) as `audio_url`.
+    """
     try:
         data = request.get_json()
         text = data.get('text', '')
@@ -139,11 +359,11 @@ def generate_audio():
         if not text:
             return jsonify({'error': 'No text provided for audio generation'}), 400
         # Generate audio using the vocabulary service
-        audio_content = vocab_service.generate_audio(text, language, service)
-        if audio_content:
+        audio_key = vocab_service.get_audio(text, language, service)
+        if audio_key:
             return jsonify({
                 'success': True,
-                'audio': audio_content,
+                'audio_url': url_for('audio_file', key=audio_key),
                 'message': f'Audio generated successfully via {service.title()} TTS.'
             })
         else:
@@ -159,37 +379,71 @@ def generate_audio():
             'message': 'An unexpected error occurred during audio generation. Browser fallback may be used if available.'
         }), 500
 
+@app.route('/audio/<key>.mp3')
+def audio_file(key):
+    """Serve a synthesized MP3 file from the audio cache.
+
+    Files are content-addressed and never change, so they are served with a strong
+    ETag (the key) and cached by browsers and CDNs for a year. Range requests are supported.
+    """
+    path = vocab_service.audio_file_path(key)
+    if path is None:
+        return jsonify({'error': 'Audio not found'}), 404
+    response = send_file(path, mimetype='audio/mpeg', conditional=True, etag=key, max_age=AUDIO_MAX_AGE)
+    response.cache_control.immutable = True
+    response.cache_control.public = True
+    return response
+
+@app.route('/stream_audio')
+def stream_audio():
+    """Play audio for the `text`, `language` and `service` query parameters, streaming it while it is synthesized.
+
+    Cached audio redirects to its immutable `/audio/<key>.mp3` URL. ElevenLabs audio is relayed
+    as chunked `audio/mpeg` while it is generated (and cached for later requests), so browsers can
+    start playback on the first bytes. Failures return an error status, letting the page fall back
+    to browser speech synthesis.
+    """
+    text = request.args.get('text', '')
+    language = request.args.get('language', 'en')
+    service = request.args.get('service', 'google')
+    if not text or service not in ('google', 'elevenlabs'):
+        return jsonify({'error': 'A text and a service (google or elevenlabs) are required'}), 400
+    try:
+        key, chunks = vocab_service.stream_audio(text, language, service)
+    except Exception as e:
+        logging.error(f"Error in /stream_audio endpoint: {e}")
+        key, chunks = None, None
+    if key is None:
+        return jsonify({'error': f'Audio generation failed for {service.title()}'}), 502
+    if chunks is None:
+        return redirect(url_for('audio_file', key=key))
+    return Response(stream_with_context(chunks), mimetype='audio/mpeg', headers={'Cache-Control': 'no-store'})
+
 @app.route('/refresh_cell', methods=['POST'])
 def refresh_cell():
-    """Refresh a cell (definition/example/vn_definition) for a word using Google Translate API."""
+    """Refresh a cell (definition/example/vn_definition) for a word and store it, like `/refresh_content`.
+
+    Kept for existing clients; the result is returned as `new_value`. The word must be in the
+    vocabulary (404 otherwise), and vn_definition is translated from its stored English definition.
+    """
     try:
         data = request.get_json()
         word = data.get('word', '').strip()
         column = data.get('column', '').strip()  # 'definition', 'example', 'vn_definition'
-        if not word or column not in ['definition', 'example', 'vn_definition']:
+        column = {'vn_definition': 'vietnamese_definition'}.get(column, column)
+        if not word or column not in ['definition', 'example', 'vietnamese_definition']:
             return jsonify({'success': False, 'message': 'Invalid request.'}), 400
-        # Get a new definition/example from Google Translate API
-        def_data = vocab_service.get_english_definition(word)
-        if not def_data:
-            return jsonify({'success': False, 'message': 'Could not fetch new data.'}), 500
-        if column == 'definition':
-            new_value = def_data.get('definition', '')
-        elif column == 'example':
-            new_value = def_data.get('example', '')
-        elif column == 'vn_definition':
-            # Get new English definition, then translate to Vietnamese
-            en_def = def_data.get('definition', '')
-            new_value = vocab_service.translate_to_vietnamese(en_def)
-        else:
-            new_value = ''
-        return jsonify({'success': True, 'new_value': new_value})
+        result = vocab_service.refresh_words([(word, [column])])[0][column]
+        if not result['success']:
+            return jsonify(result), 404 if result['message'] == 'Word not found' else 500
+        return jsonify({'success': True, 'new_value': result['content']})
     except Exception as e:
         logging.error(f"Error in /refresh_cell endpoint: {e}")
         return jsonify({'success': False, 'message': 'An error occurred.'}), 500
 
 @app.route('/refresh_content', methods=['POST'])
 def refresh_content():
-    """Refresh content for a specific word and column."""
+    """Refresh content for a specific word and column (see `/refresh_rows` to refresh several at once)."""
     try:
         data = request.get_json()
         word = data.get('word')
@@ -200,60 +454,131 @@ def refresh_content():
         if not word or not column:
             logging.error("Missing word or column parameter in refresh request")
             return jsonify({'success': False, 'message': 'Missing word or column parameter'}), 400
+        if column not in REFRESH_COLUMNS:
+            return jsonify({'success': False, 'message': f"Unknown column '{column}'"}), 400
             
-        # Get the word's current data
-        word_data = vocab_service.get_word(word)
-        if not word_data:
-            logging.error(f"Word '{word}' not found in vocabulary")
-            return jsonify({'success': False, 'message': 'Word not found'}), 404
-            
-        logging.info(f"Current data for word '{word}': {word_data}")
-        
-        # Generate new content based on the column
-        new_content = None
-        if column == 'definition':
-            logging.info(f"Refreshing English definition for '{word}'")
-            def_data = vocab_service.get_english_definition(word)
-            if def_data and def_data.get('definition'):
-                new_content = def_data['definition']
-                word_data['English Definition'] = new_content
-                logging.info(f"New English definition: {new_content}")
-        elif column == 'example':
-            logging.info(f"Refreshing English example for '{word}'")
-            def_data = vocab_service.get_english_definition(word)
-            if def_data and def_data.get('example'):
-                new_content = def_data['example']
-                word_data['English Example'] = new_content
-                logging.info(f"New English example: {new_content}")
-        elif column == 'vietnamese_definition':
-            logging.info(f"Refreshing Vietnamese definition for '{word}'")
-            new_content = vocab_service.translate_to_vietnamese(word_data['English Definition'])
-            if new_content:
-                word_data['Vietnamese Definition'] = new_content
-                logging.info(f"New Vietnamese definition: {new_content}")
-        elif column == 'vietnamese_example':
-            logging.info(f"Refreshing Vietnamese example for '{word}'")
-            new_content = vocab_service.translate_to_vietnamese(word_data['English Example'])
-            if new_content:
-                word_data['Vietnamese Example'] = new_content
-                logging.info(f"New Vietnamese example: {new_content}")
-                
-        if not new_content:
-            logging.error(f"Failed to generate new content for word '{word}' and column '{column}'")
-            return jsonify({'success': False, 'message': 'Failed to generate new content'}), 500
-            
-        # Update the word in the vocabulary
-        if vocab_service.update_word(word, word_data):
+        result = vocab_service.refresh_words([(word, [column])])[0][column]
+        if result['success']:
             logging.info(f"Successfully updated word '{word}' with new content")
-            return jsonify({'success': True, 'content': new_content})
-        else:
-            logging.error(f"Failed to update word '{word}' in vocabulary")
-            return jsonify({'success': False, 'message': 'Failed to update word in vocabulary'}), 500
+            return jsonify({'success': True, 'content': result['content']})
+        logging.error(f"Failed to refresh word '{word}' and column '{column}': {result['message']}")
+        return jsonify(result), 404 if result['message'] == 'Word not found' else 500
             
     except Exception as e:
         logging.error(f"Error in /refresh_content endpoint: {str(e)}")
         return jsonify({'success': False, 'message': str(e)}), 500
 
+@app.route('/refresh_rows', methods=['POST'])
+def refresh_rows():
+    """Refresh several cells of several words with one lookup per word, one translation call and one write.
+
+    The JSON body is {"rows": [{"word": ..., "columns": [...]}, ...]}, with the columns 'definition',
+    'example', 'vietnamese_definition' and 'vietnamese_example' (all four if `columns` is omitted),
+    and at most `MAX_REFRESH_ROWS` rows. The response holds each row's word and the result of
+    each of its columns: {"success": true, "content": ...} or {"success": false, "message": ...}.
+    """
+    data = request.get_json(silent=True) or {}
+    rows = data.get('rows')
+    if not isinstance(rows, list) or not rows or not all(isinstance(row, dict) and row.get('word') for row in rows):
+        return jsonify({'success': False, 'message': 'Expected a non-empty list of rows with a word each.'}), 400
+    if not all(row.get('columns') is None or (isinstance(row['columns'], list) and all(isinstance(column, str) for column in row['columns']))
+               for row in rows):
+        return jsonify({'success': False, 'message': 'Expected the columns of each row as a list of column names.'}), 400
+    if len(rows) > MAX_REFRESH_ROWS:
+        return jsonify({'success': False, 'message': f"At most {MAX_REFRESH_ROWS} rows can be refreshed at once."}), 400
+    refresh_requests = [(str(row['word']).strip(), list(row.get('columns') or REFRESH_COLUMNS)) for row in rows]
+    try:
+        results = vocab_service.refresh_words(refresh_requests)
+    except Exception as e:
+        logging.error(f"Error in /refresh_rows endpoint: {e}")
+        return jsonify({'success': False, 'message': str(e)}), 500
+    return jsonify({'success': any(cell['success'] for cells in results for cell in cells.values()),
+                    'rows': [{'word': word, 'cells': cells} for (word, _), cells in zip(refresh_requests, results)]})
+
+@app.cli.command('migrate-to-sqlite')
+@click.option('--csv', 'csv_file', default='vocabulary.csv', show_default=True, help='Vocabulary CSV file to import.')
+@click.option('--db', 'db_file', default=None, help='SQLite database to create or fill (defaults to VOCAB_DB_FILE or vocabulary.db).')
+def migrate_to_sqlite(csv_file, db_file):
+    """Import an existing vocabulary CSV file into the SQLite storage backend.
+
+    Words already present in the database are skipped, so the command can be re-run safely.
+    Start the app with VOCAB_STORAGE=sqlite afterwards to use the database.
+    """
+    db_file = db_file or os.environ.get('VOCAB_DB_FILE', 'vocabulary.db')
+    if not os.path.exists(csv_file):
+        raise click.ClickException(f"CSV file not found: {csv_file}")
+    store = SqliteVocabularyStore(db_file, vocab_service.headers)
+    imported, skipped = store.import_csv(csv_file)
+    click.echo(f"Imported {imported} words from {csv_file} into {db_file} ({skipped} duplicates skipped).")
+
+@app.cli.command('import-words')
+@click.argument('word_file', type=click.Path(exists=True, dir_okay=False))
+@click.option('--checkpoint', default=None, help='Progress file (defaults to WORD_FILE.progress.json).')
+@click.option('--workers', default=IMPORT_WORKERS, show_default=True, help='Words fetched concurrently.')
+@click.option('--batch-size', default=IMPORT_BATCH_SIZE, show_default=True, help='Rows written per batch.')
+def import_words_command(word_file, checkpoint, workers, batch_size):
+    """Add every word of WORD_FILE (one word per line, or a CSV with the words in its first column).
+
+    Words already in the vocabulary are skipped. Progress is saved after every batch,
+    so re-running the command after an interruption resumes where it stopped.
+    """
+    with open(word_file, encoding='utf-8-sig', newline='') as file:
+        words = read_word_list(file)
+    importer = BulkImporter(vocab_service, checkpoint or f"{word_file}.progress.json", workers, batch_size)
+    result = importer.run(words)
+    click.echo(f"Added {result['added']} of {result['total']} words from {word_file} ({result['existing']} already present, "
+               f"{result['resumed']} done in a previous run, {result['failed']} failed).")
+
+@app.cli.command('presynthesize-audio')
+@click.option('--workers', default=4, show_default=True, help='Audio files synthesized concurrently.')
+@click.option('--service', 'services', multiple=True, help='TTS service to synthesize for (repeatable; defaults to AUDIO_PRESYNTHESIS_SERVICES).')
+def presynthesize_audio_command(workers, services):
+    """Synthesize the audio of every word, example and Vietnamese translation into the audio cache.
+
+    Audio that is already cached is skipped, so the command can be re-run safely. Upstream
+    calls obey the providers' rate limits (see the `*_RATE_LIMIT` settings).
+    """
+    presynthesizer = vocab_service.presynthesizer
+    if services:
+        presynthesizer = AudioPresynthesizer(vocab_service, services, workers)
+    result = presynthesizer.backfill(vocab_service.get_all_vocabulary(), workers)
+    click.echo(f"Synthesized {result['synthesized']} audio files ({result['cached']} already cached, {result['failed']} failed).")
+
+@app.cli.command('build-dictionary')
+@click.option('--source', default=OFFLINE_DICTIONARY_FILE or None, show_default=True,
+              help='Tab-separated dictionary file (headword, definition, example).')
+def build_dictionary_command(source):
+    """Build the offline dictionary index that definition lookups consult before any network provider.
+
+    Run it at build or deploy time, with OFFLINE_DICTIONARY_FILE pointing at the full word list
+    (the bundled dictionary.tsv is only a seed); otherwise the first lookup of each instance builds the index.
+    """
+    if not source or not os.path.exists(source):
+        raise click.ClickException(f"Dictionary file not found: {source}")
+    index_file = vocab_service.offline_dictionary.index_file if vocab_service.offline_dictionary else \
+        os.path.join(vocab_service.cache_dir, 'dictionary.idx')
+    count = build_index(source, index_file)
+    click.echo(f"Built {index_file} with {count} entries from {source}.")
+
+@app.cli.command('scan-quality')
+@click.option('--dry-run', is_flag=True, help='Only list the entries with placeholders, without upstream calls or writes.')
+@click.option('--limit', type=int, default=None, help='Refresh at most this many entries.')
+@click.option('--batch-size', default=None, type=int, help='Entries per batched translation call (defaults to QUALITY_SCAN_BATCH_SIZE).')
+def scan_quality_command(dry_run, limit, batch_size):
+    """Refresh entries saved with fallback placeholders ("Definition for ...", "[Translation failed ...]", ...).
+
+    Definitions are looked up once per word and translations are batched; all fixes are written
+    in one storage write at the end. Upstream calls obey QUALITY_SCAN_RATE and the providers' rate limits.
+    """
+    scanner = QualityScanner(vocab_service, batch_size) if batch_size else QualityScanner(vocab_service)
+    report = scanner.run(dry_run=dry_run, limit=limit)
+    for issue in report['words']:
+        click.echo(f"{issue['word']}: {', '.join(issue['fields'])}")
+    click.echo(f"{report['affected']} of {report['scanned']} entries have placeholders.")
+    if not dry_run:
+        fixed = ', '.join(f"{field}: {count}" for field, count in report['fixed'].items() if count) or 'nothing'
+        click.echo(f"Refreshed {report['updated']} entries ({fixed}); {len(report['unresolved'])} could not be fixed.")
+
 # This check ensures that app.run() is only called when main.py is executed directly,
 # and not, for example, when imported by another script or when run by a WSGI server like Gunicorn.
 if __name__ == '__main__':
@@ -0,0 +1,134 @@
+import queue
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional, Tuple
+from quality_scan import PLACEHOLDER_PATTERNS, is_placeholder
+
+# Fields synthesized ahead of the first playback, with their language.
+SPEAKABLE_FIELDS = (('English Word', 'en'), ('English Example', 'en'),
+                    ('Vietnamese Definition', 'vi'), ('Vietnamese Example', 'vi'))
+
+
+class AudioPresynthesizer:
+    """Synthesizes the audio of vocabulary entries in the background, before anyone plays it.
+
+    `enqueue_row()` queues the speakable fields of an entry (`SPEAKABLE_FIELDS`) for each
+    TTS service, and `workers` daemon threads synthesize them into the audio cache with
+    `VocabularyService.get_audio()`. Their upstream calls go through the providers' rate
+    limiters and circuit breakers like any other. Audio that is already cached is skipped.
+
+    `backfill()` does the same for existing entries, synchronously, `workers` at a time.
+    """
+    def __init__(self, service, services: Iterable[str] = ('google',), workers: int = 2, max_queue: int = 1000):
+        """Initializes the presynthesizer. The worker threads start with the first queued job.
+
+        Args:
+            service (VocabularyService): The service that synthesizes and caches audio.
+            services (Iterable[str]): The TTS services to synthesize for ('google', 'elevenlabs').
+            workers (int): The number of background threads.
+            max_queue (int): The number of queued jobs; further jobs are dropped until the queue drains.
+        """
+        self.service = service
+        self.services = [name for name in services if name]
+        self.workers = max(workers, 1)
+        self._queue: queue.Queue = queue.Queue(maxsize=max_queue)
+        self._threads: List[threading.Thread] = []
+        self._lock = threading.Lock()
+        self._stats = {'queued': 0, 'synthesized': 0, 'cached': 0, 'failed': 0, 'dropped': 0}
+
+    def _available_services(self) -> List[str]:
+        """Returns the configured services that have an API key."""
+        keys = {'google': self.service.api_key, 'elevenlabs': self.service.elevenlabs_api_key}
+        return [name for name in self.services if keys.get(name)]
+
+    def jobs_for_row(self, row: Dict[str, str]) -> List[Tuple[str, str, str]]:
+        """Returns the (text, language, service) audio jobs for one vocabulary entry."""
+        jobs = []
+        for field, language in SPEAKABLE_FIELDS:
+            text = (row.get(field) or '').strip()
+            if not text or (field in PLACEHOLDER_PATTERNS and is_placeholder(field, text)):
+                continue # Placeholders stored instead of real content are not worth synthesizing
+            jobs.extend((text, language, service) for service in self._available_services())
+        return jobs
+
+    def enqueue_row(self, row: Dict[str, str]) -> int:
+        """Queues the audio of one entry for background synthesis without waiting.
+
+        Returns:
+            int: The number of jobs queued.
+        """
+        queued = 0
+        for job in self.jobs_for_row(row):
+            try:
+                self._queue.put_nowait(job)
+                queued += 1
+            except queue.Full:
+                logging.warning(f"Audio presynthesis queue is full, dropping '{job[0][:30]}...' ({job[2]}).")
+                self._count('dropped')
+        if queued:
+            self._count('queued', queued)
+            self._start_workers()
+        return queued
+
+    def _start_workers(self):
+        with self._lock:
+            self._threads = [thread for thread in self._threads if thread.is_alive()]
+            while len(self._threads) < self.workers:
+                thread = threading.Thread(target=self._work, name=f'audio-presynthesis-{len(self._threads)}', daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def _work(self):
+        while True:
+            job = self._queue.get()
+            try:
+                self._synthesize(*job)
+            finally:
+                self._queue.task_done()
+
+    def _synthesize(self, text: str, language: str, service: str) -> Optional[str]:
+        """Synthesizes one job into the audio cache unless it is there already.
+
+        Returns:
+            Optional[str]: 'synthesized', 'cached', or None if synthesis failed.
+        """
+        try:
+            if self.service.audio_file_path(self.service.audio_cache_key(text, language, service)):
+                self._count('cached')
+                return 'cached'
+            if self.service.get_audio(text, language, service):
+                self._count('synthesized')
+                return 'synthesized'
+        except Exception as e:
+            logging.error(f"Audio presynthesis failed for '{text[:30]}...' ({service}): {e}")
+        self._count('failed')
+        return None
+
+    def _count(self, name: str, count: int = 1):
+        with self._lock:
+            self._stats[name] += count
+
+    def join(self):
+        """Waits until every queued job was processed."""
+        self._queue.join()
+
+    def backfill(self, rows: Iterable[Dict[str, str]], workers: Optional[int] = None) -> Dict[str, int]:
+        """Synthesizes the audio of existing entries, waiting until all of it is cached.
+
+        Args:
+            rows (Iterable[Dict[str, str]]): The vocabulary entries.
+            workers (Optional[int]): The number of jobs run at once. Defaults to the presynthesizer's `workers`.
+
+        Returns:
+            Dict[str, int]: The number of audio files `synthesized`, already `cached` and `failed`.
+        """
+        jobs = [job for row in rows for job in self.jobs_for_row(row)]
+        with ThreadPoolExecutor(max_workers=max(workers or self.workers, 1), thread_name_prefix='audio-backfill') as executor:
+            outcomes = list(executor.map(lambda job: self._synthesize(*job), jobs))
+        return {'synthesized': outcomes.count('synthesized'), 'cached': outcomes.count('cached'), 'failed': outcomes.count(None)}
+
+    def stats(self) -> Dict[str, int]:
+        """Returns the job counts of this process and the number of jobs waiting."""
+        with self._lock:
+            return dict(self._stats, pending=self._queue.qsize())
@@ -0,0 +1,164 @@
+import os
+import csv
+import json
+import time
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional, Set
+from vocabulary_store import VocabularyStore, write_atomic
+
+# Words fetched concurrently, and rows written per batch, by a bulk import.
+IMPORT_WORKERS = int(os.environ.get('IMPORT_WORKERS', 4))
+IMPORT_BATCH_SIZE = int(os.environ.get('IMPORT_BATCH_SIZE', 50))
+# Seconds a single word may take before it is counted as failed.
+IMPORT_WORD_DEADLINE = float(os.environ.get('IMPORT_WORD_DEADLINE', 60))
+
+# First cells recognized as a header row in an uploaded word list.
+HEADER_CELLS = {'english word', 'word', 'words'}
+
+
+def read_word_list(lines: Iterable[str]) -> List[str]:
+    """Parses a word list: a text file with one word per line, or a CSV file with the words in its first column.
+
+    Blank lines, a header row and repeated words (case-insensitive) are skipped.
+
+    Args:
+        lines (Iterable[str]): The lines of the file.
+
+    Returns:
+        List[str]: The words, stripped, in file order.
+    """
+    words, seen = [], set()
+    for number, cells in enumerate(csv.reader(lines)):
+        word = cells[0].strip() if cells else ''
+        key = VocabularyStore.normalize(word)
+        if not key or key in seen or (number == 0 and key in HEADER_CELLS):
+            continue
+        seen.add(key)
+        words.append(word)
+    return words
+
+
+def is_valid_word(word: str) -> bool:
+    """Checks that `word` only contains letters and spaces, like words added through the form."""
+    return bool(word.strip()) and all(char.isalpha() or char.isspace() for char in word)
+
+
+class BulkImporter:
+    """Adds a list of words to the vocabulary, fetching their entries concurrently.
+
+    Words already in the vocabulary are dropped with one key lookup each
+    (`VocabularyStore.exists()`), before any upstream call, so the cost of
+    deduplication follows the size of the import, not of the vocabulary. The others are fetched `workers` at a time with
+    `VocabularyService.fetch_entry()`, whose upstream calls stay within the
+    service's per-provider rate limits, and are written `batch_size` rows at a
+    time with one `insert_many()` call.
+
+    After every batch the words finished so far are saved to `checkpoint_file`.
+    Running an import with the same checkpoint file again skips them, so an
+    interrupted import resumes where it stopped. Words that failed are retried.
+    """
+    def __init__(self, service, checkpoint_file: Optional[str] = None, workers: int = IMPORT_WORKERS,
+                 batch_size: int = IMPORT_BATCH_SIZE, word_deadline: float = IMPORT_WORD_DEADLINE):
+        """Initializes the importer.
+
+        Args:
+            service (VocabularyService): The service used to fetch entries and to reach the store.
+            checkpoint_file (Optional[str]): The JSON file recording progress, or None to not record it.
+            workers (int): The number of words fetched concurrently.
+            batch_size (int): The number of words fetched before their rows are written.
+            word_deadline (float): Seconds after which fetching a single word is given up.
+        """
+        self.service = service
+        self.checkpoint_file = checkpoint_file
+        self.workers = max(workers, 1)
+        self.batch_size = max(batch_size, 1)
+        self.word_deadline = word_deadline
+        self._lock = threading.Lock()
+        self._progress = {'total': 0, 'added': 0, 'existing': 0, 'resumed': 0, 'failed': 0, 'remaining': 0, 'finished': False}
+
+    def progress(self) -> Dict[str, int]:
+        """Returns the counts of the current (or last) run; safe to call from another thread."""
+        with self._lock:
+            return dict(self._progress)
+
+    def _update(self, **changes):
+        with self._lock:
+            for name, value in changes.items():
+                self._progress[name] = value if name in ('total', 'finished') else self._progress[name] + value
+
+    def _load_checkpoint(self) -> Set[str]:
+        """Returns the keys of the words a previous run finished."""
+        if not self.checkpoint_file or not os.path.exists(self.checkpoint_file):
+            return set()
+        try:
+            with open(self.checkpoint_file, encoding='utf-8') as file:
+                return set(json.load(file).get('done', []))
+        except (OSError, ValueError) as e:
+            logging.warning(f"Ignoring unreadable import checkpoint {self.checkpoint_file}: {e}")
+            return set()
+
+    def _save_checkpoint(self, done: Set[str], failed: Set[str]):
+        if not self.checkpoint_file:
+            return
+        data = json.dumps({'done': sorted(done), 'failed': sorted(failed)}, ensure_ascii=False)
+        write_atomic(self.checkpoint_file, data.encode('utf-8'))
+
+    def _fetch(self, word: str) -> Optional[Dict[str, str]]:
+        """Fetches the row for `word`, or returns None if that failed or took too long."""
+        try:
+            return self.service.fetch_entry(word, time.monotonic() + self.word_deadline)
+        except TimeoutError:
+            logging.error(f"[import] Timed out fetching '{word}' after {self.word_deadline} seconds.")
+        except Exception as e:
+            logging.error(f"[import] Failed to fetch '{word}': {e}")
+        return None
+
+    def run(self, words: List[str]) -> Dict[str, int]:
+        """Imports `words`, skipping those already in the vocabulary or finished by a previous run.
+
+        Args:
+            words (List[str]): The words to add, e.g. from `read_word_list()`.
+
+        Returns:
+            Dict[str, int]: The number of words `added`, `existing` (already in the vocabulary),
+                            `resumed` (finished by a previous run) and `failed`, and the `total`.
+        """
+        store = self.service.store
+        done = self._load_checkpoint()
+        pending, failed, seen = [], set(), set()
+        resumed = existing_count = 0
+        for word in words:
+            word = word.strip()
+            key = store.normalize(word)
+            if not key or key in seen:
+                continue
+            seen.add(key)
+            if key in done:
+                resumed += 1
+            elif store.exists(word):
+                existing_count += 1
+            elif not is_valid_word(word):
+                logging.warning(f"[import] Skipping invalid word '{word}'.")
+                failed.add(key)
+            else:
+                pending.append(word)
+        self._update(total=len(seen), resumed=resumed, existing=existing_count, failed=len(failed), remaining=len(pending))
+        logging.info(f"[import] {len(pending)} of {len(seen)} words to fetch ({existing_count} already present, {resumed} done before).")
+
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='vocab-import') as executor:
+            for start in range(0, len(pending), self.batch_size):
+                batch = pending[start:start + self.batch_size]
+                rows = [row for row in executor.map(self._fetch, batch) if row]
+                added = store.insert_many(rows, ignore_existing=True) if rows else 0
+                fetched = {store.normalize(row['English Word']) for row in rows}
+                batch_failed = {store.normalize(word) for word in batch} - fetched
+                done |= fetched
+                failed = (failed - fetched) | batch_failed
+                self._save_checkpoint(done, failed)
+                self._update(added=added, existing=len(rows) - added, failed=len(batch_failed), remaining=-len(batch))
+                logging.info(f"[import] Wrote {added} rows; {len(pending) - start - len(batch)} words left.")
+        self._save_checkpoint(done, failed)
+        self._update(finished=True)
+        return self.progress()
@@ -0,0 +1,163 @@
+import time
+import random
+import logging
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+from typing import Dict, Optional, Tuple
+from resilience import TokenBucket, CircuitBreaker
+
+# Responses worth retrying: rate limiting and transient server errors.
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+
+class CircuitOpenError(requests.exceptions.ConnectionError):
+    """Raised instead of sending a request while the provider's circuit breaker is open."""
+
+
+class ProviderClient:
+    """HTTP client for one upstream provider (one host), with connection reuse and retries.
+
+    All requests go through a single `requests.Session`, whose connection pool keeps
+    connections to the provider alive, so only the first request per connection pays
+    for the TCP and TLS handshakes. Requests that fail with a connection error, a
+    timeout or a status in `RETRY_STATUSES` are retried up to `max_retries` times,
+    waiting a jittered exponential backoff (or the server's `Retry-After`) in between.
+    With a `rate_limiter`, every attempt (retries included) first takes a token from it.
+    With a `circuit_breaker`, the outcome of each request (after its retries) is
+    reported to it, and requests fail at once with `CircuitOpenError` while it is open.
+    Connection errors, timeouts and statuses in `RETRY_STATUSES` count as failures.
+
+    The interface mirrors `requests.get`/`requests.post`; the final response is
+    returned as is, so callers keep checking it with `raise_for_status()`.
+    """
+    def __init__(self, name: str, connect_timeout: float = 3.05, read_timeout: float = 10.0, pool_size: int = 10,
+                 max_retries: int = 2, backoff_base: float = 0.25, backoff_max: float = 4.0,
+                 rate_limiter: Optional[TokenBucket] = None, circuit_breaker: Optional[CircuitBreaker] = None):
+        """Initializes the client and its connection pool.
+
+        Args:
+            name (str): The provider name, used in logs and statistics.
+            connect_timeout (float): Seconds to wait for a connection to be established.
+            read_timeout (float): Seconds to wait for the server to send a response.
+            pool_size (int): The number of connections kept alive (one per concurrent request).
+            max_retries (int): How many times a failed request is retried.
+            backoff_base (float): The wait before the first retry, doubled for each further retry.
+            backoff_max (float): The longest wait between retries.
+            rate_limiter (Optional[TokenBucket]): Limits the request rate to the provider, or None for no limit.
+            circuit_breaker (Optional[CircuitBreaker]): Stops requests to the provider while it keeps failing.
+        """
+        self.name = name
+        self.timeout: Tuple[float, float] = (connect_timeout, read_timeout)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.rate_limiter = rate_limiter
+        self.circuit_breaker = circuit_breaker
+        self.session = requests.Session()
+        self._adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount('https://', self._adapter)
+        self.session.mount('http://', self._adapter)
+        self._lock = threading.Lock()
+        self._stats = {'requests': 0, 'retries': 0, 'failures': 0, 'short_circuited': 0}
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        """Sends a GET request (see `request()`)."""
+        return self.request('get', url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        """Sends a POST request (see `request()`)."""
+        return self.request('post', url, **kwargs)
+
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        """Sends a request, retrying transient failures.
+
+        Args:
+            method (str): 'get' or 'post'.
+            url (str): The URL to request.
+            **kwargs: Passed on to the session (e.g. `data`, `json`, `headers`).
+                      `timeout` defaults to the client's (connect, read) timeouts.
+
+        Returns:
+            requests.Response: The last response received.
+
+        Raises:
+            CircuitOpenError: If the circuit breaker is open; no request is sent.
+            requests.exceptions.RequestException: If the last attempt failed without a response.
+        """
+        if self.circuit_breaker is None:
+            return self._send(method, url, **kwargs)
+        if not self.circuit_breaker.allow():
+            with self._lock:
+                self._stats['short_circuited'] += 1
+            raise CircuitOpenError(f"[{self.name}] Circuit open, request not sent: {url.split('?')[0]}")
+        try:
+            response = self._send(method, url, **kwargs)
+        except requests.exceptions.RequestException:
+            self.circuit_breaker.record_failure()
+            raise
+        if response.status_code in RETRY_STATUSES:
+            self.circuit_breaker.record_failure()
+        else:
+            self.circuit_breaker.record_success()
+        return response
+
+    def _send(self, method: str, url: str, **kwargs) -> requests.Response:
+        """Sends a request with retries (see `request()`), without consulting the circuit breaker."""
+        kwargs.setdefault('timeout', self.timeout)
+        send = getattr(self.session, method)
+        attempt = 0
+        while True:
+            if self.rate_limiter is not None:
+                self.rate_limiter.acquire()
+            with self._lock:
+                self._stats['requests'] += 1
+            try:
+                response = send(url, **kwargs)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                if attempt >= self.max_retries:
+                    with self._lock:
+                        self._stats['failures'] += 1
+                    raise
+                logging.warning(f"[{self.name}] Request failed ({e}), retrying.")
+                delay = self._backoff(attempt)
+            else:
+                if response.status_code not in RETRY_STATUSES or attempt >= self.max_retries:
+                    return response
+                logging.warning(f"[{self.name}] Got HTTP {response.status_code}, retrying.")
+                delay = self._backoff(attempt, response.headers.get('Retry-After'))
+            attempt += 1
+            with self._lock:
+                self._stats['retries'] += 1
+            time.sleep(delay)
+
+    def _backoff(self, attempt: int, retry_after: Optional[str] = None) -> float:
+        """Returns the seconds to wait before retry number `attempt + 1` ("full jitter")."""
+        if retry_after:
+            try:
+                return min(float(retry_after), self.backoff_max)
+            except (TypeError, ValueError):
+                pass # An HTTP date; fall back to the computed backoff
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+    def stats(self) -> Dict[str, int]:
+        """Returns request, retry and connection counts for this process.
+
+        `connections` is the number of connections opened; `reused_connections` is
+        the number of requests sent over an already open connection. With a rate limiter,
+        `throttled` is the number of requests that had to wait for it. `short_circuited`
+        is the number of requests refused by the circuit breaker.
+        """
+        connections = pooled_requests = 0
+        pools = self._adapter.poolmanager.pools
+        for key in pools.keys():
+            pool = pools.get(key)
+            if pool is None:
+                continue
+            connections += pool.num_connections
+            pooled_requests += pool.num_requests
+        with self._lock:
+            stats = dict(self._stats, connections=connections, reused_connections=max(pooled_requests - connections, 0))
+        if self.rate_limiter is not None:
+            stats['throttled'] = self.rate_limiter.stats()['waited']
+        return stats
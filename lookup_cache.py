@@ -0,0 +1,170 @@
+import json
+import time
+import sqlite3
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+
+class PersistentCache:
+    """Key-value cache with expiry, stored in an SQLite file (WAL mode).
+
+    Several caches can share one file, each under its own `namespace`. Because
+    the data lives in SQLite, every worker process sees the entries the others
+    wrote. Values are stored as JSON, so None can be cached too, e.g. to remember
+    that a lookup found nothing.
+
+    Each entry has its own expiry time. When a namespace grows past `max_entries`,
+    the least recently used entries are evicted. To keep reads cheap, the
+    last-used time of an entry is only written back when it is more than
+    `touch_interval` seconds old.
+    """
+    EVICT_EVERY = 64 # Writes between checks of the size bound
+
+    def __init__(self, db_file: str, namespace: str, ttl: float, max_entries: int = 10000,
+                 touch_interval: float = 60.0):
+        """Initializes the cache and creates the table if needed.
+
+        Args:
+            db_file (str): The path to the SQLite database file.
+            namespace (str): Separates this cache's keys from other caches in the same file.
+            ttl (float): The default number of seconds an entry stays valid.
+            max_entries (int): The number of entries kept in this namespace before LRU eviction.
+            touch_interval (float): The minimum number of seconds between last-used updates of an entry.
+        """
+        self.db_file = db_file
+        self.namespace = namespace
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.touch_interval = touch_interval
+        self._local = threading.local()
+        self._writes = 0
+        connection = self._connection()
+        connection.execute("CREATE TABLE IF NOT EXISTS cache (namespace TEXT NOT NULL, key TEXT NOT NULL, value TEXT NOT NULL, "
+                           "expires_at REAL NOT NULL, last_used REAL NOT NULL, PRIMARY KEY (namespace, key))")
+        connection.execute("CREATE INDEX IF NOT EXISTS idx_cache_last_used ON cache (namespace, last_used)")
+
+    def _connection(self) -> sqlite3.Connection:
+        """Returns this thread's connection to the database (in autocommit mode)."""
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(self.db_file, timeout=30, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        return connection
+
+    def get(self, key: str) -> Tuple[bool, Any]:
+        """Looks up `key`.
+
+        Returns:
+            Tuple[bool, Any]: (True, value) if a valid entry exists, otherwise (False, None).
+        """
+        try:
+            connection = self._connection()
+            row = connection.execute("SELECT value, expires_at, last_used FROM cache WHERE namespace = ? AND key = ?",
+                                     (self.namespace, key)).fetchone()
+            if row is None:
+                return False, None
+            value, expires_at, last_used = row
+            now = time.time()
+            if expires_at <= now:
+                return False, None
+            if now - last_used > self.touch_interval:
+                connection.execute("UPDATE cache SET last_used = ? WHERE namespace = ? AND key = ?", (now, self.namespace, key))
+            return True, json.loads(value)
+        except (sqlite3.Error, ValueError) as e:
+            logging.error(f"Cache '{self.namespace}': failed to read '{key}': {e}")
+            return False, None
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None):
+        """Stores `value` (anything JSON serializable) under `key` for `ttl` seconds (default: the cache's TTL)."""
+        now = time.time()
+        expires_at = now + (self.ttl if ttl is None else ttl)
+        try:
+            connection = self._connection()
+            connection.execute("INSERT OR REPLACE INTO cache (namespace, key, value, expires_at, last_used) VALUES (?, ?, ?, ?, ?)",
+                               (self.namespace, key, json.dumps(value, ensure_ascii=False), expires_at, now))
+            self._writes += 1
+            if self._writes % self.EVICT_EVERY == 0:
+                self.evict()
+        except (sqlite3.Error, TypeError, ValueError) as e:
+            logging.error(f"Cache '{self.namespace}': failed to store '{key}': {e}")
+
+    def delete(self, key: str):
+        """Removes the entry for `key`, if any."""
+        self._connection().execute("DELETE FROM cache WHERE namespace = ? AND key = ?", (self.namespace, key))
+
+    def evict(self):
+        """Removes expired entries, then the least recently used ones beyond `max_entries`."""
+        connection = self._connection()
+        connection.execute("DELETE FROM cache WHERE namespace = ? AND expires_at <= ?", (self.namespace, time.time()))
+        connection.execute("DELETE FROM cache WHERE namespace = ? AND key IN (SELECT key FROM cache WHERE namespace = ? "
+                           "ORDER BY last_used DESC LIMIT -1 OFFSET ?)", (self.namespace, self.namespace, self.max_entries))
+
+    def clear(self):
+        """Removes all entries of this cache."""
+        self._connection().execute("DELETE FROM cache WHERE namespace = ?", (self.namespace,))
+
+    def __len__(self) -> int:
+        return self._connection().execute("SELECT COUNT(*) FROM cache WHERE namespace = ?", (self.namespace,)).fetchone()[0]
+
+
+class TieredCache:
+    """An in-process LRU cache in front of an optional `PersistentCache`.
+
+    Hits in the in-process cache cost a dictionary lookup. Misses fall through to
+    the persistent cache (shared with other workers) and are copied into the
+    in-process cache when found there. Hits and misses are counted per tier.
+    """
+    def __init__(self, persistent: Optional[PersistentCache], memory_size: int = 1024):
+        """Initializes an empty in-process cache.
+
+        Args:
+            persistent (Optional[PersistentCache]): The shared cache behind this one, or None for memory only.
+            memory_size (int): The number of entries kept in process memory.
+        """
+        self.persistent = persistent
+        self.memory_size = memory_size
+        self._memory: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {'memory_hits': 0, 'persistent_hits': 0, 'misses': 0}
+
+    def get(self, key: str) -> Tuple[bool, Any]:
+        """Looks up `key` in memory, then in the persistent cache.
+
+        Returns:
+            Tuple[bool, Any]: (True, value) on a hit, otherwise (False, None).
+        """
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                self._stats['memory_hits'] += 1
+                return True, self._memory[key]
+        found, value = self.persistent.get(key) if self.persistent is not None else (False, None)
+        with self._lock:
+            if found:
+                self._stats['persistent_hits'] += 1
+                self._remember(key, value)
+            else:
+                self._stats['misses'] += 1
+        return found, value
+
+    def set(self, key: str, value: Any):
+        """Stores `value` under `key` in both tiers."""
+        with self._lock:
+            self._remember(key, value)
+        if self.persistent is not None:
+            self.persistent.set(key, value)
+
+    def _remember(self, key: str, value: Any):
+        self._memory[key] = value
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_size:
+            self._memory.popitem(last=False)
+
+    def stats(self) -> Dict[str, int]:
+        """Returns the hit and miss counts of this process, and the number of entries in memory."""
+        with self._lock:
+            return dict(self._stats, memory_entries=len(self._memory))
@@ -0,0 +1,158 @@
+import os
+import mmap
+import struct
+import logging
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from vocabulary_store import write_atomic
+
+# Index file layout: header, then (count + 1) little-endian uint32 offsets into the blob,
+# then the blob of entries sorted by key, each "key\tdefinition\texample" in UTF-8.
+INDEX_MAGIC = b'EVDICT01'
+_HEADER = struct.Struct('<8sI')
+_OFFSET = struct.Struct('<I')
+
+
+def read_source(lines: Iterable[str]) -> List[Tuple[str, str, str]]:
+    """Parses dictionary source lines: "headword<TAB>definition<TAB>example".
+
+    Blank lines and lines starting with '#' are skipped, and so are lines without a definition.
+    If a headword appears more than once, the first entry wins.
+
+    Returns:
+        List[Tuple[str, str, str]]: (key, definition, example) sorted by key, the case-folded headword.
+    """
+    entries: Dict[str, Tuple[str, str]] = {}
+    for line in lines:
+        line = line.rstrip('\r\n')
+        if not line.strip() or line.startswith('#'):
+            continue
+        headword, definition, example = (line.split('\t') + ['', ''])[:3]
+        key = ' '.join(headword.split()).casefold()
+        if key and definition.strip() and key not in entries:
+            entries[key] = (definition.strip(), example.strip())
+    return [(key, *entries[key]) for key in sorted(entries, key=lambda key: key.encode('utf-8'))]
+
+
+def build_index(source_file: str, index_file: str) -> int:
+    """Converts a dictionary source file into the compact index read by `OfflineDictionary`.
+
+    Args:
+        source_file (str): The tab-separated source file (see `read_source()`).
+        index_file (str): The index file to write; it is replaced atomically.
+
+    Returns:
+        int: The number of entries written.
+    """
+    with open(source_file, encoding='utf-8-sig') as file:
+        entries = read_source(file)
+    blob = bytearray()
+    offsets = bytearray()
+    for entry in entries:
+        offsets += _OFFSET.pack(len(blob))
+        blob += '\t'.join(entry).encode('utf-8')
+    offsets += _OFFSET.pack(len(blob))
+    os.makedirs(os.path.dirname(os.path.abspath(index_file)), exist_ok=True)
+    write_atomic(index_file, _HEADER.pack(INDEX_MAGIC, len(entries)) + bytes(offsets) + bytes(blob))
+    logging.info(f"Built offline dictionary index {index_file} with {len(entries)} entries from {source_file}.")
+    return len(entries)
+
+
+class OfflineDictionary:
+    """Bundled English dictionary, looked up before any network provider.
+
+    The entries live in a compact index file: a sorted array of offsets into a blob
+    of "key\\tdefinition\\texample" records. The file is memory-mapped on the first
+    lookup, so it costs nothing until needed, is shared between worker processes by
+    the page cache, and a lookup is a binary search that decodes only one record.
+
+    If the index is missing or older than `source_file`, the first lookup builds it.
+    """
+    def __init__(self, index_file: str, source_file: Optional[str] = None):
+        """Initializes the dictionary without reading the index yet.
+
+        Args:
+            index_file (str): The index file, built from `source_file` if needed.
+            source_file (Optional[str]): The tab-separated source the index is built from.
+        """
+        self.index_file = index_file
+        self.source_file = source_file
+        self._map: Optional[mmap.mmap] = None
+        self._count = 0
+        self._blob_start = 0
+        self._loaded = False
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'misses': 0}
+
+    def _index_is_stale(self) -> bool:
+        if not os.path.exists(self.index_file):
+            return True
+        return bool(self.source_file) and os.path.exists(self.source_file) and \
+            os.path.getmtime(self.source_file) > os.path.getmtime(self.index_file)
+
+    def _ensure_loaded(self) -> bool:
+        """Maps the index into memory on first use, building it first if needed. Returns False if it is unavailable."""
+        if self._loaded:
+            return self._map is not None
+        with self._lock:
+            if self._loaded:
+                return self._map is not None
+            try:
+                if self._index_is_stale() and self.source_file and os.path.exists(self.source_file):
+                    build_index(self.source_file, self.index_file)
+                with open(self.index_file, 'rb') as file:
+                    index_map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+                magic, count = _HEADER.unpack_from(index_map, 0)
+                if magic != INDEX_MAGIC:
+                    raise ValueError(f"not an offline dictionary index: {self.index_file}")
+                self._map, self._count = index_map, count
+                self._blob_start = _HEADER.size + (count + 1) * _OFFSET.size
+                logging.info(f"Loaded offline dictionary index {self.index_file} ({count} entries).")
+            except (OSError, ValueError, struct.error) as e:
+                logging.warning(f"Offline dictionary unavailable, using online providers only: {e}")
+            self._loaded = True
+            return self._map is not None
+
+    def _offset(self, position: int) -> int:
+        return self._blob_start + _OFFSET.unpack_from(self._map, _HEADER.size + position * _OFFSET.size)[0]
+
+    def _record(self, position: int) -> bytes:
+        return self._map[self._offset(position):self._offset(position + 1)]
+
+    def _key_at(self, position: int) -> bytes:
+        start, end = self._offset(position), self._offset(position + 1)
+        tab = self._map.find(b'\t', start, end)
+        return self._map[start:tab if tab != -1 else end]
+
+    def lookup(self, word: str) -> Optional[Dict[str, str]]:
+        """Looks up `word` (case-insensitively).
+
+        Returns:
+            Optional[Dict[str, str]]: 'definition' and 'example' (which may be empty), or None if the word is not bundled.
+        """
+        key = ' '.join((word or '').split()).casefold().encode('utf-8')
+        if not key or not self._ensure_loaded():
+            return None
+        low, high = 0, self._count
+        while low < high:
+            middle = (low + high) // 2
+            if self._key_at(middle) < key:
+                low = middle + 1
+            else:
+                high = middle
+        found = low < self._count and self._key_at(low) == key
+        with self._lock:
+            self._stats['hits' if found else 'misses'] += 1
+        if not found:
+            return None
+        _, definition, example = (self._record(low).decode('utf-8').split('\t') + ['', ''])[:3]
+        return {'definition': definition, 'example': example}
+
+    def __len__(self) -> int:
+        return self._count if self._ensure_loaded() else 0
+
+    def stats(self) -> Dict[str, int]:
+        """Returns this process's hit and miss counts and the number of entries (0 until loaded)."""
+        with self._lock:
+            return dict(self._stats, entries=self._count, loaded=int(self._map is not None))
@@ -0,0 +1,224 @@
+import os
+import re
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+from resilience import TokenBucket
+
+# Words whose fixes are fetched together (one batched translation call), and definition lookups run at once.
+QUALITY_SCAN_BATCH_SIZE = int(os.environ.get('QUALITY_SCAN_BATCH_SIZE', 50))
+QUALITY_SCAN_WORKERS = int(os.environ.get('QUALITY_SCAN_WORKERS', 4))
+# Words per second a scan may look up, on top of the providers' own rate limits, so maintenance
+# leaves most of the upstream budget to interactive requests. 0 means unlimited.
+QUALITY_SCAN_RATE = float(os.environ.get('QUALITY_SCAN_RATE', 2))
+
+_VIETNAMESE_PLACEHOLDER = re.compile(r'(\[Translation failed|\[googletrans fallback error|\(No text provided).*', re.S)
+# Fallback values stored instead of real content, by field. Empty fields count as placeholders too.
+PLACEHOLDER_PATTERNS = {
+    'English Definition': re.compile(r'No definition available\.|Definition for .*', re.S),
+    'English Example': re.compile(r'No example sentence available\.|No example provided\.|Example (for|featuring) .*', re.S),
+    'Vietnamese Definition': _VIETNAMESE_PLACEHOLDER,
+    'Vietnamese Example': _VIETNAMESE_PLACEHOLDER,
+}
+# The English field each Vietnamese field is translated from.
+TRANSLATION_SOURCES = {'Vietnamese Definition': 'English Definition', 'Vietnamese Example': 'English Example'}
+_DEFINITION_KEYS = {'English Definition': 'definition', 'English Example': 'example'}
+
+
+def is_placeholder(field: str, value: Optional[str]) -> bool:
+    """Checks whether `value` of `field` is empty or one of the fallback placeholders."""
+    value = (value or '').strip()
+    return not value or bool(PLACEHOLDER_PATTERNS[field].fullmatch(value))
+
+
+def placeholder_fields(row: Dict[str, str]) -> List[str]:
+    """Returns the fields of a vocabulary row that hold placeholders instead of real content."""
+    return [field for field in PLACEHOLDER_PATTERNS if is_placeholder(field, row.get(field))]
+
+
+def fetch_replacements(service, items: List[Tuple[Dict[str, str], List[str]]],
+                       lookup_all: Callable[[List[str]], List[Optional[Dict[str, str]]]],
+                       deadline: Optional[float] = None) -> List[Dict[str, str]]:
+    """Fetches new values for fields of vocabulary rows, without storing them.
+
+    Each word gets one definition lookup, however many of its English fields are requested,
+    and all requested Vietnamese fields are translated with one batched call. A Vietnamese
+    field is translated from the new English text when that was replaced too, otherwise from
+    the stored one. Results that are placeholders are dropped.
+
+    Args:
+        service (VocabularyService): The service used to translate.
+        items (List[Tuple[Dict[str, str], List[str]]]): (row, fields) pairs: a stored row and the fields to replace.
+        lookup_all (Callable[[List[str]], List[Optional[Dict[str, str]]]]): Looks up the definitions of several
+                                                                            words, None for those that failed.
+        deadline (Optional[float]): A `time.monotonic()` time by which the translation must be done.
+
+    Returns:
+        List[Dict[str, str]]: Per item, the new values of the fields that could be replaced.
+    """
+    lookup_words = {}
+    for row, fields in items:
+        if any(field in _DEFINITION_KEYS for field in fields):
+            lookup_words.setdefault(service.store.normalize(row['English Word']), row['English Word'])
+    definitions = dict(zip(lookup_words, lookup_all(list(lookup_words.values())))) if lookup_words else {}
+
+    replacements: List[Dict[str, str]] = []
+    translations = [] # (item index, Vietnamese field, English text)
+    for index, (row, fields) in enumerate(items):
+        new_data: Dict[str, str] = {}
+        replacements.append(new_data)
+        definition = definitions.get(service.store.normalize(row['English Word'])) or {}
+        for field, key in _DEFINITION_KEYS.items():
+            value = (definition.get(key) or '').strip()
+            if field in fields and not is_placeholder(field, value):
+                new_data[field] = value
+        for field, source in TRANSLATION_SOURCES.items():
+            english = new_data.get(source, row.get(source, ''))
+            if field in fields and not is_placeholder(source, english):
+                translations.append((index, field, english))
+
+    if translations:
+        try:
+            vietnamese = service.translate_batch_to_vietnamese([text for _, _, text in translations], deadline)
+        except Exception as e:
+            logging.error(f"Batched translation of {len(translations)} texts failed: {e}")
+            vietnamese = [''] * len(translations)
+        for (index, field, _), value in zip(translations, vietnamese):
+            if not is_placeholder(field, value):
+                replacements[index][field] = value.strip()
+    return replacements
+
+
+class QualityScanner:
+    """Finds vocabulary entries saved with fallback placeholders and refreshes them in batches.
+
+    `scan()` lists the affected words. `run()` fixes them `batch_size` words at a
+    time: one definition lookup per word that has an English placeholder (at most
+    `rate` words per second, `workers` at once), then one batched translation call
+    for all Vietnamese fields of the batch, including those whose English source
+    was just replaced. All fixes are written with a single `update_many()` at the
+    end. Values that are still placeholders after the refresh are left alone.
+    """
+    def __init__(self, service, batch_size: int = QUALITY_SCAN_BATCH_SIZE, workers: int = QUALITY_SCAN_WORKERS,
+                 rate: float = QUALITY_SCAN_RATE):
+        """Initializes the scanner.
+
+        Args:
+            service (VocabularyService): The service used to look up, translate and store entries.
+            batch_size (int): The number of words fixed per translation call.
+            workers (int): The number of definition lookups run concurrently.
+            rate (float): Words looked up per second. 0 means unlimited.
+        """
+        self.service = service
+        self.batch_size = max(batch_size, 1)
+        self.workers = max(workers, 1)
+        self.rate_limiter = TokenBucket(rate)
+        self._lock = threading.Lock()
+        self._progress = {'affected': 0, 'processed': 0, 'finished': False}
+
+    def scan(self, rows: Optional[Iterable[Dict[str, str]]] = None) -> List[Dict[str, Any]]:
+        """Lists the entries with placeholders.
+
+        Args:
+            rows (Optional[Iterable[Dict[str, str]]]): The rows to check. Defaults to the whole vocabulary.
+
+        Returns:
+            List[Dict[str, Any]]: One {'word', 'fields'} item per affected entry, in vocabulary order.
+        """
+        rows = self.service.get_all_vocabulary() if rows is None else rows
+        issues = []
+        for row in rows:
+            fields = placeholder_fields(row)
+            if fields and row.get('English Word', '').strip():
+                issues.append({'word': row['English Word'], 'fields': fields})
+        return issues
+
+    def run(self, dry_run: bool = False, limit: Optional[int] = None) -> Dict[str, Any]:
+        """Scans the vocabulary and, unless `dry_run`, refreshes the affected entries.
+
+        Args:
+            dry_run (bool): Only report what would be refreshed, without upstream calls or writes.
+            limit (Optional[int]): Refresh at most this many entries (the first ones in vocabulary order).
+
+        Returns:
+            Dict[str, Any]: The report: `scanned` rows, `affected` entries with their placeholder
+            `fields` (`words`) and counts per field (`placeholders`). Unless `dry_run`, also the
+            number of `updated` entries, the `fixed` counts per field, and the `unresolved` words
+            for which no replacement was found.
+        """
+        rows = self.service.get_all_vocabulary()
+        issues = self.scan(rows)
+        report: Dict[str, Any] = {'dry_run': dry_run, 'scanned': len(rows), 'affected': len(issues), 'words': issues,
+                                  'placeholders': {field: sum(field in issue['fields'] for issue in issues) for field in PLACEHOLDER_PATTERNS}}
+        if limit is not None:
+            issues = issues[:max(limit, 0)]
+        with self._lock:
+            self._progress = {'affected': len(issues), 'processed': 0, 'finished': dry_run}
+        if dry_run:
+            return report
+
+        rows_by_word = {self.service.store.normalize(row['English Word']): row for row in rows}
+        updates: Dict[str, Dict[str, str]] = {}
+        for start in range(0, len(issues), self.batch_size):
+            batch = issues[start:start + self.batch_size]
+            updates.update(self._fix_batch([(issue, rows_by_word[self.service.store.normalize(issue['word'])]) for issue in batch]))
+            with self._lock:
+                self._progress['processed'] += len(batch)
+        updates = self._still_placeholders(updates)
+        updated = self.service.update_words(updates) if updates else 0
+        fixed = {field: sum(field in new_data for new_data in updates.values()) for field in PLACEHOLDER_PATTERNS}
+        report.update(updated=updated, fixed=fixed,
+                      unresolved=[issue['word'] for issue in issues if issue['word'] not in updates])
+        with self._lock:
+            self._progress['finished'] = True
+        logging.info(f"Quality scan refreshed {updated} of {len(issues)} entries with placeholders: {fixed}")
+        return report
+
+    def _fix_batch(self, batch: List[Tuple[Dict[str, Any], Dict[str, str]]]) -> Dict[str, Dict[str, str]]:
+        """Fetches replacements for one batch of (issue, row) pairs. Returns the new field values by word.
+
+        A Vietnamese field is also retranslated when its English source is replaced.
+        """
+        def lookup(word: str) -> Optional[Dict[str, str]]:
+            self.rate_limiter.acquire()
+            try:
+                return self.service.get_english_definition(word)
+            except Exception as e:
+                logging.error(f"Quality scan: definition lookup for '{word}' failed: {e}")
+                return None
+
+        def lookup_all(words: List[str]) -> List[Optional[Dict[str, str]]]:
+            with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='quality-scan') as executor:
+                return list(executor.map(lookup, words))
+
+        items = []
+        for issue, row in batch:
+            fields = list(issue['fields'])
+            fields += [field for field, source in TRANSLATION_SOURCES.items() if source in fields and field not in fields]
+            items.append((row, fields))
+        replacements = fetch_replacements(self.service, items, lookup_all)
+        return {issue['word']: new_data for (issue, _), new_data in zip(batch, replacements) if new_data}
+
+    def _still_placeholders(self, updates: Dict[str, Dict[str, str]]) -> Dict[str, Dict[str, str]]:
+        """Drops fixes for fields that were changed by someone else while the scan ran.
+
+        A translation is dropped with the new English text it was made from.
+        """
+        current_updates = {}
+        for word, new_data in updates.items():
+            row = self.service.store.get(word)
+            if not row:
+                continue
+            kept = {field: value for field, value in new_data.items() if field in _DEFINITION_KEYS and is_placeholder(field, row.get(field))}
+            for field, source in TRANSLATION_SOURCES.items():
+                if field in new_data and (source in kept if source in new_data else is_placeholder(field, row.get(field))):
+                    kept[field] = new_data[field]
+            if kept:
+                current_updates[word] = kept
+        return current_updates
+
+    def progress(self) -> Dict[str, Any]:
+        """Returns the number of affected entries of the current run, how many were processed, and whether it finished."""
+        with self._lock:
+            return dict(self._progress)
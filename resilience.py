@@ -0,0 +1,331 @@
+import os
+import time
+import hashlib
+import logging
+import threading
+from collections import deque
+from concurrent.futures import Future
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Optional, Union
+
+try:
+    import fcntl
+except ImportError: # Not available on Windows; cross-process coalescing is skipped there.
+    fcntl = None
+
+
+class TokenBucket:
+    """Thread-safe token bucket limiting the rate of calls to one upstream provider.
+
+    The bucket holds up to `burst` tokens and refills at `rate` tokens per second.
+    Each call takes one token, waiting for the next one if the bucket is empty, so
+    short bursts go through at once while the long-run rate stays at `rate`. A rate
+    of 0 (or less) disables the limit.
+    """
+    def __init__(self, rate: float, burst: Optional[float] = None):
+        """Initializes a full bucket.
+
+        Args:
+            rate (float): The sustained number of calls per second. 0 means unlimited.
+            burst (Optional[float]): The number of calls allowed back to back. Defaults to `rate` (at least 1).
+        """
+        self.rate = rate
+        self.burst = max(burst if burst is not None else rate, 1.0)
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+        self._stats = {'acquired': 0, 'waited': 0}
+
+    def _refill(self, now: float):
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self, timeout: Optional[float] = None) -> bool:
+        """Takes one token, waiting until one is available.
+
+        Args:
+            timeout (Optional[float]): The longest number of seconds to wait. None waits as long as needed.
+
+        Returns:
+            bool: True once a token was taken, False if none became available within `timeout`.
+        """
+        if self.rate <= 0:
+            return True
+        deadline = None if timeout is None else time.monotonic() + timeout
+        waited = False
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    self._stats['acquired'] += 1
+                    self._stats['waited'] += waited
+                    return True
+                delay = (1 - self._tokens) / self.rate
+            if deadline is not None and now + delay > deadline:
+                return False
+            waited = True
+            time.sleep(delay)
+
+    def stats(self) -> Dict[str, int]:
+        """Returns the number of calls let through, and how many of them had to wait."""
+        with self._lock:
+            return dict(self._stats)
+
+
+class CircuitBreaker:
+    """Stops calling an upstream provider that keeps failing, and probes it until it recovers.
+
+    The circuit starts closed and lets every call through. After `failure_threshold`
+    consecutive failures it opens: calls are refused at once, so callers move on to
+    their fallback instead of waiting out timeouts. After `recovery_timeout` seconds
+    it is half-open and lets one probe call through. A successful probe closes the
+    circuit; a failed one opens it for another `recovery_timeout` seconds.
+
+    Callers ask `allow()` before each call and report its outcome with
+    `record_success()` or `record_failure()`.
+    """
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, name: str, failure_threshold: int = 5, recovery_timeout: float = 30.0):
+        """Initializes a closed circuit.
+
+        Args:
+            name (str): The provider name, used in logs.
+            failure_threshold (int): The number of consecutive failures that opens the circuit.
+            recovery_timeout (float): Seconds the circuit stays open before a probe call is let through.
+        """
+        self.name = name
+        self.failure_threshold = max(failure_threshold, 1)
+        self.recovery_timeout = recovery_timeout
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_started: Optional[float] = None
+        self._lock = threading.Lock()
+        self._stats = {'opened': 0, 'rejected': 0}
+
+    @property
+    def state(self) -> str:
+        """The current state: 'closed', 'open' or 'half_open' (open, but due for a probe)."""
+        with self._lock:
+            return self._current_state(time.monotonic())
+
+    def _current_state(self, now: float) -> str:
+        if self._state == self.OPEN and now - self._opened_at >= self.recovery_timeout:
+            return self.HALF_OPEN
+        return self._state
+
+    def allow(self) -> bool:
+        """Checks whether a call may be made now. In the half-open state only one probe call is allowed at a time."""
+        with self._lock:
+            now = time.monotonic()
+            state = self._current_state(now)
+            if state == self.CLOSED:
+                return True
+            # A probe whose outcome was never reported does not block the circuit forever.
+            if state == self.HALF_OPEN and (self._probe_started is None or now - self._probe_started >= self.recovery_timeout):
+                if self._state == self.OPEN:
+                    logging.info(f"[{self.name}] Circuit half-open, probing the provider.")
+                self._state = self.HALF_OPEN
+                self._probe_started = now
+                return True
+            self._stats['rejected'] += 1
+            return False
+
+    def record_success(self):
+        """Reports a successful call; closes the circuit if it was probing."""
+        with self._lock:
+            self._failures = 0
+            self._probe_started = None
+            if self._state != self.CLOSED:
+                logging.info(f"[{self.name}] Circuit closed, the provider recovered.")
+                self._state = self.CLOSED
+
+    def record_failure(self):
+        """Reports a failed call; opens the circuit after too many failures in a row or a failed probe."""
+        with self._lock:
+            self._failures += 1
+            self._probe_started = None
+            if self._state == self.HALF_OPEN or (self._state == self.CLOSED and self._failures >= self.failure_threshold):
+                logging.warning(f"[{self.name}] Circuit open after {self._failures} consecutive failures; "
+                                f"skipping the provider for {self.recovery_timeout} seconds.")
+                self._state = self.OPEN
+                self._opened_at = time.monotonic()
+                self._stats['opened'] += 1
+
+    def stats(self) -> Dict[str, Union[str, int, float]]:
+        """Returns the state, the consecutive failure count, how often the circuit opened and
+        how many calls it refused, and the seconds until the next probe (0 unless open)."""
+        with self._lock:
+            now = time.monotonic()
+            state = self._current_state(now)
+            retry_in = max(self._opened_at + self.recovery_timeout - now, 0.0) if state == self.OPEN else 0.0
+            return dict(self._stats, state=state, consecutive_failures=self._failures, retry_in=round(retry_in, 1))
+
+
+class LatencyTracker:
+    """Keeps the most recent latencies of a call, to derive percentile-based timeouts.
+
+    Used to pick the delay after which a hedged request is sent: waiting for the
+    95th percentile means only the slowest 5% of calls are hedged.
+    """
+    def __init__(self, size: int = 200, default: float = 1.0, min_samples: int = 20):
+        """Initializes an empty tracker.
+
+        Args:
+            size (int): The number of recent latencies kept.
+            default (float): The value `percentile()` returns until `min_samples` latencies were recorded.
+            min_samples (int): The number of latencies needed before percentiles are computed.
+        """
+        self.default = default
+        self.min_samples = min_samples
+        self._samples = deque(maxlen=size)
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float):
+        """Adds one observed latency."""
+        with self._lock:
+            self._samples.append(seconds)
+
+    def percentile(self, percent: float) -> float:
+        """Returns the `percent` percentile (0-100) of the recent latencies, or `default` if there are too few."""
+        with self._lock:
+            if len(self._samples) < self.min_samples:
+                return self.default
+            samples = sorted(self._samples)
+        index = min(int(len(samples) * percent / 100), len(samples) - 1)
+        return samples[index]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._samples)
+
+
+class SingleFlight:
+    """Coalesces concurrent identical calls, so only one of them reaches the upstream provider.
+
+    The first caller for a key runs the call; callers arriving with the same key
+    while it is in flight wait for its outcome instead of calling again. Results
+    and exceptions are handed to everyone waiting at that moment and then
+    forgotten, so nothing (in particular no error) is cached here.
+
+    With a `lock_dir`, `shared` calls are additionally serialized across processes
+    (e.g. gunicorn workers) with a lock file per key stripe. The waiting process
+    runs the call once the lock is free, so the call should check a shared cache
+    first to benefit from the other process's result. A thread never waits for a
+    stripe it already holds (nested shared calls may hash to the same stripe), and
+    gives up waiting after `lock_timeout` seconds, running the call without the
+    lock, so stripes taken in opposite orders by two processes cannot deadlock.
+    """
+    LOCK_STRIPES = 1024 # Lock files in `lock_dir`; unrelated keys rarely share one
+    LOCK_POLL_INTERVAL = 0.05 # Seconds between attempts to take a busy lock file
+
+    def __init__(self, lock_dir: Optional[str] = None, lock_timeout: float = 30.0):
+        """Initializes an empty set of in-flight calls.
+
+        Args:
+            lock_dir (Optional[str]): Directory for the cross-process lock files, or None to coalesce within this process only.
+            lock_timeout (float): Seconds to wait for another process's identical call before running the call anyway.
+        """
+        self.lock_dir = lock_dir
+        self.lock_timeout = lock_timeout
+        self._flights: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self._held = threading.local() # Stripes this thread holds
+        self._stats = {'calls': 0, 'coalesced': 0, 'lock_timeouts': 0}
+
+    def do(self, key: str, call: Callable[[], Any], shared: bool = False) -> Any:
+        """Runs `call`, unless an identical call (same `key`) is in flight; then returns that call's outcome.
+
+        Args:
+            key (str): Identifies identical calls, e.g. the normalized call arguments.
+            call (Callable[[], Any]): The function to run.
+            shared (bool): Also coalesce with other processes using the same `lock_dir`.
+
+        Returns:
+            Any: The result of `call` (or of the identical call in flight).
+
+        Raises:
+            Exception: Whatever `call` (or the identical call in flight) raised.
+        """
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = Future()
+                self._stats['calls'] += 1
+            else:
+                self._stats['coalesced'] += 1
+        if not leader:
+            return flight.result()
+        try:
+            with self._process_lock(key, shared):
+                result = call()
+        except BaseException as e:
+            flight.set_exception(e)
+            raise
+        else:
+            flight.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self._flights[key]
+
+    @contextmanager
+    def _process_lock(self, key: str, shared: bool):
+        """Holds the lock file stripe of `key` for the duration of the block, if cross-process coalescing applies."""
+        if not shared or self.lock_dir is None or fcntl is None:
+            yield
+            return
+        stripe = int(hashlib.sha256(key.encode('utf-8')).hexdigest(), 16) % self.LOCK_STRIPES
+        held = getattr(self._held, 'stripes', None)
+        if held is None:
+            held = self._held.stripes = set()
+        if stripe in held: # flock on a second descriptor would wait for this very thread
+            yield
+            return
+        try:
+            os.makedirs(self.lock_dir, exist_ok=True)
+            lock_fd = os.open(os.path.join(self.lock_dir, f"{stripe:04d}.lock"), os.O_RDWR | os.O_CREAT, 0o644)
+        except OSError as e:
+            logging.debug(f"Could not open a single-flight lock file in {self.lock_dir}, continuing without it: {e}")
+            yield
+            return
+        try:
+            locked = self._acquire_file_lock(lock_fd)
+            if not locked:
+                logging.warning(f"Single-flight lock stripe {stripe} still busy after {self.lock_timeout} seconds; "
+                                f"running the call without it.")
+                with self._lock:
+                    self._stats['lock_timeouts'] += 1
+            held.add(stripe)
+            try:
+                yield
+            finally:
+                held.discard(stripe)
+                if locked:
+                    fcntl.flock(lock_fd, fcntl.LOCK_UN)
+        finally:
+            os.close(lock_fd)
+
+    def _acquire_file_lock(self, lock_fd: int) -> bool:
+        """Takes an exclusive lock on `lock_fd`, polling until `lock_timeout`. Returns False if it stayed busy."""
+        deadline = time.monotonic() + self.lock_timeout
+        while True:
+            try:
+                fcntl.flock(lock_fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                return True
+            except BlockingIOError:
+                if time.monotonic() >= deadline:
+                    return False
+                time.sleep(self.LOCK_POLL_INTERVAL)
+
+    def stats(self) -> Dict[str, int]:
+        """Returns the number of calls run, of identical calls that waited for them instead, and of lock files
+        given up on after `lock_timeout`, and the calls in flight."""
+        with self._lock:
+            return dict(self._stats, in_flight=len(self._flights))
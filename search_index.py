@@ -0,0 +1,567 @@
+import re
+import math
+import heapq
+import bisect
+import threading
+import unicodedata
+from collections import Counter
+from typing import List, Dict, Optional, Set, Tuple
+
+_COMBINING_MARKS = re.compile('[\u0300-\u036f]')
+_TOKEN = re.compile(r'\w+')
+# Separates the fields of a page cursor (see `FullTextIndex.page()`).
+CURSOR_SEPARATOR = '\x1f'
+
+
+def fold_text(text: Optional[str]) -> str:
+    """Case-folds `text` and strips diacritics, so "Tiếng Việt" becomes "tieng viet"."""
+    text = unicodedata.normalize('NFD', (text or '').casefold())
+    return _COMBINING_MARKS.sub('', text).replace('đ', 'd')
+
+
+def tokenize(text: str) -> List[str]:
+    """Splits already normalized text into word tokens."""
+    return _TOKEN.findall(text)
+
+
+class TrigramIndex:
+    """Substring search index over selected vocabulary fields.
+
+    Each indexed field is lowercased once when a row is added. A posting list maps
+    every character trigram to the words whose fields contain it, so a substring
+    query only has to verify the words present in all of its trigrams' posting
+    lists instead of scanning the whole vocabulary.
+
+    The index is kept up to date as a storage listener (see `VocabularyStore`):
+    `reset()` rebuilds it, `put()` updates a single word in place. Rebuilding is
+    deferred until the index is next used, so reloads triggered by other workers
+    do not slow down requests that never search.
+    """
+    def __init__(self, fields: List[str]):
+        """Initializes an empty index.
+
+        Args:
+            fields (List[str]): The row fields to index, e.g. ['English Word', 'English Definition'].
+        """
+        self.fields = fields
+        self._rows: Dict[str, Dict[str, str]] = {}
+        self._texts: Dict[str, List[str]] = {}
+        self._order: Dict[str, int] = {}
+        self._postings: Dict[str, Set[str]] = {}
+        self._next_order = 0
+        self._pending_rows: Optional[List[Dict[str, str]]] = None
+        self._lock = threading.RLock()
+
+    @staticmethod
+    def _trigrams(text: str) -> Set[str]:
+        return {text[i:i + 3] for i in range(len(text) - 2)}
+
+    def reset(self, rows: List[Dict[str, str]]):
+        """Schedules a rebuild from `rows` (in insertion order). Only the first row per word is kept."""
+        with self._lock:
+            self._pending_rows = [dict(row) for row in rows]
+
+    def _ensure_built(self):
+        """Builds the index from the rows passed to the last `reset()`, if not done yet."""
+        if self._pending_rows is None:
+            return
+        rows, self._pending_rows = self._pending_rows, None
+        self._rows, self._texts, self._order, self._postings = {}, {}, {}, {}
+        self._next_order = 0
+        for row in rows:
+            key = (row.get(self.fields[0]) or '').strip().casefold()
+            if key not in self._rows:
+                self._add(key, row)
+
+    def put(self, key: str, row: Optional[Dict[str, str]]):
+        """Replaces the indexed row for `key`, or removes it if `row` is None."""
+        with self._lock:
+            self._ensure_built()
+            order = self._order.get(key)
+            if key in self._rows:
+                self._remove(key)
+            if row is not None:
+                self._add(key, row, order)
+
+    @staticmethod
+    def normalize_text(text: Optional[str]) -> str:
+        """Normalizes field values and queries before matching (lowercase by default)."""
+        return (text or '').lower()
+
+    def _add(self, key: str, row: Dict[str, str], order: Optional[int] = None):
+        texts = [self.normalize_text(row.get(field)) for field in self.fields]
+        self._rows[key] = dict(row)
+        self._texts[key] = texts
+        if order is None:
+            order = self._next_order
+            self._next_order += 1
+        self._order[key] = order
+        postings = self._postings
+        for trigram in set().union(*map(self._trigrams, texts)):
+            posting = postings.get(trigram)
+            if posting is None:
+                postings[trigram] = {key}
+            else:
+                posting.add(key)
+
+    def _remove(self, key: str):
+        for trigram in set().union(*map(self._trigrams, self._texts.pop(key))):
+            posting = self._postings.get(trigram)
+            if posting is not None:
+                posting.discard(key)
+                if not posting:
+                    del self._postings[trigram]
+        del self._rows[key]
+        del self._order[key]
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._ensure_built()
+            return len(self._rows)
+
+    def search(self, query: str) -> List[Dict[str, str]]:
+        """Returns copies of the rows with `query` (case-insensitive) in any indexed field.
+
+        Results are in insertion order. Queries shorter than three characters have
+        no trigrams and are checked against the precomputed lowercase fields directly.
+        """
+        with self._lock:
+            self._ensure_built()
+            matches = self._substring_matches(self.normalize_text(query).strip())
+            matches.sort(key=self._order.__getitem__)
+            return [dict(self._rows[key]) for key in matches]
+
+    def _substring_matches(self, query: str) -> List[str]:
+        """Returns the keys (unordered) of rows with the normalized `query` in an indexed field."""
+        if len(query) < 3:
+            candidates = self._texts.keys()
+        else:
+            postings = []
+            for trigram in self._trigrams(query):
+                posting = self._postings.get(trigram)
+                if not posting:
+                    return []
+                postings.append(posting)
+            postings.sort(key=len)
+            candidates = set(postings[0]).intersection(*postings[1:])
+        return [key for key in candidates if any(query in text for text in self._texts[key])]
+
+
+class FullTextIndex(TrigramIndex):
+    """Ranked full-text search over all vocabulary fields, English and Vietnamese.
+
+    Text is case- and diacritic-folded (see `fold_text`), so "tieng" finds "tiếng".
+    A row matches if the query occurs as a substring of one of its fields, or if
+    every query token occurs among its tokens. Matches are ranked by BM25 over
+    the row's tokens, plus a boost when the query is (or starts) the headword.
+    Only the top `limit` results are selected, using a heap.
+
+    Results (and `page()` listings) can be paged with keyset cursors: each page
+    returns the cursor of the next, which holds the sort key of its last row, and only
+    rows ordered after that key are selected.
+    """
+    SORT_ORDERS = ('relevance', 'alphabetical', 'insertion')
+
+    K1 = 1.2
+    B = 0.75
+    EXACT_HEADWORD_BOOST = 10.0
+    HEADWORD_PREFIX_BOOST = 2.0
+    NEAR_HEADWORD_BOOST = 2.0
+
+    def __init__(self, fields: List[str]):
+        """Initializes an empty index.
+
+        Args:
+            fields (List[str]): The row fields to index. The first one is the headword.
+        """
+        super().__init__(fields)
+        self._term_freqs: Dict[str, Counter] = {}
+        self._term_postings: Dict[str, Set[str]] = {}
+        self._total_length = 0
+        # The sort keys of all rows, in ascending order, per `page()` sort order. None while rebuilding.
+        self._sorted: Optional[Dict[str, List[tuple]]] = {'insertion': [], 'alphabetical': []}
+
+    normalize_text = staticmethod(fold_text)
+
+    def _ensure_built(self):
+        if self._pending_rows is None:
+            return
+        self._term_freqs, self._term_postings, self._total_length = {}, {}, 0
+        self._sorted = None
+        super()._ensure_built()
+        self._sorted = {sort: sorted(self._sort_key(sort, key) for key in self._rows)
+                        for sort in ('insertion', 'alphabetical')}
+
+    def _add(self, key: str, row: Dict[str, str], order: Optional[int] = None):
+        super()._add(key, row, order)
+        if self._sorted is not None:
+            for sort, entries in self._sorted.items():
+                bisect.insort(entries, self._sort_key(sort, key))
+        term_freqs = Counter()
+        for text in self._texts[key]:
+            term_freqs.update(tokenize(text))
+        self._term_freqs[key] = term_freqs
+        self._total_length += sum(term_freqs.values())
+        for term in term_freqs:
+            self._term_postings.setdefault(term, set()).add(key)
+
+    def _remove(self, key: str):
+        for sort, entries in self._sorted.items():
+            del entries[bisect.bisect_left(entries, self._sort_key(sort, key))]
+        term_freqs = self._term_freqs.pop(key)
+        self._total_length -= sum(term_freqs.values())
+        for term in term_freqs:
+            posting = self._term_postings[term]
+            posting.discard(key)
+            if not posting:
+                del self._term_postings[term]
+        super()._remove(key)
+
+    def _sort_key(self, sort: str, key: str, word: Optional[str] = None):
+        """Returns the ascending sort key of `key` for the 'alphabetical' or 'insertion' order.
+
+        Sort keys end with the row key, which breaks ties. Returns None if the key cannot be
+        determined, i.e. for the insertion order of a row that is no longer indexed. `word`
+        is the row's headword if it is not indexed.
+        """
+        if sort == 'alphabetical':
+            headword = self._texts[key][0] if key in self._texts else fold_text(word)
+            return (headword.strip(), key)
+        return (self._order[key], key) if key in self._order else None
+
+    @staticmethod
+    def _encode_cursor(sort_key: tuple) -> str:
+        """Returns the cursor for a page ending with the row of `sort_key`: its fields joined by CURSOR_SEPARATOR."""
+        return CURSOR_SEPARATOR.join(map(str, sort_key))
+
+    def _cursor_value(self, sort: str, after: Optional[str], relevance=None):
+        """Decodes a cursor into the sort key to continue after, or None to start from the beginning.
+
+        Cursors hold the sort key itself, so the row they were taken from may have been
+        deleted or renamed since. A plain word (as in links from older versions) is looked up
+        instead, and only works for the insertion and relevance orders while the word exists.
+        """
+        if after is None:
+            return None
+        if CURSOR_SEPARATOR in after:
+            *value, key = after.split(CURSOR_SEPARATOR)
+            try:
+                if sort == 'alphabetical':
+                    return (CURSOR_SEPARATOR.join(value), key)
+                if sort == 'insertion' and len(value) == 1:
+                    return (int(value[0]), key)
+                if sort == 'relevance' and len(value) == 2:
+                    return (float(value[0]), int(value[1]), key)
+            except ValueError:
+                pass
+            return None
+        key = after.strip().casefold()
+        if sort != 'relevance':
+            return self._sort_key(sort, key, after)
+        return relevance(key) if relevance and key in self._rows else None
+
+    def _select(self, keys, sort_key, limit: Optional[int], after_value=None) -> List[str]:
+        """Returns the first `limit` of `keys` (all if None) in ascending `sort_key` order,
+        skipping those that do not sort after `after_value` (if given)."""
+        if after_value is not None:
+            keys = [key for key in keys if sort_key(key) > after_value]
+        if limit is None:
+            return sorted(keys, key=sort_key)
+        return heapq.nsmallest(limit, keys, key=sort_key)
+
+    def page(self, after: Optional[str] = None, limit: Optional[int] = None,
+             sort: str = 'insertion') -> Tuple[List[Dict[str, str]], int, Optional[str]]:
+        """Lists the indexed rows one page at a time.
+
+        The rows are kept sorted in both orders, so a page is found with one binary
+        search for the cursor and costs the same wherever it is in the listing.
+
+        Args:
+            after (Optional[str]): The `next_cursor` of the previous page, or None for the first page.
+                                   The page continues where the previous one ended even if its last row was deleted.
+            limit (Optional[int]): The page size. None returns all remaining rows.
+            sort (str): 'insertion' (oldest first) or 'alphabetical'.
+
+        Returns:
+            Tuple[List[Dict[str, str]], int, Optional[str]]: Copies of the rows on the page, the total number
+                                                             of rows, and the cursor of the next page (None
+                                                             on the last page).
+        """
+        with self._lock:
+            self._ensure_built()
+            entries = self._sorted[sort]
+            after_value = self._cursor_value(sort, after)
+            start = 0 if after_value is None else bisect.bisect_right(entries, after_value)
+            end = len(entries) if limit is None else start + limit
+            page = entries[start:end]
+            next_cursor = self._encode_cursor(page[-1]) if page and end < len(entries) else None
+            return [dict(self._rows[entry[-1]]) for entry in page], len(self._rows), next_cursor
+
+    def rank(self, query: str, limit: Optional[int] = None,
+             near_keys: Optional[Dict[str, int]] = None, after: Optional[str] = None,
+             sort: str = 'relevance') -> Tuple[List[Dict[str, str]], int, Optional[str]]:
+        """Finds the rows matching `query`, best first.
+
+        Args:
+            query (str): The search terms, in English or Vietnamese (with or without diacritics).
+            limit (Optional[int]): How many of the best results to return. None returns all matches.
+            near_keys (Optional[Dict[str, int]]): Extra rows to include, by key, mapped to the edit
+                                                  distance of their headword from the query (see `FuzzyIndex`).
+                                                  Closer headwords get a larger boost.
+            after (Optional[str]): The `next_cursor` of the previous page, to return the next page.
+                                   Scores depend on the whole index, so relevance pages may shift when rows change.
+            sort (str): 'relevance' (best first), 'alphabetical' or 'insertion'.
+
+        Returns:
+            Tuple[List[Dict[str, str]], int, Optional[str]]: Copies of the top rows, the total number of
+                                                             matches, and the cursor of the next page
+                                                             (None if no more rows match).
+        """
+        folded = fold_text(query).strip()
+        if not folded:
+            return [], 0, None
+        terms = list(dict.fromkeys(tokenize(folded)))
+        with self._lock:
+            self._ensure_built()
+            matches = set(self._substring_matches(folded))
+            term_postings = [self._term_postings.get(term, set()) for term in terms]
+            if term_postings and all(term_postings):
+                term_postings.sort(key=len)
+                matches.update(term_postings[0].intersection(*term_postings[1:]))
+            near_keys = {key: distance for key, distance in (near_keys or {}).items() if key in self._rows}
+            matches.update(near_keys)
+            total = len(matches)
+            if not total:
+                return [], 0, None
+
+            doc_count = len(self._rows)
+            average_length = self._total_length / doc_count or 1
+            idf = {}
+            for term in terms:
+                frequency = len(self._term_postings.get(term, ()))
+                if frequency:
+                    idf[term] = math.log(1 + (doc_count - frequency + 0.5) / (frequency + 0.5))
+
+            def relevance(key):
+                term_freqs = self._term_freqs[key]
+                length_norm = self.K1 * (1 - self.B + self.B * sum(term_freqs.values()) / average_length)
+                score = 0.0
+                for term, weight in idf.items():
+                    tf = term_freqs.get(term, 0)
+                    if tf:
+                        score += weight * tf * (self.K1 + 1) / (tf + length_norm)
+                headword = self._texts[key][0]
+                if headword == folded:
+                    score += self.EXACT_HEADWORD_BOOST
+                elif headword.startswith(folded):
+                    score += self.HEADWORD_PREFIX_BOOST
+                if key in near_keys:
+                    score += self.NEAR_HEADWORD_BOOST / (1 + near_keys[key])
+                return (-score, self._order[key], key) # Earlier rows win ties
+
+            if sort == 'relevance':
+                sort_key = relevance
+            else:
+                sort_key = lambda key: self._sort_key(sort, key)
+            after_value = self._cursor_value(sort, after, relevance)
+            # One extra row is selected to tell whether another page follows
+            best = self._select(matches, sort_key, None if limit is None else limit + 1, after_value)
+            next_cursor = None
+            if limit is not None and len(best) > limit:
+                best = best[:limit]
+                next_cursor = self._encode_cursor(sort_key(best[-1])) if best else None
+            return [dict(self._rows[key]) for key in best], total, next_cursor
+
+
+class PrefixIndex:
+    """Sorted array of headwords for prefix completion.
+
+    Headwords are case- and diacritic-folded and kept sorted, so the completions
+    of a prefix are found with one binary search and returned in alphabetical
+    order. Like the other indexes it is a storage listener and is updated in place
+    on every add or delete.
+    """
+    def __init__(self, field: str):
+        """Initializes an empty index.
+
+        Args:
+            field (str): The row field holding the headword.
+        """
+        self.field = field
+        self._entries: List[Tuple[str, str]] = [] # Sorted (folded headword, key) pairs
+        self._words: Dict[str, Tuple[str, str]] = {} # key -> (folded headword, headword as stored)
+        self._lock = threading.RLock()
+
+    def reset(self, rows: List[Dict[str, str]]):
+        """Rebuilds the index from `rows`. Only the first row per word is kept."""
+        with self._lock:
+            self._words = {}
+            for row in rows:
+                word = (row.get(self.field) or '').strip()
+                key = word.casefold()
+                if key not in self._words:
+                    self._words[key] = (fold_text(word), word)
+            self._entries = sorted((folded, key) for key, (folded, _) in self._words.items())
+
+    def put(self, key: str, row: Optional[Dict[str, str]]):
+        """Adds, replaces or (if `row` is None) removes the headword for `key`."""
+        with self._lock:
+            previous = self._words.pop(key, None)
+            if previous is not None:
+                position = bisect.bisect_left(self._entries, (previous[0], key))
+                if position < len(self._entries) and self._entries[position] == (previous[0], key):
+                    del self._entries[position]
+            if row is not None:
+                word = (row.get(self.field) or '').strip()
+                self._words[key] = (fold_text(word), word)
+                bisect.insort(self._entries, (self._words[key][0], key))
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def complete(self, prefix: str, limit: int = 10) -> List[str]:
+        """Returns up to `limit` headwords starting with `prefix` (ignoring case and diacritics)."""
+        folded = fold_text(prefix).strip()
+        if not folded or limit <= 0:
+            return []
+        with self._lock:
+            position = bisect.bisect_left(self._entries, (folded, ''))
+            completions = []
+            for folded_word, key in self._entries[position:position + limit]:
+                if not folded_word.startswith(folded):
+                    break
+                completions.append(self._words[key][1])
+            return completions
+
+
+def edit_distance(a: str, b: str, max_distance: int) -> int:
+    """Returns the optimal string alignment distance between `a` and `b`.
+
+    Insertions, deletions, substitutions and transpositions of adjacent characters
+    each cost one. Returns `max_distance + 1` as soon as the distance is known to exceed `max_distance`.
+    """
+    if abs(len(a) - len(b)) > max_distance:
+        return max_distance + 1
+    previous_previous, previous = None, list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                current[j] = min(current[j], previous_previous[j - 2] + 1)
+        if min(current) > max_distance:
+            return max_distance + 1
+        previous_previous, previous = previous, current
+    return min(previous[-1], max_distance + 1)
+
+
+class FuzzyIndex:
+    """Deletion dictionary (as in SymSpell) for finding headwords within a small edit distance.
+
+    Every folded headword is stored under all strings obtained by deleting up to
+    `max_distance` of its characters. Two words within that edit distance always share
+    such a deletion, so a lookup only generates the deletions of the query and verifies
+    the few words found under them, independent of the vocabulary size.
+
+    Like the other indexes it is a storage listener; rebuilding after `reset()` is
+    deferred until the next lookup.
+    """
+    def __init__(self, field: str, max_distance: int = 2):
+        """Initializes an empty index.
+
+        Args:
+            field (str): The row field holding the headword.
+            max_distance (int): The largest edit distance that lookups can use.
+        """
+        self.field = field
+        self.max_distance = max_distance
+        self._words: Dict[str, Tuple[str, str]] = {} # key -> (folded headword, headword as stored)
+        self._deletes: Dict[str, Set[str]] = {} # deletion -> keys
+        self._pending_rows: Optional[List[Dict[str, str]]] = None
+        self._lock = threading.RLock()
+
+    def _deletions(self, text: str, max_distance: int) -> Set[str]:
+        """Returns `text` and every string made by deleting up to `max_distance` characters of it."""
+        deletions = {text}
+        frontier = {text}
+        for _ in range(max_distance):
+            frontier = {word[:i] + word[i + 1:] for word in frontier for i in range(len(word))}
+            deletions |= frontier
+        return deletions
+
+    def reset(self, rows: List[Dict[str, str]]):
+        """Schedules a rebuild from `rows`. Only the first row per word is kept."""
+        with self._lock:
+            self._pending_rows = [{self.field: row.get(self.field)} for row in rows]
+
+    def _ensure_built(self):
+        if self._pending_rows is None:
+            return
+        rows, self._pending_rows = self._pending_rows, None
+        self._words, self._deletes = {}, {}
+        for row in rows:
+            word = (row.get(self.field) or '').strip()
+            if word.casefold() not in self._words:
+                self._add(word.casefold(), word)
+
+    def put(self, key: str, row: Optional[Dict[str, str]]):
+        """Adds, replaces or (if `row` is None) removes the headword for `key`."""
+        with self._lock:
+            self._ensure_built()
+            if key in self._words:
+                self._remove(key)
+            if row is not None:
+                self._add(key, (row.get(self.field) or '').strip())
+
+    def _add(self, key: str, word: str):
+        folded = fold_text(word)
+        self._words[key] = (folded, word)
+        for deletion in self._deletions(folded, self.max_distance):
+            self._deletes.setdefault(deletion, set()).add(key)
+
+    def _remove(self, key: str):
+        folded, _ = self._words.pop(key)
+        for deletion in self._deletions(folded, self.max_distance):
+            keys = self._deletes.get(deletion)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._deletes[deletion]
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._ensure_built()
+            return len(self._words)
+
+    def lookup(self, word: str, max_distance: Optional[int] = None) -> List[Tuple[str, int]]:
+        """Finds the headwords close to `word`, ignoring case and diacritics.
+
+        Args:
+            word (str): The word to look up.
+            max_distance (Optional[int]): The largest edit distance to accept, at most
+                                          the index's `max_distance` (the default).
+                                          Words of four characters or less use at most 1.
+
+        Returns:
+            List[Tuple[str, int]]: (headword, distance) pairs, closest first, then alphabetical.
+        """
+        folded = fold_text(word).strip()
+        if not folded:
+            return []
+        limit = self.max_distance if max_distance is None else min(max_distance, self.max_distance)
+        if len(folded) <= 4:
+            limit = min(limit, 1)
+        with self._lock:
+            self._ensure_built()
+            candidates = set()
+            for deletion in self._deletions(folded, limit):
+                candidates.update(self._deletes.get(deletion, ()))
+            matches = []
+            for key in candidates:
+                candidate_folded, headword = self._words[key]
+                distance = edit_distance(folded, candidate_folded, limit)
+                if distance <= limit:
+                    matches.append((headword, distance))
+            matches.sort(key=lambda match: (match[1], fold_text(match[0])))
+            return matches
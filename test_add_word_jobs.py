@@ -0,0 +1,83 @@
+import os
+import time
+import shutil
+import tempfile
+import threading
+import unittest
+from unittest.mock import MagicMock
+from add_word_jobs import AddWordJobQueue
+from lookup_cache import PersistentCache
+from vocabulary_store import VocabularyStore
+
+class TestAddWordJobQueue(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.temp_dir, ignore_errors=True)
+        self.records = PersistentCache(os.path.join(self.temp_dir, 'lookups.db'), 'add_word_jobs', ttl=3600)
+        self.service = MagicMock()
+        self.service.store.normalize = VocabularyStore.normalize
+        self.service.word_exists.return_value = False
+        self.release = threading.Event()
+        self.service.add_word.side_effect = lambda word, if_absent: self.release.wait(5) and word != "unknown"
+        self.jobs = AddWordJobQueue(self.service, self.records, workers=2)
+
+    def test_job_reports_progress_and_outcome(self):
+        job, created = self.jobs.submit(" Apple ")
+        self.assertTrue(created)
+        self.assertEqual((job['word'], job['status']), ("Apple", 'queued'))
+        self.assertIn(self.jobs.get(job['job_id'])['status'], ('queued', 'running'))
+        self.release.set()
+        self.jobs.join()
+        self.assertEqual(self.jobs.get(job['job_id'])['status'], 'added')
+        self.service.add_word.assert_called_once_with("Apple", if_absent=True)
+
+    def test_duplicate_submissions_share_one_job(self):
+        first, _ = self.jobs.submit("apple")
+        second, created = self.jobs.submit("APPLE")
+        self.assertFalse(created)
+        self.assertEqual(second['job_id'], first['job_id'])
+        self.release.set()
+        self.jobs.join()
+        self.assertEqual(self.service.add_word.call_count, 1)
+        _, created = self.jobs.submit("apple") # A finished job does not block a new one
+        self.assertTrue(created)
+        self.jobs.join()
+        self.assertEqual(self.jobs.stats(), {'submitted': 2, 'deduplicated': 1, 'added': 2, 'exists': 0, 'failed': 0, 'pending': 0})
+
+    def test_failed_and_existing_words(self):
+        self.release.set()
+        failed, _ = self.jobs.submit("unknown")
+        self.jobs.join()
+        self.assertEqual(self.jobs.get(failed['job_id'])['status'], 'failed')
+        self.service.word_exists.return_value = True
+        existing, _ = self.jobs.submit("unknown")
+        self.jobs.join()
+        self.assertEqual(self.jobs.get(existing['job_id'])['status'], 'exists')
+        self.service.add_word.side_effect = RuntimeError("boom")
+        self.service.word_exists.return_value = False
+        crashed, _ = self.jobs.submit("pear")
+        self.jobs.join()
+        self.assertEqual(self.jobs.get(crashed['job_id'])['status'], 'failed')
+
+    def test_jobs_are_visible_to_other_workers(self):
+        job, _ = self.jobs.submit("apple")
+        other_worker = AddWordJobQueue(self.service, PersistentCache(os.path.join(self.temp_dir, 'lookups.db'), 'add_word_jobs', 3600))
+        self.assertIsNotNone(other_worker.get(job['job_id']))
+        _, created = other_worker.submit("apple")
+        self.assertFalse(created)
+        self.release.set()
+        self.jobs.join()
+        self.assertEqual(other_worker.get(job['job_id'])['status'], 'added')
+
+    def test_stale_jobs_do_not_block_resubmission(self):
+        jobs = AddWordJobQueue(self.service, None, stale_after=0.05)
+        jobs._start_workers = lambda: None # The job is never picked up, as if its process died
+        job, _ = jobs.submit("apple")
+        time.sleep(0.1)
+        _, created = jobs.submit("apple")
+        self.assertTrue(created)
+        self.assertIsNone(jobs.get("unknown"))
+
+if __name__ == '__main__':
+    unittest.main()
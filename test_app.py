@@ -0,0 +1,63 @@
+import unittest
+from unittest.mock import patch, MagicMock
+import app as vocabulary_app
+
+class TestRefreshRows(unittest.TestCase):
+
+    def setUp(self):
+        self.client = vocabulary_app.app.test_client()
+        patcher = patch.object(vocabulary_app, 'vocab_service', MagicMock())
+        self.service = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.service.refresh_words.return_value = [{'definition': {'success': True, 'content': "new def"}}]
+
+    def test_refreshes_the_requested_columns(self):
+        response = self.client.post('/refresh_rows', json={'rows': [{'word': " apple ", 'columns': ["definition"]}]})
+        self.assertEqual(response.status_code, 200)
+        self.service.refresh_words.assert_called_once_with([("apple", ["definition"])])
+        self.assertEqual(response.get_json()['rows'], [{'word': "apple", 'cells': {'definition': {'success': True, 'content': "new def"}}}])
+
+    def test_rejects_columns_that_are_not_a_list_of_names(self):
+        for columns in ("definition", {'definition': True}, [1, 2], 3):
+            response = self.client.post('/refresh_rows', json={'rows': [{'word': "apple", 'columns': columns}]})
+            self.assertEqual(response.status_code, 400, columns)
+        self.service.refresh_words.assert_not_called()
+
+class TestRefreshCell(unittest.TestCase):
+
+    def setUp(self):
+        self.client = vocabulary_app.app.test_client()
+        patcher = patch.object(vocabulary_app, 'vocab_service', MagicMock())
+        self.service = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_vietnamese_definition_is_translated_from_the_stored_definition(self):
+        self.service.refresh_words.return_value = [{'vietnamese_definition': {'success': True, 'content': "Quả táo"}}]
+        response = self.client.post('/refresh_cell', json={'word': "apple", 'column': "vn_definition"})
+        self.assertEqual((response.status_code, response.get_json()), (200, {'success': True, 'new_value': "Quả táo"}))
+        # Only the Vietnamese cell is refreshed, so it is translated from the English definition the row shows
+        self.service.refresh_words.assert_called_once_with([("apple", ["vietnamese_definition"])])
+
+    def test_words_not_in_the_vocabulary_are_not_found(self):
+        self.service.refresh_words.return_value = [{'definition': {'success': False, 'message': 'Word not found'}}]
+        response = self.client.post('/refresh_cell', json={'word': "unknown", 'column': "definition"})
+        self.assertEqual(response.status_code, 404)
+
+class TestQualityScan(unittest.TestCase):
+
+    def setUp(self):
+        self.client = vocabulary_app.app.test_client()
+
+    def test_report_is_scanned_without_holding_the_lock(self):
+        def dry_run(dry_run=False, limit=None):
+            self.assertFalse(vocabulary_app.quality_scan_lock.locked())
+            return {'dry_run': True, 'affected': 0}
+        with patch.object(vocabulary_app, 'QualityScanner') as scanner_class:
+            scanner_class.return_value.run.side_effect = dry_run
+            response = self.client.get('/quality_scan')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json()['report'], {'dry_run': True, 'affected': 0})
+        scanner_class.return_value.run.assert_called_once_with(dry_run=True)
+
+if __name__ == '__main__':
+    unittest.main()
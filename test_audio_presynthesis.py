@@ -0,0 +1,47 @@
+import unittest
+from unittest.mock import MagicMock
+from audio_presynthesis import AudioPresynthesizer
+
+ROW = {'English Word': 'apple', 'English Definition': 'A fruit', 'English Example': 'An apple a day',
+       'Vietnamese Definition': 'Quả táo', 'Vietnamese Example': '[Translation failed for: An apple a day...]'}
+
+class TestAudioPresynthesizer(unittest.TestCase):
+
+    def setUp(self):
+        self.service = MagicMock(api_key="google_key", elevenlabs_api_key=None)
+        self.service.audio_cache_key.side_effect = lambda text, language, service: f"{service}:{language}:{text}"
+        self.cached = set()
+        self.service.audio_file_path.side_effect = lambda key: key if key in self.cached else None
+        self.service.get_audio.side_effect = lambda text, language, service: None if text == "Quả táo" else "key"
+        self.presynthesizer = AudioPresynthesizer(self.service, ['google', 'elevenlabs'], workers=2)
+
+    def test_jobs_cover_speakable_fields_of_available_services(self):
+        # The definition is not spoken, placeholders are skipped, and ElevenLabs has no API key
+        self.assertEqual(self.presynthesizer.jobs_for_row(ROW),
+                         [("apple", 'en', 'google'), ("An apple a day", 'en', 'google'), ("Quả táo", 'vi', 'google')])
+        # Every fallback string the quality scanner knows is skipped, in English fields too
+        row = dict(ROW, **{'English Example': "No example sentence available.", 'Vietnamese Definition': "(No text provided for translation)"})
+        self.assertEqual(self.presynthesizer.jobs_for_row(row), [("apple", 'en', 'google')])
+
+    def test_enqueued_rows_are_synthesized_in_the_background(self):
+        self.cached.add("google:en:apple")
+        self.assertEqual(self.presynthesizer.enqueue_row(ROW), 3)
+        self.presynthesizer.join()
+        self.service.get_audio.assert_any_call("An apple a day", 'en', 'google')
+        self.assertEqual(self.service.get_audio.call_count, 2) # The cached word is skipped
+        self.assertEqual(self.presynthesizer.stats(),
+                         {'queued': 3, 'synthesized': 1, 'cached': 1, 'failed': 1, 'dropped': 0, 'pending': 0})
+
+    def test_full_queue_drops_jobs(self):
+        presynthesizer = AudioPresynthesizer(self.service, ['google'], max_queue=1)
+        presynthesizer._start_workers = lambda: None # Keep the queue from draining
+        self.assertEqual(presynthesizer.enqueue_row(ROW), 1)
+        self.assertEqual(presynthesizer.stats()['dropped'], 2)
+
+    def test_backfill_waits_for_all_rows(self):
+        self.cached.add("google:en:apple")
+        result = self.presynthesizer.backfill([ROW, dict(ROW, **{'English Word': 'pear'})], workers=3)
+        self.assertEqual(result, {'synthesized': 3, 'cached': 1, 'failed': 2})
+
+if __name__ == '__main__':
+    unittest.main()
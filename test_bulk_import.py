@@ -0,0 +1,78 @@
+import os
+import json
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+from vocabulary_service import VocabularyService
+from bulk_import import BulkImporter, read_word_list
+
+class TestReadWordList(unittest.TestCase):
+
+    def test_text_and_csv_lists(self):
+        self.assertEqual(read_word_list(["apple\n", "\n", "  Banana \n", "APPLE\n"]), ["apple", "Banana"])
+        self.assertEqual(read_word_list(["English Word,English Definition\n", "kiwi,A fruit\n", "fig,\n"]), ["kiwi", "fig"])
+        self.assertEqual(read_word_list([]), [])
+
+class TestBulkImporter(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.temp_dir, ignore_errors=True)
+        with patch.dict(os.environ, {"VOCAB_CACHE_DIR": os.path.join(self.temp_dir, 'cache')}):
+            self.service = VocabularyService(csv_file=os.path.join(self.temp_dir, 'vocabulary.csv'))
+        self.service.store.append(dict(zip(self.service.headers, ["apple", "def", "ex", "vdef", "vex"])))
+        self.checkpoint_file = os.path.join(self.temp_dir, 'words.progress.json')
+        self.fetched = []
+
+    def fake_fetch_entry(self, word, deadline=None):
+        self.fetched.append(word)
+        if word == "xyzzy":
+            return None # No definition found
+        return dict(zip(self.service.headers, [word, f"def {word}", "ex", "vdef", "vex"]))
+
+    def words(self):
+        return [row['English Word'] for row in self.service.get_all_vocabulary()]
+
+    def test_imports_new_words_in_batches(self):
+        with patch.object(self.service, 'fetch_entry', side_effect=self.fake_fetch_entry), \
+             patch.object(self.service.store, 'insert_many', wraps=self.service.store.insert_many) as insert_many, \
+             patch.object(self.service.store, 'all', wraps=self.service.store.all) as all_rows:
+            result = BulkImporter(self.service, self.checkpoint_file, workers=3, batch_size=2).run(
+                ["Apple", "kiwi", "fig", "xyzzy", "pear", "bad-word!"])
+
+        self.assertEqual(sorted(self.fetched), ["fig", "kiwi", "pear", "xyzzy"]) # Existing and invalid words are not fetched
+        self.assertEqual(insert_many.call_count, 2)
+        all_rows.assert_not_called() # Existing words are found by key, without copying the vocabulary
+        self.assertEqual(self.words(), ["apple", "kiwi", "fig", "pear"])
+        self.assertEqual(result, {'total': 6, 'added': 3, 'existing': 1, 'resumed': 0, 'failed': 2, 'remaining': 0, 'finished': True})
+        with open(self.checkpoint_file, encoding='utf-8') as file:
+            checkpoint = json.load(file)
+        self.assertEqual(checkpoint, {'done': ["fig", "kiwi", "pear"], 'failed': ["bad-word!", "xyzzy"]})
+
+    def test_resumes_from_checkpoint(self):
+        def interrupt(word, deadline=None):
+            if word == "pear":
+                raise KeyboardInterrupt
+            return self.fake_fetch_entry(word, deadline)
+
+        with patch.object(self.service, 'fetch_entry', side_effect=interrupt):
+            with self.assertRaises(KeyboardInterrupt):
+                BulkImporter(self.service, self.checkpoint_file, workers=1, batch_size=2).run(["kiwi", "fig", "pear", "plum"])
+        self.assertEqual(self.words(), ["apple", "kiwi", "fig"])
+
+        self.fetched = []
+        with patch.object(self.service, 'fetch_entry', side_effect=self.fake_fetch_entry):
+            result = BulkImporter(self.service, self.checkpoint_file, workers=1, batch_size=2).run(["kiwi", "fig", "pear", "plum"])
+        self.assertEqual(self.fetched, ["pear", "plum"])
+        self.assertEqual((result['added'], result['resumed']), (2, 2))
+        self.assertEqual(self.words(), ["apple", "kiwi", "fig", "pear", "plum"])
+
+    def test_fetch_errors_count_as_failed(self):
+        with patch.object(self.service, 'fetch_entry', side_effect=TimeoutError("too slow")):
+            result = BulkImporter(self.service).run(["kiwi"])
+        self.assertEqual((result['added'], result['failed']), (0, 1))
+        self.assertEqual(self.words(), ["apple"])
+
+if __name__ == '__main__':
+    unittest.main()
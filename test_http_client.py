@@ -0,0 +1,105 @@
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import patch, MagicMock
+import requests
+from http_client import ProviderClient, CircuitOpenError
+from resilience import TokenBucket, CircuitBreaker
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1' # Keep connections alive
+
+    def do_GET(self):
+        body = b'ok'
+        self.send_response(200)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+def _response(status, headers=None):
+    return MagicMock(status_code=status, headers=headers or {})
+
+class TestProviderClient(unittest.TestCase):
+
+    def setUp(self):
+        self.client = ProviderClient("test", read_timeout=5, max_retries=2)
+        self.sleep_patcher = patch('http_client.time.sleep')
+        self.mock_sleep = self.sleep_patcher.start()
+
+    def tearDown(self):
+        self.sleep_patcher.stop()
+
+    @patch('requests.Session.get')
+    def test_retries_retryable_statuses_then_succeeds(self, mock_get):
+        mock_get.side_effect = [_response(503), _response(429, {'Retry-After': '1'}), _response(200)]
+        self.assertEqual(self.client.get("https://example.com").status_code, 200)
+        self.assertEqual(mock_get.call_count, 3)
+        self.assertEqual(mock_get.call_args[1]['timeout'], (3.05, 5))
+        self.assertEqual(self.mock_sleep.call_args_list[1][0][0], 1.0) # Retry-After is honoured
+        self.assertLessEqual(self.mock_sleep.call_args_list[0][0][0], 0.25)
+        self.assertEqual(self.client.stats()['retries'], 2)
+
+    @patch('requests.Session.post')
+    def test_gives_up_after_max_retries(self, mock_post):
+        mock_post.return_value = _response(500)
+        self.assertEqual(self.client.post("https://example.com", json={}).status_code, 500)
+        self.assertEqual(mock_post.call_count, 3)
+
+        mock_post.reset_mock()
+        mock_post.return_value = _response(404) # Not retryable
+        self.assertEqual(self.client.post("https://example.com").status_code, 404)
+        mock_post.assert_called_once()
+
+    @patch('requests.Session.get')
+    def test_every_attempt_takes_a_rate_limit_token(self, mock_get):
+        mock_get.side_effect = [_response(503), _response(200)]
+        limiter = MagicMock(spec=TokenBucket)
+        limiter.stats.return_value = {'acquired': 2, 'waited': 1}
+        client = ProviderClient("test", max_retries=2, rate_limiter=limiter)
+        self.assertEqual(client.get("https://example.com").status_code, 200)
+        self.assertEqual(limiter.acquire.call_count, 2)
+        self.assertEqual(client.stats()['throttled'], 1)
+
+    @patch('requests.Session.get')
+    def test_open_circuit_fails_fast(self, mock_get):
+        mock_get.side_effect = [_response(503), requests.exceptions.Timeout("slow"), _response(404)]
+        client = ProviderClient("test", max_retries=0, circuit_breaker=CircuitBreaker("test", failure_threshold=2))
+        self.assertEqual(client.get("https://example.com").status_code, 503)
+        with self.assertRaises(requests.exceptions.Timeout):
+            client.get("https://example.com")
+        with self.assertRaises(CircuitOpenError): # Also a ConnectionError, so callers fall back as usual
+            client.get("https://example.com?key=secret")
+        self.assertEqual(mock_get.call_count, 2)
+        self.assertEqual(client.stats()['short_circuited'], 1)
+
+        client.circuit_breaker = CircuitBreaker("test", failure_threshold=1)
+        self.assertEqual(client.get("https://example.com").status_code, 404) # Client errors do not count
+        self.assertEqual(client.circuit_breaker.state, 'closed')
+
+    @patch('requests.Session.get', side_effect=requests.exceptions.ConnectionError("refused"))
+    def test_connection_errors_are_retried_then_raised(self, mock_get):
+        with self.assertRaises(requests.exceptions.ConnectionError):
+            self.client.get("https://example.com")
+        self.assertEqual(mock_get.call_count, 3)
+        self.assertEqual(self.client.stats()['failures'], 1)
+
+    def test_connections_are_reused(self):
+        server = ThreadingHTTPServer(('127.0.0.1', 0), _Handler)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        try:
+            url = f"http://127.0.0.1:{server.server_address[1]}/"
+            for _ in range(3):
+                self.assertEqual(self.client.get(url).text, 'ok')
+            stats = self.client.stats()
+            self.assertEqual((stats['requests'], stats['connections'], stats['reused_connections']), (3, 1, 2))
+        finally:
+            self.client.session.close()
+            server.shutdown()
+            server.server_close()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,79 @@
+import os
+import itertools
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+from lookup_cache import PersistentCache, TieredCache
+
+class TestPersistentCache(unittest.TestCase):
+
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+        self.db_file = os.path.join(self.cache_dir, "lookups.db")
+        self.cache = PersistentCache(self.db_file, "dictionary", ttl=60)
+
+    def tearDown(self):
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+
+    def test_get_and_set(self):
+        self.assertEqual(self.cache.get("apple"), (False, None))
+        self.cache.set("apple", {"definition": "A fruit"})
+        self.cache.set("xyzzy", None) # Negative entry
+        self.assertEqual(self.cache.get("apple"), (True, {"definition": "A fruit"}))
+        self.assertEqual(self.cache.get("xyzzy"), (True, None))
+
+    def test_entries_expire(self):
+        with patch("lookup_cache.time.time", return_value=1000.0):
+            self.cache.set("apple", "fruit")
+            self.cache.set("xyzzy", None, ttl=5)
+        with patch("lookup_cache.time.time", return_value=1010.0):
+            self.assertEqual(self.cache.get("apple"), (True, "fruit"))
+            self.assertEqual(self.cache.get("xyzzy"), (False, None))
+
+    def test_evicts_least_recently_used(self):
+        cache = PersistentCache(self.db_file, "dictionary", ttl=60, max_entries=2, touch_interval=0)
+        with patch("lookup_cache.time.time", side_effect=itertools.count(1)):
+            cache.set("a", 1)
+            cache.set("b", 2)
+            cache.get("a") # "b" is now the least recently used
+            cache.set("c", 3)
+            cache.evict()
+            self.assertEqual(len(cache), 2)
+            self.assertEqual(cache.get("b"), (False, None))
+            self.assertEqual(cache.get("a"), (True, 1))
+
+    def test_shared_between_instances_but_not_namespaces(self):
+        self.cache.set("apple", "fruit")
+        self.assertEqual(PersistentCache(self.db_file, "dictionary", ttl=60).get("apple"), (True, "fruit"))
+        other = PersistentCache(self.db_file, "translations", ttl=60)
+        self.assertEqual(other.get("apple"), (False, None))
+        other.clear()
+        self.assertEqual(len(self.cache), 1)
+
+class TestTieredCache(unittest.TestCase):
+
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+        self.persistent = PersistentCache(os.path.join(self.cache_dir, "lookups.db"), "translations", ttl=60)
+
+    def tearDown(self):
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+
+    def test_memory_in_front_of_persistent_cache(self):
+        cache = TieredCache(self.persistent, memory_size=1)
+        cache.set("hello", "xin chào")
+        cache.set("thanks", "cảm ơn") # Pushes "hello" out of memory
+        self.assertEqual(cache.get("thanks"), (True, "cảm ơn"))
+        self.assertEqual(cache.get("hello"), (True, "xin chào"))
+        self.assertEqual(cache.get("bye"), (False, None))
+        self.assertEqual(cache.stats(), {'memory_hits': 1, 'persistent_hits': 1, 'misses': 1, 'memory_entries': 1})
+
+    def test_memory_only(self):
+        cache = TieredCache(None)
+        cache.set("hello", "xin chào")
+        self.assertEqual(cache.get("hello"), (True, "xin chào"))
+        self.assertEqual(TieredCache(None).get("hello"), (False, None))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,58 @@
+import os
+import shutil
+import tempfile
+import unittest
+from offline_dictionary import OfflineDictionary, build_index, read_source
+
+SOURCE = """# comment
+Apple\tA round fruit.\tAn apple a day.
+ice cream\tA frozen sweet food.\tI like ice cream.
+apple\tDuplicate entry.\tIgnored.
+empty\t\t
+café\tA small restaurant.\tWe met at the café.
+"""
+
+class TestOfflineDictionary(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.temp_dir, ignore_errors=True)
+        self.source_file = os.path.join(self.temp_dir, 'dictionary.tsv')
+        self.index_file = os.path.join(self.temp_dir, 'index', 'dictionary.idx')
+        with open(self.source_file, 'w', encoding='utf-8') as file:
+            file.write(SOURCE)
+
+    def test_read_source_sorts_and_deduplicates(self):
+        self.assertEqual([entry[0] for entry in read_source(SOURCE.splitlines())], ['apple', 'café', 'ice cream'])
+
+    def test_lookup_is_case_insensitive(self):
+        self.assertEqual(build_index(self.source_file, self.index_file), 3)
+        dictionary = OfflineDictionary(self.index_file)
+        self.assertEqual(dictionary.lookup(" APPLE "), {'definition': 'A round fruit.', 'example': 'An apple a day.'})
+        self.assertEqual(dictionary.lookup("Ice  Cream")['definition'], 'A frozen sweet food.')
+        self.assertEqual(dictionary.lookup("Café")['example'], 'We met at the café.')
+        for missing in ("", "aardvark", "banana", "zebra", "empty"):
+            self.assertIsNone(dictionary.lookup(missing))
+        self.assertEqual(dictionary.stats(), {'hits': 3, 'misses': 4, 'entries': 3, 'loaded': 1})
+
+    def test_index_is_built_lazily_and_rebuilt_when_stale(self):
+        dictionary = OfflineDictionary(self.index_file, self.source_file)
+        self.assertEqual(dictionary.stats()['loaded'], 0)
+        self.assertFalse(os.path.exists(self.index_file))
+        self.assertIsNotNone(dictionary.lookup("apple"))
+        self.assertTrue(os.path.exists(self.index_file))
+
+        with open(self.source_file, 'a', encoding='utf-8') as file:
+            file.write("banana\tA long yellow fruit.\tMonkeys like bananas.\n")
+        os.utime(self.source_file, (os.path.getmtime(self.index_file) + 10,) * 2)
+        self.assertEqual(len(OfflineDictionary(self.index_file, self.source_file)), 4)
+
+    def test_missing_or_invalid_index_disables_lookups(self):
+        self.assertIsNone(OfflineDictionary(self.index_file).lookup("apple"))
+        os.makedirs(os.path.dirname(self.index_file))
+        with open(self.index_file, 'wb') as file:
+            file.write(b'not an index')
+        self.assertIsNone(OfflineDictionary(self.index_file).lookup("apple"))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,81 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import MagicMock
+from quality_scan import QualityScanner, placeholder_fields
+from vocabulary_store import CsvVocabularyStore
+
+HEADERS = ['English Word', 'English Definition', 'English Example', 'Vietnamese Definition', 'Vietnamese Example']
+ROWS = [
+    ['good', 'Having quality.', 'A good book.', 'Tốt.', 'Một cuốn sách hay.'],
+    ['correct', 'Free from error.', 'No example sentence available.', 'Không có lỗi.', 'Không có câu ví dụ nào.'],
+    ['uncorrect', 'Definition for uncorrect', 'Example featuring uncorrect.', 'Định nghĩa', 'Ví dụ'],
+    ['pear', 'A sweet fruit.', 'I ate a pear.', '[Translation failed for: A sweet fruit....]', '[googletrans fallback error: No text] I ate a pear.'],
+]
+
+class TestQualityScanner(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.temp_dir, ignore_errors=True)
+        self.store = CsvVocabularyStore(os.path.join(self.temp_dir, 'vocabulary.csv'), HEADERS)
+        self.store.insert_many([dict(zip(HEADERS, row)) for row in ROWS])
+        self.service = MagicMock(store=self.store)
+        self.service.get_all_vocabulary.side_effect = self.store.all
+        self.service.update_words.side_effect = self.store.update_many
+        definitions = {'correct': {'definition': 'Free from error.', 'example': 'That answer is correct.'},
+                       'uncorrect': {'definition': 'Definition for uncorrect', 'example': 'Example for uncorrect.'}}
+        self.service.get_english_definition.side_effect = definitions.get
+        self.service.translate_batch_to_vietnamese.side_effect = lambda texts, deadline=None: [f"vi: {text}" for text in texts]
+        self.scanner = QualityScanner(self.service, batch_size=10, rate=0)
+
+    def test_placeholder_fields(self):
+        self.assertEqual(placeholder_fields(dict(zip(HEADERS, ROWS[0]))), [])
+        self.assertEqual(placeholder_fields(dict(zip(HEADERS, ROWS[2]))), ['English Definition', 'English Example'])
+        self.assertEqual(placeholder_fields(dict(zip(HEADERS, ROWS[3]))), ['Vietnamese Definition', 'Vietnamese Example'])
+        self.assertEqual(placeholder_fields({'English Word': 'x'}), list(HEADERS[1:]))
+
+    def test_dry_run_reports_without_upstream_calls(self):
+        report = self.scanner.run(dry_run=True)
+        self.assertEqual((report['scanned'], report['affected']), (4, 3))
+        self.assertEqual(report['placeholders'], {'English Definition': 1, 'English Example': 2,
+                                                  'Vietnamese Definition': 1, 'Vietnamese Example': 1})
+        self.service.get_english_definition.assert_not_called()
+        self.service.translate_batch_to_vietnamese.assert_not_called()
+        self.service.update_words.assert_not_called()
+
+    def test_run_batches_lookups_translations_and_writes(self):
+        report = self.scanner.run()
+        # One lookup per word with an English placeholder, one translation call and one write for the batch
+        self.assertEqual(self.service.get_english_definition.call_count, 2)
+        self.service.translate_batch_to_vietnamese.assert_called_once_with(
+            ['That answer is correct.', 'A sweet fruit.', 'I ate a pear.'], None)
+        self.service.update_words.assert_called_once()
+        self.assertEqual(self.store.get('correct')['English Example'], 'That answer is correct.')
+        self.assertEqual(self.store.get('correct')['Vietnamese Example'], 'vi: That answer is correct.')
+        self.assertEqual(self.store.get('correct')['Vietnamese Definition'], 'Không có lỗi.') # Untouched
+        self.assertEqual(self.store.get('pear')['Vietnamese Definition'], 'vi: A sweet fruit.')
+        # A refresh that only returns placeholders again leaves the entry alone
+        self.assertEqual(self.store.get('uncorrect')['English Definition'], 'Definition for uncorrect')
+        self.assertEqual((report['updated'], report['unresolved']), (2, ['uncorrect']))
+        self.assertEqual(report['fixed'], {'English Definition': 0, 'English Example': 1,
+                                           'Vietnamese Definition': 1, 'Vietnamese Example': 2})
+        self.assertEqual(self.scanner.progress(), {'affected': 3, 'processed': 3, 'finished': True})
+
+    def test_limit_and_concurrent_edits(self):
+        def edit_then_translate(texts, deadline=None):
+            self.store.update('correct', {'English Example': 'Edited meanwhile.'})
+            return [f"vi: {text}" for text in texts]
+        self.service.translate_batch_to_vietnamese.side_effect = edit_then_translate
+        report = self.scanner.run(limit=2)
+        self.assertEqual(self.service.get_english_definition.call_count, 2)
+        self.assertEqual(self.store.get('correct')['English Example'], 'Edited meanwhile.')
+        self.assertEqual(self.store.get('pear')['Vietnamese Definition'], ROWS[3][3]) # Beyond the limit
+        # The translation of the discarded example is discarded with it
+        self.assertEqual(self.store.get('correct')['Vietnamese Example'], ROWS[1][4])
+        self.assertEqual(report['updated'], 0)
+        self.service.update_words.assert_not_called()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,196 @@
+import os
+import fcntl
+import shutil
+import tempfile
+import threading
+import unittest
+from unittest.mock import patch
+from resilience import TokenBucket, CircuitBreaker, LatencyTracker, SingleFlight
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+class TestTokenBucket(unittest.TestCase):
+
+    def setUp(self):
+        self.clock = FakeClock()
+        patcher = patch.multiple('resilience.time', monotonic=self.clock.monotonic, sleep=self.clock.sleep)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_allows_burst_then_waits_for_refill(self):
+        bucket = TokenBucket(rate=2, burst=3)
+        for _ in range(3):
+            self.assertTrue(bucket.acquire())
+        self.assertEqual(self.clock.now, 100.0)
+        self.assertTrue(bucket.acquire())
+        self.assertAlmostEqual(self.clock.now, 100.5) # One token every 1/rate seconds
+        self.assertEqual(bucket.stats(), {'acquired': 4, 'waited': 1})
+
+    def test_refill_is_capped_at_burst(self):
+        bucket = TokenBucket(rate=1)
+        self.assertTrue(bucket.acquire())
+        self.clock.now += 60
+        self.assertTrue(bucket.acquire())
+        self.assertFalse(bucket.acquire(timeout=0.5))
+        self.assertAlmostEqual(self.clock.now, 160.0)
+
+    def test_zero_rate_is_unlimited(self):
+        bucket = TokenBucket(rate=0)
+        for _ in range(100):
+            self.assertTrue(bucket.acquire(timeout=0))
+        self.assertEqual(self.clock.now, 100.0)
+
+class TestCircuitBreaker(unittest.TestCase):
+
+    def setUp(self):
+        self.clock = FakeClock()
+        patcher = patch('resilience.time.monotonic', self.clock.monotonic)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.breaker = CircuitBreaker("test", failure_threshold=3, recovery_timeout=10)
+
+    def trip(self):
+        for _ in range(3):
+            self.assertTrue(self.breaker.allow())
+            self.breaker.record_failure()
+
+    def test_opens_after_consecutive_failures(self):
+        self.breaker.record_failure()
+        self.breaker.record_failure()
+        self.breaker.record_success() # Resets the count
+        self.breaker.record_failure()
+        self.assertEqual(self.breaker.state, 'closed')
+        self.breaker.record_failure()
+        self.breaker.record_failure()
+        self.assertEqual(self.breaker.state, 'open')
+        self.assertFalse(self.breaker.allow())
+        stats = self.breaker.stats()
+        self.assertEqual((stats['opened'], stats['rejected'], stats['retry_in']), (1, 1, 10.0))
+
+    def test_half_open_lets_one_probe_through(self):
+        self.trip()
+        self.clock.now += 10
+        self.assertEqual(self.breaker.state, 'half_open')
+        self.assertTrue(self.breaker.allow())
+        self.assertFalse(self.breaker.allow()) # Only one probe at a time
+        self.breaker.record_failure()
+        self.assertEqual(self.breaker.state, 'open') # A failed probe reopens at once
+
+        self.clock.now += 10
+        self.assertTrue(self.breaker.allow())
+        self.breaker.record_success()
+        self.assertEqual(self.breaker.state, 'closed')
+        self.assertTrue(self.breaker.allow())
+
+    def test_unreported_probe_expires(self):
+        self.trip()
+        self.clock.now += 10
+        self.assertTrue(self.breaker.allow())
+        self.clock.now += 10
+        self.assertTrue(self.breaker.allow())
+
+class TestLatencyTracker(unittest.TestCase):
+
+    def test_percentile_of_recent_latencies(self):
+        tracker = LatencyTracker(size=100, default=2.0, min_samples=10)
+        for seconds in range(9):
+            tracker.record(seconds / 10)
+        self.assertEqual(tracker.percentile(95), 2.0) # Too few samples
+        for seconds in range(9, 200):
+            tracker.record(seconds / 10)
+        self.assertEqual(len(tracker), 100) # Only the most recent are kept
+        self.assertAlmostEqual(tracker.percentile(50), 15.0)
+        self.assertAlmostEqual(tracker.percentile(100), 19.9)
+
+class TestSingleFlight(unittest.TestCase):
+
+    def setUp(self):
+        self.flight = SingleFlight()
+        self.release = threading.Event()
+        self.started = threading.Event()
+        self.calls = 0
+
+    def slow_call(self, outcome):
+        def call():
+            self.calls += 1
+            self.started.set()
+            self.release.wait(5)
+            if isinstance(outcome, Exception):
+                raise outcome
+            return outcome
+        return call
+
+    def run_concurrently(self, outcome, count=4):
+        results = [None] * count
+        def worker(index):
+            try:
+                results[index] = self.flight.do("key", self.slow_call(outcome))
+            except Exception as e:
+                results[index] = e
+        threads = [threading.Thread(target=worker, args=(0,))]
+        threads[0].start()
+        self.started.wait(5)
+        threads += [threading.Thread(target=worker, args=(index,)) for index in range(1, count)]
+        for thread in threads[1:]:
+            thread.start()
+        while self.flight.stats()['coalesced'] < count - 1:
+            threading.Event().wait(0.01)
+        self.release.set()
+        for thread in threads:
+            thread.join(5)
+        return results
+
+    def test_identical_calls_share_one_result(self):
+        self.assertEqual(self.run_concurrently("audio"), ["audio"] * 4)
+        self.assertEqual(self.calls, 1)
+        self.assertEqual(self.flight.stats(), {'calls': 1, 'coalesced': 3, 'lock_timeouts': 0, 'in_flight': 0})
+        self.assertEqual(self.flight.do("key", lambda: "again"), "again") # Results are not kept
+
+    def test_errors_reach_every_waiter_and_are_not_cached(self):
+        error = RuntimeError("upstream down")
+        self.assertEqual(self.run_concurrently(error), [error] * 4)
+        self.assertEqual(self.calls, 1)
+        self.assertEqual(self.flight.do("key", lambda: "recovered"), "recovered")
+
+    def test_shared_calls_take_a_lock_file(self):
+        lock_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, lock_dir, ignore_errors=True)
+        flight = SingleFlight(os.path.join(lock_dir, 'locks'))
+        self.assertEqual(flight.do("key", lambda: 42, shared=True), 42)
+        self.assertEqual(len(os.listdir(os.path.join(lock_dir, 'locks'))), 1)
+
+    def test_nested_shared_calls_on_the_same_stripe(self):
+        lock_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, lock_dir, ignore_errors=True)
+        flight = SingleFlight(lock_dir, lock_timeout=1)
+        flight.LOCK_STRIPES = 1 # Every key shares the one lock file
+        inner = lambda: flight.do("translation", lambda: "inner", shared=True)
+        result = []
+        thread = threading.Thread(target=lambda: result.append(flight.do("definition", inner, shared=True)))
+        thread.start()
+        thread.join(5)
+        self.assertEqual(result, ["inner"])
+        self.assertEqual(flight.stats()['lock_timeouts'], 0) # Not even a wait for the held stripe
+
+    def test_busy_lock_file_times_out(self):
+        lock_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, lock_dir, ignore_errors=True)
+        flight = SingleFlight(lock_dir, lock_timeout=0.2)
+        flight.LOCK_STRIPES = 1
+        # Another process holding the stripe, e.g. in an AB/BA order with this one
+        holder = os.open(os.path.join(lock_dir, "0000.lock"), os.O_RDWR | os.O_CREAT)
+        self.addCleanup(os.close, holder)
+        fcntl.flock(holder, fcntl.LOCK_EX)
+        self.assertEqual(flight.do("key", lambda: 42, shared=True), 42)
+        self.assertEqual(flight.stats()['lock_timeouts'], 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,196 @@
+import unittest
+from search_index import TrigramIndex, FullTextIndex, PrefixIndex, FuzzyIndex, edit_distance, fold_text
+
+FIELDS = ['English Word', 'English Definition', 'English Example']
+
+def make_row(word, definition, example):
+    return {'English Word': word, 'English Definition': definition, 'English Example': example,
+            'Vietnamese Definition': '', 'Vietnamese Example': ''}
+
+class TestTrigramIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.index = TrigramIndex(FIELDS)
+        self.index.reset([
+            make_row("apple", "A fruit", "An apple a day"),
+            make_row("banana", "A yellow fruit", "Banana split"),
+            make_row("apricot", "An orange fruit", "Dried apricot"),
+        ])
+
+    def words(self, results):
+        return [row['English Word'] for row in results]
+
+    def test_substring_search_in_insertion_order(self):
+        self.assertEqual(self.words(self.index.search("FRUIT")), ["apple", "banana", "apricot"])
+        self.assertEqual(self.words(self.index.search("a day")), ["apple"])
+        self.assertEqual(self.words(self.index.search("grape")), [])
+
+    def test_short_queries_scan_precomputed_fields(self):
+        self.assertEqual(self.words(self.index.search("ap")), ["apple", "apricot"])
+        self.assertEqual(self.words(self.index.search("y")), ["apple", "banana"])
+
+    def test_trigrams_must_match_within_one_field(self):
+        # "fruitdried" has all its trigrams spread over two fields but is not a substring of either
+        self.assertEqual(self.words(self.index.search("fruit dried")), [])
+
+    def test_put_updates_incrementally(self):
+        self.index.put("kiwi", make_row("kiwi", "A green fruit", "Kiwi salad"))
+        self.assertEqual(self.words(self.index.search("green")), ["kiwi"])
+
+        self.index.put("banana", make_row("banana", "A long fruit", "Banana bread"))
+        self.assertEqual(self.words(self.index.search("yellow")), [])
+        # Updated rows keep their position
+        self.assertEqual(self.words(self.index.search("fruit")), ["apple", "banana", "apricot", "kiwi"])
+
+        self.index.put("apple", None)
+        self.assertEqual(self.words(self.index.search("ap")), ["apricot"])
+        self.assertEqual(len(self.index), 3)
+        self.assertNotIn("apple", {key for posting in self.index._postings.values() for key in posting})
+
+    def test_results_are_copies(self):
+        self.index.search("apple")[0]['English Definition'] = "changed"
+        self.assertEqual(self.index.search("apple")[0]['English Definition'], "A fruit")
+
+class TestFullTextIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.index = FullTextIndex(FIELDS + ['Vietnamese Definition'])
+        rows = [
+            make_row("run", "To move quickly on foot", "I run every day"),
+            make_row("runner", "A person who runs", "The runner was fast"),
+            make_row("rerun", "To run again", "They rerun the show"),
+            make_row("walk", "To move on foot slowly", "Walk to school"),
+        ]
+        rows[0]['Vietnamese Definition'] = "Chạy bộ"
+        self.index.reset(rows)
+
+    def test_fold_text(self):
+        self.assertEqual(fold_text("Tiếng Việt ĐẸP"), "tieng viet dep")
+
+    def test_rank_boosts_headword_and_counts_all_matches(self):
+        results, total, _ = self.index.rank("run")
+        self.assertEqual(total, 3)
+        self.assertEqual([row['English Word'] for row in results], ["run", "runner", "rerun"]) # "runner" starts with the query
+
+    def test_rank_limit_returns_top_results(self):
+        results, total, _ = self.index.rank("foot", limit=1)
+        self.assertEqual(total, 2)
+        self.assertEqual(len(results), 1)
+
+    def test_rank_folds_vietnamese_and_follows_updates(self):
+        self.assertEqual([row['English Word'] for row in self.index.rank("chay")[0]], ["run"])
+        self.index.put("run", None)
+        self.assertEqual(self.index.rank("chay"), ([], 0, None))
+        self.assertEqual(self.index.rank("   "), ([], 0, None))
+
+class TestPaging(unittest.TestCase):
+
+    def setUp(self):
+        self.index = FullTextIndex(FIELDS)
+        self.index.reset([make_row(word, "A fruit", "") for word in ["pear", "Apple", "kiwi", "banana", "fig"]])
+
+    def words(self, results):
+        return [row['English Word'] for row in results[0]]
+
+    def test_page_in_insertion_and_alphabetical_order(self):
+        self.assertEqual(self.words(self.index.page(limit=2)), ["pear", "Apple"])
+        self.assertEqual(self.words(self.index.page("Apple", limit=2)), ["kiwi", "banana"])
+        self.assertEqual(self.index.page("banana", limit=2)[1], 5)
+        self.assertEqual(self.words(self.index.page("banana", limit=2)), ["fig"])
+        self.assertEqual(self.words(self.index.page(sort='alphabetical')), ["Apple", "banana", "fig", "kiwi", "pear"])
+        self.assertEqual(self.words(self.index.page("fig", limit=1, sort='alphabetical')), ["kiwi"])
+
+    def test_page_cursors(self):
+        _, _, cursor = self.index.page(limit=2)
+        self.assertEqual(cursor, "1\x1fapple")
+        rows, _, cursor = self.index.page(cursor, limit=2)
+        self.assertEqual([row['English Word'] for row in rows], ["kiwi", "banana"])
+        self.assertEqual(self.words(self.index.page(cursor, limit=2)), ["fig"])
+        self.assertIsNone(self.index.page(cursor, limit=2)[2])
+        self.assertEqual(self.index.page(limit=2, sort='alphabetical')[2], "banana\x1fbanana")
+
+    def test_cursor_survives_deletion(self):
+        _, _, cursor = self.index.page(limit=2)
+        _, _, alphabetical_cursor = self.index.page(limit=3, sort='alphabetical')
+        self.index.put("apple", None)
+        self.index.put("fig", None)
+        self.assertEqual(self.words(self.index.page(cursor, limit=2)), ["kiwi", "banana"])
+        self.assertEqual(self.words(self.index.page(alphabetical_cursor, limit=2, sort='alphabetical')), ["kiwi", "pear"])
+        # Plain words (older links) still work for alphabetical order
+        self.assertEqual(self.words(self.index.page("fig", limit=1, sort='alphabetical')), ["kiwi"])
+
+    def test_sorted_keys_follow_updates(self):
+        self.index.put("cherry", make_row("cherry", "A fruit", ""))
+        self.index.put("pear", make_row("Pear", "A green fruit", ""))
+        self.assertEqual(self.words(self.index.page()), ["Pear", "Apple", "kiwi", "banana", "fig", "cherry"])
+        self.assertEqual(self.words(self.index.page(sort='alphabetical')), ["Apple", "banana", "cherry", "fig", "kiwi", "Pear"])
+
+    def test_rank_pages(self):
+        self.assertEqual(self.words(self.index.rank("fruit", limit=2, sort='alphabetical')), ["Apple", "banana"])
+        self.assertEqual(self.words(self.index.rank("fruit", limit=2, after="banana", sort='alphabetical')), ["fig", "kiwi"])
+        # Relevance ties are broken by insertion order
+        self.assertEqual(self.words(self.index.rank("fruit", limit=3)), ["pear", "Apple", "kiwi"])
+        self.assertEqual(self.words(self.index.rank("fruit", after="kiwi")), ["banana", "fig"])
+        _, _, cursor = self.index.rank("fruit", limit=3)
+        self.assertEqual(self.words(self.index.rank("fruit", after=cursor)), ["banana", "fig"])
+        _, _, cursor = self.index.rank("fruit", limit=2, sort='alphabetical')
+        self.index.put("banana", None)
+        self.assertEqual(self.words(self.index.rank("fruit", after=cursor, sort='alphabetical')), ["fig", "kiwi", "pear"])
+
+class TestPrefixIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.index = PrefixIndex('English Word')
+        self.index.reset([make_row(word, "", "") for word in ["banana", "Apple", "apricot", "ăn", "Apple", "bandana"]])
+
+    def test_complete_returns_sorted_matches(self):
+        self.assertEqual(self.index.complete("ap"), ["Apple", "apricot"])
+        self.assertEqual(self.index.complete("BAN", limit=1), ["banana"])
+        self.assertEqual(self.index.complete("an"), ["ăn"]) # Diacritics are ignored
+        self.assertEqual(self.index.complete("zz"), [])
+        self.assertEqual(self.index.complete(" "), [])
+        self.assertEqual(len(self.index), 5)
+
+    def test_put_updates_incrementally(self):
+        self.index.put("apron", make_row("apron", "", ""))
+        self.index.put("apple", None)
+        self.assertEqual(self.index.complete("ap"), ["apricot", "apron"])
+
+class TestFuzzyIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.index = FuzzyIndex('English Word')
+        self.index.reset([make_row(word, "", "") for word in ["receive", "deceive", "recipe", "cat", "coat", "Tiếng"]])
+
+    def test_edit_distance(self):
+        self.assertEqual(edit_distance("recieve", "receive", 2), 1) # Adjacent transposition
+        self.assertEqual(edit_distance("kitten", "sitting", 3), 3)
+        self.assertEqual(edit_distance("kitten", "sitting", 2), 3) # Capped at max_distance + 1
+        self.assertEqual(edit_distance("a", "abcd", 1), 2)
+
+    def test_lookup_finds_close_words_first(self):
+        self.assertEqual(self.index.lookup("Recieve"), [("receive", 1), ("deceive", 2), ("recipe", 2)])
+        self.assertEqual(self.index.lookup("recieve", max_distance=1), [("receive", 1)])
+        self.assertEqual(self.index.lookup("tieng"), [("Tiếng", 0)])
+        # Short words only allow one edit
+        self.assertEqual(self.index.lookup("cot"), [("cat", 1), ("coat", 1)])
+        self.assertEqual(self.index.lookup("dog"), [])
+
+    def test_put_updates_incrementally(self):
+        self.index.put("receive", None)
+        self.index.put("relieve", make_row("relieve", "", ""))
+        self.assertEqual(self.index.lookup("recieve"), [("relieve", 1), ("deceive", 2), ("recipe", 2)])
+        self.assertEqual(len(self.index), 6)
+        self.assertNotIn("receive", {key for keys in self.index._deletes.values() for key in keys})
+
+    def test_rank_includes_near_keys(self):
+        index = FullTextIndex(FIELDS)
+        index.reset([make_row("receive", "To get something", "Receive a gift"),
+                     make_row("deceive", "To trick", "Do not deceive")])
+        self.assertEqual(index.rank("recieve"), ([], 0, None))
+        results, total, _ = index.rank("recieve", near_keys={"deceive": 2, "receive": 1})
+        self.assertEqual(total, 2)
+        self.assertEqual([row['English Word'] for row in results], ["receive", "deceive"])
+
+if __name__ == '__main__':
+    unittest.main()
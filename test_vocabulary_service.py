@@ -1,30 +1,61 @@
 import unittest
-from unittest.mock import patch, mock_open, MagicMock
+from unittest.mock import patch, mock_open, MagicMock, ANY
 import os
 import csv
+import shutil
+import tempfile
+import threading
+import time
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor
+import base64
+import requests
 from vocabulary_service import VocabularyService
+from vocabulary_store import CsvVocabularyStore, SqliteVocabularyStore, write_csv
+
+def _insert_words_in_process(csv_file, headers, words):
+    # Runs in a separate process: each process has its own store, like a gunicorn worker.
+    store = CsvVocabularyStore(csv_file, headers)
+    return [store.insert_if_absent(dict(zip(headers, [word, "def", "ex", "vdef", "vex"]))) for word in words]
 
 class TestVocabularyService(unittest.TestCase):
 
     def setUp(self):
         # Create a dummy CSV file path for testing
         self.test_csv_file = "test_vocabulary.csv"
+        self.test_db_file = "test_vocabulary.db"
         # Ensure any pre-existing test CSV is removed
         if os.path.exists(self.test_csv_file):
             os.remove(self.test_csv_file)
         
-        # Mock environment variable for GOOGLE_CLOUD_API_KEY
-        self.patcher = patch.dict(os.environ, {"GOOGLE_CLOUD_API_KEY": "test_api_key"})
+        # Mock environment variable for GOOGLE_CLOUD_API_KEY, and keep API caches out of the working directory
+        self.cache_dir = tempfile.mkdtemp()
+        self.patcher = patch.dict(os.environ, {"GOOGLE_CLOUD_API_KEY": "test_api_key", "VOCAB_CACHE_DIR": self.cache_dir})
         self.mock_env = self.patcher.start()
+        # Each mocked upstream response is final: retries are covered in test_http_client.py
+        self.retries_patcher = patch('vocabulary_service.HTTP_MAX_RETRIES', 0)
+        self.retries_patcher.start()
+        # Background audio synthesis would outlive the mocks of a test
+        self.presynthesis_patcher = patch('vocabulary_service.AUDIO_PRESYNTHESIS', False)
+        self.presynthesis_patcher.start()
+        # Definitions come from the mocked providers unless a test bundles its own dictionary
+        self.offline_dictionary_patcher = patch('vocabulary_service.OFFLINE_DICTIONARY_FILE', '')
+        self.offline_dictionary_patcher.start()
 
         self.service = VocabularyService(csv_file=self.test_csv_file)
 
     def tearDown(self):
         # Stop the environment variable patcher
         self.patcher.stop()
-        # Clean up the dummy CSV file after tests
-        if os.path.exists(self.test_csv_file):
-            os.remove(self.test_csv_file)
+        self.retries_patcher.stop()
+        self.presynthesis_patcher.stop()
+        self.offline_dictionary_patcher.stop()
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+        # Clean up the dummy CSV file (and its journal) and the SQLite database after tests
+        for path in (self.test_csv_file, self.test_csv_file + '.journal', self.test_csv_file + '.lock', self.test_db_file,
+                     self.test_db_file + '-wal', self.test_db_file + '-shm', self.test_db_file + '.export.csv'):
+            if os.path.exists(path):
+                os.remove(path)
 
     def test_ensure_csv_exists_creates_file_with_headers(self):
         # Service initialization in setUp should call _ensure_csv_exists
@@ -37,21 +68,19 @@ class TestVocabularyService(unittest.TestCase):
             self.assertEqual(len(list(reader)), 0)
 
     @patch('vocabulary_service.VocabularyService.get_english_definition')
-    @patch('vocabulary_service.VocabularyService.translate_to_vietnamese')
-    def test_add_word_success(self, mock_translate_to_vietnamese, mock_get_english_definition):
+    @patch('vocabulary_service.VocabularyService.translate_batch_to_vietnamese')
+    def test_add_word_success(self, mock_translate_batch_to_vietnamese, mock_get_english_definition):
         english_word = "hello"
         mock_def_data = {'definition': 'A greeting', 'example': 'She said hello.'}
         mock_get_english_definition.return_value = mock_def_data
-        mock_translate_to_vietnamese.side_effect = lambda text: f"Vietnamese: {text}"
+        mock_translate_batch_to_vietnamese.side_effect = lambda texts, deadline=None: [f"Vietnamese: {text}" for text in texts]
 
         result = self.service.add_word(english_word)
         self.assertTrue(result)
 
-        # Verify mocks were called
+        # Verify mocks were called: both texts are translated in one batch
         mock_get_english_definition.assert_called_once_with(english_word)
-        self.assertEqual(mock_translate_to_vietnamese.call_count, 2)
-        mock_translate_to_vietnamese.assert_any_call(mock_def_data['definition'])
-        mock_translate_to_vietnamese.assert_any_call(mock_def_data['example'])
+        mock_translate_batch_to_vietnamese.assert_called_once_with([mock_def_data['definition'], mock_def_data['example']], ANY)
 
         # Verify data in CSV
         data = self.service.get_all_vocabulary()
@@ -62,6 +91,15 @@ class TestVocabularyService(unittest.TestCase):
         self.assertEqual(data[0]['Vietnamese Definition'], f"Vietnamese: {mock_def_data['definition']}")
         self.assertEqual(data[0]['Vietnamese Example'], f"Vietnamese: {mock_def_data['example']}")
 
+    @patch('vocabulary_service.AUDIO_PRESYNTHESIS', True)
+    @patch('vocabulary_service.VocabularyService.get_english_definition',
+           return_value={'definition': 'A fruit', 'example': 'An apple a day'})
+    @patch('vocabulary_service.VocabularyService.translate_batch_to_vietnamese', side_effect=lambda texts, deadline=None: ['vdef', 'vex'])
+    def test_add_word_queues_audio_presynthesis(self, mock_translate, mock_definition):
+        with patch.object(self.service.presynthesizer, 'enqueue_row') as mock_enqueue:
+            self.assertTrue(self.service.add_word("apple"))
+        mock_enqueue.assert_called_once_with(self.service.get_word("apple"))
+
     @patch('vocabulary_service.VocabularyService.get_english_definition')
     def test_add_word_no_definition_found(self, mock_get_english_definition):
         english_word = "unknownword"
@@ -112,7 +150,7 @@ class TestVocabularyService(unittest.TestCase):
 
 
     @patch('vocabulary_service.VocabularyService.get_english_definition', side_effect=Exception("API Error"))
-    @patch('vocabulary_service.VocabularyService.translate_to_vietnamese') # Mock this to prevent call
+    @patch('vocabulary_service.VocabularyService.translate_batch_to_vietnamese') # Mock this to prevent call
     def test_add_word_api_exception(self, mock_translate, mock_get_english_definition):
         english_word = "errorword"
         
@@ -197,6 +235,108 @@ class TestVocabularyService(unittest.TestCase):
         # Current implementation of app.py redirects for empty query, service might return all
         self.assertEqual(len(results), 3) # Assuming it returns all if query is empty at service level
 
+    @patch('vocabulary_service.VocabularyService.get_english_definition')
+    @patch('vocabulary_service.VocabularyService.translate_batch_to_vietnamese')
+    def test_search_index_follows_add_update_delete(self, mock_translate_batch_to_vietnamese, mock_get_english_definition):
+        mock_get_english_definition.return_value = {'definition': 'A round fruit', 'example': 'Oranges are sweet.'}
+        mock_translate_batch_to_vietnamese.side_effect = lambda texts, deadline=None: [f"Vietnamese: {text}" for text in texts]
+
+        self.assertTrue(self.service.add_word("orange"))
+        self.assertEqual([r['English Word'] for r in self.service.search_vocabulary("round")], ["orange"])
+
+        entry = self.service.get_word("orange")
+        entry['English Definition'] = "A citrus fruit"
+        entry['Vietnamese Definition'] = "Vietnamese: A citrus fruit"
+        self.assertTrue(self.service.update_word("orange", entry))
+        self.assertEqual(self.service.search_vocabulary("round"), [])
+        self.assertEqual(len(self.service.search_vocabulary("citrus")), 1)
+
+        self.assertTrue(self.service.delete_word("orange"))
+        self.assertEqual(self.service.search_vocabulary("citrus"), [])
+
+    def test_search_index_picks_up_changes_from_other_workers(self):
+        other = VocabularyService(csv_file=self.test_csv_file, journal=True)
+        service = VocabularyService(csv_file=self.test_csv_file, journal=True)
+        other.store.compact_ratio = service.store.compact_ratio = 10
+        other.store.append(dict(zip(other.headers, ["lemon", "A sour fruit", "Lemon tea", "vdef", "vex"])))
+
+        self.assertEqual([r['English Word'] for r in service.search_vocabulary("sour")], ["lemon"])
+        other.delete_word("lemon")
+        self.assertEqual(service.search_vocabulary("sour"), [])
+
+    def test_search_with_sqlite_storage(self):
+        service = VocabularyService(csv_file=self.test_csv_file, storage='sqlite', db_file=self.test_db_file)
+        service.store.append(dict(zip(service.headers, ["pear", "A sweet fruit", "Pear pie", "vdef", "vex"])))
+        self.assertEqual([r['English Word'] for r in service.search_vocabulary("sweet")], ["pear"])
+
+        # Written by another connection (e.g. another worker)
+        other = SqliteVocabularyStore(self.test_db_file, service.headers)
+        other.append(dict(zip(service.headers, ["plum", "A sweet stone fruit", "Plum jam", "vdef", "vex"])))
+        self.assertEqual([r['English Word'] for r in service.search_vocabulary("sweet")], ["pear", "plum"])
+
+    def test_suggest_words_follows_changes(self):
+        other = VocabularyService(csv_file=self.test_csv_file, journal=True)
+        service = VocabularyService(csv_file=self.test_csv_file, journal=True)
+        other.store.compact_ratio = service.store.compact_ratio = 10
+        for word in ["grape", "Grapefruit", "green"]:
+            other.store.append(dict(zip(other.headers, [word, "def", "ex", "vdef", "vex"])))
+
+        self.assertEqual(service.suggest_words("gr"), ["grape", "Grapefruit", "green"])
+        self.assertEqual(service.suggest_words("GRAP", limit=1), ["grape"])
+        other.delete_word("grape")
+        self.assertEqual(service.suggest_words("grap"), ["Grapefruit"])
+
+    def test_get_vocabulary_page(self):
+        for word in ["pear", "apple", "kiwi"]:
+            self.service.store.append(dict(zip(self.service.headers, [word, "A fruit", "ex", "vdef", "vex"])))
+
+        page, next_cursor, total = self.service.get_vocabulary_page(limit=2)
+        self.assertEqual(([r['English Word'] for r in page], next_cursor, total), (["pear", "apple"], "1\x1fapple", 3))
+        page, next_cursor, total = self.service.get_vocabulary_page(after=next_cursor, limit=2)
+        self.assertEqual(([r['English Word'] for r in page], next_cursor, total), (["kiwi"], None, 3))
+
+        page, next_cursor, _ = self.service.get_vocabulary_page("fruit", limit=2, sort='alphabetical')
+        self.assertEqual(([r['English Word'] for r in page], next_cursor), (["apple", "kiwi"], "kiwi\x1fkiwi"))
+        # Relevance only applies to searches
+        page, _, _ = self.service.get_vocabulary_page(sort='relevance')
+        self.assertEqual([r['English Word'] for r in page], ["pear", "apple", "kiwi"])
+
+    def test_did_you_mean_and_fuzzy_search(self):
+        for word in ["receive", "recipe", "relax"]:
+            self.service.store.append(dict(zip(self.service.headers, [word, "def", "ex", "vdef", "vex"])))
+
+        self.assertEqual(self.service.did_you_mean("recieve"), ["receive", "recipe"])
+        self.assertEqual(self.service.did_you_mean("Receive"), ["recipe"]) # The word itself is not suggested
+        self.assertEqual(self.service.search_vocabulary("recieve"), [])
+        self.assertEqual([r['English Word'] for r in self.service.search_vocabulary_ranked("recieve", fuzzy=True)[0]],
+                         ["receive", "recipe"])
+
+        self.service.delete_word("receive")
+        self.assertEqual(self.service.did_you_mean("recieve"), ["recipe"])
+
+    def test_search_vocabulary_ranked_across_languages(self):
+        rows = [
+            ["language", "A system of communication", "English is a language", "ngôn ngữ", "Tiếng Anh là một ngôn ngữ"],
+            ["English", "The language of England", "She speaks English", "tiếng Anh", "Cô ấy nói tiếng Anh"],
+            ["speak", "To say words", "Speak slowly", "nói", "Nói chậm thôi"]
+        ]
+        with open(self.test_csv_file, 'w', newline='', encoding='utf-8') as file:
+            writer = csv.writer(file)
+            writer.writerow(self.service.headers)
+            writer.writerows(rows)
+
+        # Vietnamese fields are searched, with or without diacritics
+        self.assertEqual({r['English Word'] for r in self.service.search_vocabulary("tieng anh")}, {"language", "English"})
+        self.assertEqual([r['English Word'] for r in self.service.search_vocabulary("nói")], ["speak", "English"])
+
+        # The exact headword ranks first even though other entries mention it more
+        results, total = self.service.search_vocabulary_ranked("english", limit=1)
+        self.assertEqual(total, 2)
+        self.assertEqual([r['English Word'] for r in results], ["English"])
+
+        # Every query word must match when they are not adjacent
+        self.assertEqual([r['English Word'] for r in self.service.search_vocabulary("words slowly")], ["speak"])
+
     def test_delete_word_exists(self):
         rows = [
             ["wordtodelete", "def", "ex", "vdef", "vex"],
@@ -228,32 +368,274 @@ class TestVocabularyService(unittest.TestCase):
         data = self.service.get_all_vocabulary()
         self.assertEqual(len(data), 1) # Should not have changed
 
-    @patch('requests.post')
+    def test_get_all_vocabulary_parses_csv_once(self):
+        rows = [["hello", "greeting", "hello there", "xin chao", "xin chao ban"]]
+        with open(self.test_csv_file, 'w', newline='', encoding='utf-8') as file:
+            writer = csv.writer(file)
+            writer.writerow(self.service.headers)
+            writer.writerows(rows)
+
+        with patch('vocabulary_store.csv.DictReader', wraps=csv.DictReader) as mock_reader:
+            self.service.get_all_vocabulary()
+            self.assertTrue(self.service.word_exists("HELLO"))
+            self.assertEqual(self.service.get_word("hello")['English Definition'], "greeting")
+            self.service.search_vocabulary("greet")
+            self.assertEqual(mock_reader.call_count, 1)
+
+    def test_store_reloads_when_file_changes_on_disk(self):
+        self.assertFalse(self.service.word_exists("later"))
+        with open(self.test_csv_file, 'a', newline='', encoding='utf-8') as file:
+            writer = csv.writer(file)
+            writer.writerow(["later", "def", "ex", "vdef", "vex"])
+
+        self.assertTrue(self.service.word_exists("later"))
+        self.assertEqual(len(self.service.get_all_vocabulary()), 1)
+
+    def test_get_word_returns_copy(self):
+        rows = [["myword", "def", "ex", "vdef", "vex"]]
+        with open(self.test_csv_file, 'w', newline='', encoding='utf-8') as file:
+            writer = csv.writer(file)
+            writer.writerow(self.service.headers)
+            writer.writerows(rows)
+
+        entry = self.service.get_word("MyWord")
+        entry['English Definition'] = "changed"
+        self.assertEqual(self.service.get_word("myword")['English Definition'], "def")
+
+        self.assertTrue(self.service.update_word("myword", entry))
+        self.assertEqual(self.service.get_word("myword")['English Definition'], "changed")
+        with open(self.test_csv_file, 'r', newline='', encoding='utf-8') as file:
+            self.assertEqual(list(csv.DictReader(file))[0]['English Definition'], "changed")
+
+    def test_journal_records_edits_without_rewriting_csv(self):
+        rows = [
+            ["alpha", "def a", "ex a", "vdef a", "vex a"],
+            ["beta", "def b", "ex b", "vdef b", "vex b"],
+            ["gamma", "def c", "ex c", "vdef c", "vex c"]
+        ]
+        with open(self.test_csv_file, 'w', newline='', encoding='utf-8') as file:
+            writer = csv.writer(file)
+            writer.writerow(self.service.headers)
+            writer.writerows(rows)
+        with open(self.test_csv_file, 'rb') as file:
+            original_csv = file.read()
+
+        service = VocabularyService(csv_file=self.test_csv_file, journal=True)
+        service.store.compact_ratio = 10 # Keep the background compactor out of this test
+        entry = service.get_word("beta")
+        entry['English Definition'] = "new def b"
+        self.assertTrue(service.update_word("beta", entry))
+        self.assertTrue(service.delete_word("alpha"))
+
+        with open(self.test_csv_file, 'rb') as file:
+            self.assertEqual(file.read(), original_csv)
+        self.assertEqual(service.get_word("beta")['English Definition'], "new def b")
+
+        # A fresh instance (e.g. another worker) replays the journal on load
+        other = VocabularyService(csv_file=self.test_csv_file, journal=True)
+        self.assertEqual([e['English Word'] for e in other.get_all_vocabulary()], ["beta", "gamma"])
+        self.assertEqual(other.get_word("beta")['English Definition'], "new def b")
+
+        # Export compacts the journal into a fully materialized CSV
+        with open(service.get_csv_path(), 'r', newline='', encoding='utf-8') as file:
+            exported = list(csv.DictReader(file))
+        self.assertEqual([e['English Word'] for e in exported], ["beta", "gamma"])
+        self.assertEqual(exported[0]['English Definition'], "new def b")
+        self.assertEqual(os.path.getsize(self.test_csv_file + '.journal'), 0)
+        self.assertEqual(len(other.get_all_vocabulary()), 2)
+
+    def test_compaction_interrupted_after_csv_swap(self):
+        row = lambda word: dict(zip(self.service.headers, [word, "def", "ex", "vdef", "vex"]))
+        service = VocabularyService(csv_file=self.test_csv_file, journal=True)
+        service.store.compact_ratio = 10 # Keep the background compactor out of this test
+        service.store.append(row("alpha"))
+        service.store.update("alpha", {'English Definition': "new def"})
+        # The process dies after the new CSV replaced the old one, before the journal was shortened
+        with patch('vocabulary_store.write_atomic', side_effect=OSError("killed")):
+            with self.assertRaises(OSError):
+                service.store.compact()
+        with open(self.test_csv_file, 'r', newline='', encoding='utf-8') as file:
+            self.assertEqual([e['English Word'] for e in csv.DictReader(file)], ["alpha"])
+
+        other = VocabularyService(csv_file=self.test_csv_file, journal=True)
+        other.store.compact_ratio = 10
+        self.assertEqual([e['English Word'] for e in other.get_all_vocabulary()], ["alpha"])
+        self.assertEqual(other.get_word("alpha")['English Definition'], "new def")
+        other.store.append(row("beta"))
+        self.assertEqual([e['English Word'] for e in service.get_all_vocabulary()], ["alpha", "beta"])
+        other.store.compact()
+        fresh = VocabularyService(csv_file=self.test_csv_file, journal=True)
+        self.assertEqual([e['English Word'] for e in fresh.get_all_vocabulary()], ["alpha", "beta"])
+        self.assertEqual(os.path.getsize(self.test_csv_file + '.journal'), 0)
+
+    def test_journal_compacts_in_background_past_threshold(self):
+        service = VocabularyService(csv_file=self.test_csv_file, journal=True)
+        service.store.compact_bytes = 1
+        service.store.append(dict(zip(service.headers, ["delta", "def", "ex", "vdef", "vex"])))
+        service.store._compaction_thread.join(timeout=5)
+
+        with open(self.test_csv_file, 'r', newline='', encoding='utf-8') as file:
+            self.assertEqual([e['English Word'] for e in csv.DictReader(file)], ["delta"])
+        self.assertTrue(service.word_exists("delta"))
+
+    def test_insert_many_writes_batch_once(self):
+        row = lambda word: dict(zip(self.service.headers, [word, "def", "ex", "vdef", "vex"]))
+        self.service.store.append(row("alpha"))
+        for journal in (False, True):
+            service = VocabularyService(csv_file=self.test_csv_file, journal=journal)
+            service.store.compact_ratio = 10 # Keep the background compactor out of this test
+            words = ["Alpha", "beta", "BETA"] if not journal else ["beta", "gamma"]
+            with patch('builtins.open', wraps=open) as opened:
+                added = service.store.insert_many([row(word) for word in words], ignore_existing=True)
+            self.assertEqual(added, 1)
+            self.assertEqual(opened.call_count, 1)
+            self.assertTrue(service.word_exists("gamma" if journal else "beta"))
+            self.assertIn("gamma" if journal else "beta", service.suggest_words("gam" if journal else "bet")) # Listeners are notified
+        fresh = VocabularyService(csv_file=self.test_csv_file, journal=True)
+        self.assertEqual([e['English Word'] for e in fresh.get_all_vocabulary()], ["alpha", "beta", "gamma"])
+
+    def test_update_words_writes_once_per_backend(self):
+        row = lambda word: dict(zip(self.service.headers, [word, "def", "ex", "vdef", "vex"]))
+        for options in ({'journal': False}, {'journal': True}, {'storage': 'sqlite', 'db_file': self.test_db_file}):
+            service = VocabularyService(csv_file=self.test_csv_file, **options)
+            if options.get('journal'):
+                service.store.compact_ratio = 10 # Keep the background compactor out of this test
+            service.store.insert_many([row("alpha"), row("beta")], ignore_existing=True)
+            writer = 'builtins.open' if options.get('journal') else 'vocabulary_store.write_csv' # The journal is appended to
+            with patch(writer, wraps=open if options.get('journal') else write_csv) as written:
+                updated = service.update_words({"ALPHA": {'English Definition': f"new {options}"},
+                                                "beta": {'Vietnamese Example': "mới"}, "missing": {'English Example': "x"}})
+            self.assertEqual(updated, 2)
+            if 'storage' not in options:
+                self.assertEqual(written.call_count, 1)
+            self.assertEqual(service.get_word("alpha")['English Definition'], f"new {options}")
+            self.assertEqual(service.get_word("beta")['Vietnamese Example'], "mới")
+            self.assertEqual([word['English Word'] for word in service.search_vocabulary("mới")], ["beta"]) # Listeners are notified
+
+    def test_refresh_words_batches_lookups_translations_and_writes(self):
+        row = lambda word: dict(zip(self.service.headers, [word, "old def", "old ex", "cũ", "cũ"]))
+        self.service.store.insert_many([row("alpha"), row("beta")])
+        definitions = {'alpha': {'definition': "New alpha.", 'example': "An alpha."}, 'beta': {'definition': "New beta.", 'example': ""}}
+        with patch.object(self.service, 'get_english_definition', side_effect=lambda word: definitions[word.casefold()]) as lookup, \
+             patch.object(self.service, 'translate_batch_to_vietnamese', side_effect=lambda texts, deadline: [f"vi {text}" for text in texts[:-1]] + ["[Translation failed for: x]"]) as translate, \
+             patch.object(self.service.store, 'update_many', wraps=self.service.store.update_many) as write:
+            results = self.service.refresh_words([("Alpha", ['definition', 'example', 'vietnamese_definition', 'vietnamese_example']),
+                                                  ("beta", ['example', 'vietnamese_definition', 'vietnamese_example', 'bogus']),
+                                                  ("missing", ['definition'])])
+        self.assertEqual(lookup.call_count, 2) # One lookup per word, whatever the number of English columns
+        translate.assert_called_once_with(["New alpha.", "An alpha.", "old def", "old ex"], ANY)
+        write.assert_called_once()
+        self.assertEqual(results[0], {'definition': {'success': True, 'content': "New alpha."},
+                                      'example': {'success': True, 'content': "An alpha."},
+                                      'vietnamese_definition': {'success': True, 'content': "vi New alpha."},
+                                      'vietnamese_example': {'success': True, 'content': "vi An alpha."}})
+        self.assertEqual([column for column, cell in results[1].items() if cell['success']], ['vietnamese_definition'])
+        self.assertEqual(results[1]['bogus']['message'], "Unknown column 'bogus'")
+        self.assertEqual(results[2], {'definition': {'success': False, 'message': 'Word not found'}})
+        self.assertEqual(self.service.get_word("alpha")['Vietnamese Example'], "vi An alpha.")
+        self.assertEqual(self.service.get_word("beta"), dict(row("beta"), **{'Vietnamese Definition': "vi old def"})) # Failures are not stored
+
+    def test_insert_if_absent_across_processes(self):
+        words_per_process = [["shared", f"word{i}"] for i in range(4)]
+        with multiprocessing.get_context('fork').Pool(4) as pool:
+            results = pool.starmap(_insert_words_in_process,
+                                   [(self.test_csv_file, self.service.headers, words) for words in words_per_process])
+
+        self.assertEqual(sum(result[0] for result in results), 1) # Only one process added "shared"
+        self.assertTrue(all(result[1] for result in results))
+        words = [e['English Word'] for e in self.service.get_all_vocabulary()]
+        self.assertEqual(words.count("shared"), 1)
+        self.assertEqual(len(words), 5)
+
+    @patch('vocabulary_service.VocabularyService.get_english_definition')
+    @patch('vocabulary_service.VocabularyService.translate_batch_to_vietnamese')
+    def test_add_word_if_absent(self, mock_translate_batch_to_vietnamese, mock_get_english_definition):
+        mock_get_english_definition.return_value = {'definition': 'A greeting', 'example': 'She said hello.'}
+        mock_translate_batch_to_vietnamese.side_effect = lambda texts, deadline=None: [f"Vietnamese: {text}" for text in texts]
+
+        self.assertTrue(self.service.add_word("hello", if_absent=True))
+        self.assertFalse(self.service.add_word("Hello", if_absent=True))
+        self.assertEqual(len(self.service.get_all_vocabulary()), 1)
+
+    def test_rewrite_replaces_file_atomically(self):
+        rows = [["one", "def", "ex", "vdef", "vex"], ["two", "def", "ex", "vdef", "vex"]]
+        with open(self.test_csv_file, 'w', newline='', encoding='utf-8') as file:
+            writer = csv.writer(file)
+            writer.writerow(self.service.headers)
+            writer.writerows(rows)
+        inode_before = os.stat(self.test_csv_file).st_ino
+
+        with patch('vocabulary_store.os.replace', wraps=os.replace) as mock_replace:
+            self.assertTrue(self.service.delete_word("one"))
+            mock_replace.assert_called_once()
+        self.assertNotEqual(os.stat(self.test_csv_file).st_ino, inode_before)
+        self.assertEqual([e['English Word'] for e in self.service.get_all_vocabulary()], ["two"])
+        self.assertEqual([name for name in os.listdir('.') if name.endswith('.tmp')], [])
+
+    def test_sqlite_storage_crud(self):
+        service = VocabularyService(csv_file=self.test_csv_file, storage='sqlite', db_file=self.test_db_file)
+        with patch.object(service, 'get_english_definition', return_value={'definition': 'A greeting', 'example': 'Hello there.'}), \
+             patch.object(service, 'translate_batch_to_vietnamese', side_effect=lambda texts, deadline=None: [f"vi: {text}" for text in texts]):
+            self.assertTrue(service.add_word("Hello"))
+            self.assertFalse(service.add_word("HELLO")) # Unique, case-insensitive index
+
+        self.assertTrue(service.word_exists("hello"))
+        entry = service.get_word("hELLo")
+        self.assertEqual(entry['Vietnamese Definition'], "vi: A greeting")
+
+        entry['English Example'] = "Hello, world."
+        self.assertTrue(service.update_word("hello", entry))
+        self.assertEqual(service.get_word("hello")['English Example'], "Hello, world.")
+        self.assertFalse(service.update_word("missing", entry))
+
+        with open(service.get_csv_path(), 'r', newline='', encoding='utf-8') as file:
+            exported = list(csv.DictReader(file))
+        self.assertEqual([e['English Word'] for e in exported], ["Hello"])
+
+        self.assertTrue(service.delete_word("HELLO"))
+        self.assertFalse(service.delete_word("hello"))
+        self.assertEqual(service.get_all_vocabulary(), [])
+
+    def test_sqlite_import_csv_skips_duplicates(self):
+        rows = [
+            ["apple", "A fruit", "An apple a day", "qua tao", "Mot qua tao moi ngay"],
+            ["Apple", "Duplicate", "Duplicate", "trung", "trung"],
+            ["banana", "A yellow fruit", "Banana split", "qua chuoi", "Kem chuoi"]
+        ]
+        with open(self.test_csv_file, 'w', newline='', encoding='utf-8') as file:
+            writer = csv.writer(file)
+            writer.writerow(self.service.headers)
+            writer.writerows(rows)
+
+        store = SqliteVocabularyStore(self.test_db_file, self.service.headers)
+        self.assertEqual(store.import_csv(self.test_csv_file), (2, 1))
+        self.assertEqual(store.import_csv(self.test_csv_file), (0, 3)) # Re-running is harmless
+
+        service = VocabularyService(csv_file=self.test_csv_file, storage='sqlite', db_file=self.test_db_file)
+        self.assertEqual([e['English Word'] for e in service.get_all_vocabulary()], ["apple", "banana"])
+        self.assertEqual(service.get_word("APPLE")['English Definition'], "A fruit")
+
+    @patch('requests.Session.post')
     def test_get_english_definition_google_translate_success(self, mock_post):
         word = "example"
-        # Mock Google Translate API response for definition prompt
-        mock_response_def = MagicMock()
-        mock_response_def.status_code = 200
-        mock_response_def.json.return_value = {
-            'data': {'translations': [{'translatedText': 'A representative instance'}]}
-        }
-        # Mock Google Translate API response for example prompt
-        mock_response_ex = MagicMock()
-        mock_response_ex.status_code = 200
-        mock_response_ex.json.return_value = {
-            'data': {'translations': [{'translatedText': f'This is an example of {word}.'}]}
+        # Mock Google Translate API response for the definition and example prompts, sent in one request
+        mock_response = MagicMock()
+        mock_response.status_code = 200
+        mock_response.json.return_value = {
+            'data': {'translations': [{'translatedText': 'A representative instance'},
+                                      {'translatedText': f'This is an example of {word}.'}]}
         }
-        mock_post.side_effect = [mock_response_def, mock_response_ex]
+        mock_post.return_value = mock_response
 
         result = self.service.get_english_definition(word)
 
         self.assertIsNotNone(result)
         self.assertIn('A representative instance', result['definition'])
         self.assertIn(f'This is an example of {word}', result['example'])
-        self.assertEqual(mock_post.call_count, 2)
+        self.assertEqual(mock_post.call_count, 1)
 
-    @patch('requests.post') # For Google Translate
-    @patch('requests.get')  # For Dictionary API
+    @patch('requests.Session.post') # For Google Translate
+    @patch('requests.Session.get')  # For Dictionary API
     def test_get_english_definition_google_fail_fallback_success(self, mock_get, mock_post):
         word = "fallback"
         # Mock Google Translate API failure (e.g., by returning non-200 or error structure)
@@ -281,10 +663,28 @@ class TestVocabularyService(unittest.TestCase):
         self.assertEqual(result['definition'], 'Fallback definition')
         self.assertEqual(result['example'], 'Fallback example')
         mock_post.assert_called() # Google Translate was attempted
-        mock_get.assert_called_once_with(f"https://api.dictionaryapi.dev/api/v2/entries/en/{word.lower()}", timeout=10)
+        mock_get.assert_called_once_with(f"https://api.dictionaryapi.dev/api/v2/entries/en/{word.lower()}", timeout=self.service.http['dictionary'].timeout)
+
+    @patch('requests.Session.get')
+    def test_dictionary_lookups_are_cached(self, mock_get):
+        found = MagicMock(status_code=200)
+        found.json.return_value = [{'meanings': [{'definitions': [{'definition': 'A fruit', 'example': 'An apple a day'}]}]}]
+        not_found = MagicMock()
+        not_found.raise_for_status.side_effect = requests.exceptions.HTTPError(response=MagicMock(status_code=404))
+        mock_get.side_effect = [found, not_found]
 
-    @patch('requests.post', side_effect=Exception("Network Error")) # Google Translate fails
-    @patch('requests.get', side_effect=Exception("Network Error"))  # Dictionary API fails
+        for _ in range(2):
+            self.assertEqual(self.service._get_fallback_definition("Apple"), {'definition': 'A fruit', 'example': 'An apple a day'})
+            self.assertIsNone(self.service._get_fallback_definition("xyzzy"))
+        self.assertEqual(mock_get.call_count, 2)
+
+        # The cache is on disk, so other workers share it
+        other = VocabularyService(csv_file=self.test_csv_file)
+        self.assertEqual(other._get_fallback_definition("apple")['definition'], 'A fruit')
+        self.assertEqual(mock_get.call_count, 2)
+
+    @patch('requests.Session.post', side_effect=Exception("Network Error")) # Google Translate fails
+    @patch('requests.Session.get', side_effect=Exception("Network Error"))  # Dictionary API fails
     def test_get_english_definition_all_fail(self, mock_get, mock_post):
         word = "totalfailure"
         result = self.service.get_english_definition(word)
@@ -292,7 +692,7 @@ class TestVocabularyService(unittest.TestCase):
         mock_post.assert_called()
         mock_get.assert_called()
 
-    @patch('requests.post')
+    @patch('requests.Session.post')
     def test_translate_to_vietnamese_google_success(self, mock_post):
         text = "Hello"
         mock_response = MagicMock()
@@ -306,7 +706,144 @@ class TestVocabularyService(unittest.TestCase):
         self.assertEqual(translation, 'Xin chào')
         mock_post.assert_called_once()
 
-    @patch('requests.post') # Google API
+    @patch('requests.Session.post')
+    def test_translations_are_remembered(self, mock_post):
+        mock_response = MagicMock(status_code=200)
+        mock_response.json.return_value = {'data': {'translations': [{'translatedText': 'Xin chào'}]}}
+        mock_post.return_value = mock_response
+
+        self.assertEqual(self.service.translate_to_vietnamese("Hello"), 'Xin chào')
+        self.assertEqual(self.service.translate_to_vietnamese("Hello"), 'Xin chào')
+        mock_post.assert_called_once()
+        # Shared with other workers through the persistent cache
+        self.assertEqual(VocabularyService(csv_file=self.test_csv_file).translate_to_vietnamese("Hello"), 'Xin chào')
+        mock_post.assert_called_once()
+        self.assertEqual(self.service.get_cache_stats()['translations']['memory_hits'], 1)
+
+    @patch('requests.Session.post')
+    def test_translate_batch_with_google_chunks_requests(self, mock_post):
+        def respond(url, data, timeout):
+            response = MagicMock(status_code=200)
+            segments = [value for name, value in data if name == 'q']
+            response.json.return_value = {'data': {'translations': [{'translatedText': f"vi {text}"} for text in segments]}}
+            return response
+        mock_post.side_effect = respond
+
+        texts = [f"text {i}" for i in range(130)] + ["text 0", ""]
+        translations = self.service.translate_batch_with_google(texts, target_language='vi', source_language='en')
+        self.assertEqual(translations, [f"vi {text}" if text else "" for text in texts])
+        # 130 distinct segments need two requests of at most 128 segments
+        self.assertEqual(mock_post.call_count, 2)
+        self.assertEqual([len([1 for name, _ in call[1]['data'] if name == 'q']) for call in mock_post.call_args_list], [128, 2])
+
+        # Remembered segments are not sent again
+        self.service.translate_batch_with_google(["text 1", "new"], target_language='vi', source_language='en')
+        self.assertEqual([value for name, value in mock_post.call_args[1]['data'] if name == 'q'], ["new"])
+
+    @patch('requests.Session.post')
+    @patch('googletrans.Translator.translate')
+    def test_translate_batch_to_vietnamese_falls_back_per_segment(self, mock_googletrans_translate, mock_post):
+        mock_response = MagicMock(status_code=200)
+        mock_response.json.return_value = {'data': {'translations': [{'translatedText': 'Xin chào'}, {'translatedText': ''}]}}
+        mock_post.return_value = mock_response
+        mock_googletrans_translate.return_value = MagicMock(text='Tạm biệt')
+
+        self.assertEqual(self.service.translate_batch_to_vietnamese(["Hello", "Goodbye", ""]),
+                         ['Xin chào', 'Tạm biệt', "(No text provided for translation)"])
+        mock_post.assert_called_once()
+        mock_googletrans_translate.assert_called_once_with("Goodbye", src='en', dest='vi')
+
+    @patch('googletrans.Translator.translate')
+    def test_googletrans_fallbacks_run_in_parallel(self, mock_googletrans_translate):
+        barrier = threading.Barrier(2, timeout=5) # Both segments must be in flight at the same time
+        def translate(text, src, dest):
+            barrier.wait()
+            return MagicMock(text=f"vi {text}")
+        mock_googletrans_translate.side_effect = translate
+        self.service.api_key = None
+
+        self.assertEqual(self.service.translate_batch_to_vietnamese(["one", "two"]), ["vi one", "vi two"])
+
+    def test_add_word_gives_up_after_deadline(self):
+        release = threading.Event()
+        def slow_definition(word):
+            release.wait(5)
+            return {'definition': 'Slow', 'example': 'Slow example'}
+        with patch.object(self.service, 'get_english_definition', side_effect=slow_definition), \
+             patch('vocabulary_service.ADD_WORD_DEADLINE', 0.05):
+            self.assertFalse(self.service.add_word("slow"))
+        release.set()
+        self.assertEqual(self.service.get_all_vocabulary(), [])
+
+    def test_run_parallel_runs_nested_calls_inline(self):
+        nested = lambda: self.service._run_parallel([threading.current_thread, threading.current_thread])
+        outer_thread, (first, second) = self.service._run_parallel([threading.current_thread, nested])
+        self.assertNotEqual(outer_thread, threading.current_thread())
+        self.assertEqual(first, second) # Same pool thread, so the pool cannot deadlock
+
+    @patch('requests.Session.post', side_effect=requests.exceptions.ConnectionError("down"))
+    @patch('googletrans.Translator.translate', side_effect=Exception("down"))
+    def test_failed_translations_are_not_remembered(self, mock_translate, mock_post):
+        self.assertTrue(self.service.translate_to_vietnamese("Goodbye").startswith("[Translation failed"))
+        self.service.translate_to_vietnamese("Goodbye")
+        self.assertEqual(mock_post.call_count, 2)
+        self.assertEqual(mock_translate.call_count, 2)
+
+    @patch('requests.Session.post', side_effect=requests.exceptions.ConnectTimeout("slow"))
+    @patch('requests.Session.get', side_effect=requests.exceptions.ConnectTimeout("slow"))
+    def test_open_circuits_skip_to_the_next_fallback(self, mock_get, mock_post):
+        for _ in range(5):
+            self.service._get_fallback_definition(f"word{_}")
+        self.assertEqual(self.service.get_provider_status()['dictionary']['circuit']['state'], 'open')
+        mock_get.reset_mock()
+        self.assertIsNone(self.service.get_english_definition("apple")) # Goes straight to Google
+        mock_get.assert_not_called()
+        mock_post.assert_called_once()
+
+        with patch('googletrans.Translator.translate', side_effect=Exception("down")) as mock_translate:
+            for _ in range(5):
+                self.service._translate_with_googletrans(f"text{_}")
+            mock_translate.reset_mock()
+            self.assertTrue(self.service._translate_with_googletrans("Hello").startswith("[Translation failed"))
+            mock_translate.assert_not_called()
+        status = self.service.get_provider_status()['googletrans']
+        self.assertEqual((status['circuit']['state'], status['circuit']['rejected']), ('open', 1))
+        self.assertEqual(status['rate_limit']['acquired'], 5)
+
+    @patch('vocabulary_service.TRANSLATION_HEDGE', True)
+    def test_hedged_translation_races_slow_google(self):
+        self.service.google_translate_latency.default = 0.05 # Hedging delay until enough latencies are recorded
+        google_done = threading.Event()
+        def slow_google(texts, target_language='en', source_language=None):
+            google_done.wait(5)
+            return [f"google {text}" for text in texts]
+        with patch.object(self.service, 'translate_batch_with_google', side_effect=slow_google), \
+             patch('googletrans.Translator.translate', side_effect=lambda text, src, dest: MagicMock(text=f"gt {text}")):
+            self.assertEqual(self.service.translate_batch_to_vietnamese(["Hello", "", "World"]),
+                             ["gt Hello", "(No text provided for translation)", "gt World"])
+        google_done.set()
+        stats = self.service.get_hedge_stats()
+        self.assertEqual((stats['batches'], stats['hedged'], stats['hedge_wins'], stats['primary_wins']), (1, 1, 2, 0))
+
+        # A prompt answer is used without starting the fallback
+        with patch.object(self.service, 'translate_batch_with_google', side_effect=lambda texts, **kwargs: [f"google {t}" for t in texts]), \
+             patch('googletrans.Translator.translate') as mock_fallback:
+            self.assertEqual(self.service.translate_batch_to_vietnamese(["Hi"]), ["google Hi"])
+            mock_fallback.assert_not_called()
+        self.assertEqual(self.service.get_hedge_stats()['primary_wins'], 1)
+
+    @patch('vocabulary_service.TRANSLATION_HEDGE', True)
+    def test_hedged_translation_keeps_google_result_when_fallback_fails(self):
+        self.service.google_translate_latency.default = 0
+        def slow_google(texts, target_language='en', source_language=None):
+            time.sleep(0.1)
+            return [f"google {text}" for text in texts]
+        with patch.object(self.service, 'translate_batch_with_google', side_effect=slow_google), \
+             patch('googletrans.Translator.translate', side_effect=Exception("down")):
+            self.assertEqual(self.service.translate_batch_to_vietnamese(["Hello"]), ["google Hello"])
+        self.assertEqual(self.service.get_hedge_stats()['hedged'], 1)
+
+    @patch('requests.Session.post') # Google API
     @patch('googletrans.Translator.translate') # Fallback library
     def test_translate_to_vietnamese_google_fail_fallback_success(self, mock_googletrans_translate, mock_post):
         text = "Goodbye"
@@ -325,7 +862,7 @@ class TestVocabularyService(unittest.TestCase):
         mock_post.assert_called_once()
         mock_googletrans_translate.assert_called_once_with(text, src='en', dest='vi')
 
-    @patch('requests.post', side_effect=Exception("API Error"))
+    @patch('requests.Session.post', side_effect=Exception("API Error"))
     @patch('googletrans.Translator.translate', side_effect=Exception("Translator Error"))
     def test_translate_to_vietnamese_all_fail(self, mock_googletrans_translate, mock_post):
         text = "Error text"
@@ -347,17 +884,17 @@ class TestVocabularyService(unittest.TestCase):
                 self.assertEqual(translation, "Xin chào từ fallback")
                 mock_fallback_translate.assert_called_once_with("Hello from no key", src='en', dest='vi')
 
-    @patch('requests.post')
+    @patch('requests.Session.post')
     def test_generate_audio_success(self, mock_post):
         text = "Audio Test"
         language = "en"
         mock_response = MagicMock()
         mock_response.status_code = 200
-        mock_response.json.return_value = {'audioContent': 'base64audiocontent'}
+        mock_response.json.return_value = {'audioContent': 'YmFzZTY0YXVkaW8='}
         mock_post.return_value = mock_response
 
         audio = self.service.generate_audio(text, language)
-        self.assertEqual(audio, 'base64audiocontent')
+        self.assertEqual(audio, 'YmFzZTY0YXVkaW8=')
         mock_post.assert_called_once()
         # Optionally, assert details of the request payload to Google TTS API
         called_url = mock_post.call_args[0][0]
@@ -366,7 +903,7 @@ class TestVocabularyService(unittest.TestCase):
         self.assertEqual(called_json['input']['text'], text)
         self.assertEqual(called_json['voice']['languageCode'], 'en-US')
 
-    @patch('requests.post')
+    @patch('requests.Session.post')
     def test_generate_audio_api_fail(self, mock_post):
         text = "Audio Fail"
         language = "en"
@@ -378,6 +915,115 @@ class TestVocabularyService(unittest.TestCase):
         self.assertIsNone(audio)
         mock_post.assert_called_once()
 
+    @patch('requests.Session.post')
+    def test_get_audio_caches_files_by_content(self, mock_post):
+        mock_response = MagicMock(status_code=200)
+        mock_response.json.return_value = {'audioContent': base64.b64encode(b'mp3 data').decode()}
+        mock_post.return_value = mock_response
+
+        key = self.service.get_audio("Hello", "en")
+        self.assertEqual(self.service.get_audio("Hello", "en"), key)
+        mock_post.assert_called_once()
+        with open(self.service.audio_file_path(key), 'rb') as file:
+            self.assertEqual(file.read(), b'mp3 data')
+
+        # Different voice settings give a different file
+        self.assertNotEqual(self.service.get_audio("Hello", "vi"), key)
+        self.assertEqual(mock_post.call_count, 2)
+        self.assertIsNone(self.service.get_audio("Hello", "en", "browser"))
+        self.assertIsNone(self.service.audio_file_path("../" + key))
+
+    @patch('requests.Session.post')
+    def test_stream_audio_relays_chunks_and_caches_complete_streams(self, mock_post):
+        self.service.elevenlabs_api_key = "test_elevenlabs_key"
+        mock_response = MagicMock(status_code=200)
+        mock_response.iter_content.return_value = iter([b'chunk1', b'', b'chunk2'])
+        mock_post.return_value = mock_response
+
+        key, chunks = self.service.stream_audio("A long example sentence", "en")
+        self.assertTrue(mock_post.call_args[0][0].endswith('/stream'))
+        self.assertTrue(mock_post.call_args[1]['stream'])
+        self.assertIsNone(self.service.audio_file_path(key)) # Not cached before the stream completes
+        self.assertEqual(list(chunks), [b'chunk1', b'chunk2'])
+        with open(self.service.audio_file_path(key), 'rb') as file:
+            self.assertEqual(file.read(), b'chunk1chunk2')
+        self.assertEqual(self.service.stream_audio("A long example sentence", "en"), (key, None))
+        mock_post.assert_called_once()
+
+        # A stream abandoned by the client leaves nothing behind
+        mock_response.iter_content.return_value = iter([b'chunk1', b'chunk2'])
+        key, chunks = self.service.stream_audio("Another sentence", "en")
+        next(chunks)
+        chunks.close()
+        self.assertIsNone(self.service.audio_file_path(key))
+        self.assertEqual(os.listdir(os.path.join(self.cache_dir, 'audio')), [f"{self.service.audio_cache_key('A long example sentence', 'en', 'elevenlabs')}.mp3"])
+
+    @patch('requests.Session.post')
+    def test_truncated_audio_streams_are_not_cached(self, mock_post):
+        self.service.elevenlabs_api_key = "test_elevenlabs_key"
+        breaker = self.service.circuit_breakers['elevenlabs']
+        audio_dir = os.path.join(self.cache_dir, 'audio')
+
+        def broken_stream(chunk_size):
+            yield b'chunk1'
+            raise requests.exceptions.ChunkedEncodingError("connection reset")
+        mock_response = MagicMock(status_code=200, headers={})
+        mock_response.iter_content.side_effect = broken_stream
+        mock_post.return_value = mock_response
+        key, chunks = self.service.stream_audio("A broken sentence", "en")
+        self.assertEqual(list(chunks), [b'chunk1'])
+        self.assertIsNone(self.service.audio_file_path(key))
+        self.assertEqual(os.listdir(audio_dir), [])
+        self.assertEqual(breaker.stats()['consecutive_failures'], 1)
+
+        # A stream that ends early without an error is just as incomplete
+        mock_response = MagicMock(status_code=200, headers={'Content-Length': '12'})
+        mock_response.iter_content.return_value = iter([b'chunk1'])
+        mock_post.return_value = mock_response
+        key, chunks = self.service.stream_audio("A short sentence", "en")
+        self.assertEqual(list(chunks), [b'chunk1'])
+        self.assertIsNone(self.service.audio_file_path(key))
+        self.assertEqual(os.listdir(audio_dir), [])
+        self.assertEqual(breaker.stats()['consecutive_failures'], 1) # The request itself succeeded, the stream did not
+
+    @patch('requests.Session.post', side_effect=requests.exceptions.ConnectionError("down"))
+    def test_stream_audio_failure(self, mock_post):
+        self.service.elevenlabs_api_key = "test_elevenlabs_key"
+        self.assertEqual(self.service.stream_audio("Hello", "en"), (None, None))
+        self.assertEqual(self.service.stream_audio("Hello", "en", "browser"), (None, None))
+
+    @patch('vocabulary_service.VocabularyService._get_fallback_definition')
+    def test_offline_dictionary_answers_before_the_network(self, mock_dictionary_api):
+        source_file = os.path.join(self.cache_dir, 'dictionary.tsv')
+        with open(source_file, 'w', encoding='utf-8') as file:
+            file.write("Tasty\tHaving a pleasant flavour.\tThe soup was tasty.\nbare\tWithout clothes.\t\n")
+        with patch('vocabulary_service.OFFLINE_DICTIONARY_FILE', source_file):
+            service = VocabularyService(csv_file=self.test_csv_file)
+        self.assertEqual(service.get_english_definition("tasty"),
+                         {'definition': 'Having a pleasant flavour.', 'example': 'The soup was tasty.'})
+        mock_dictionary_api.assert_not_called()
+        # Entries without an example, and unknown words, go on to the online providers
+        mock_dictionary_api.return_value = {'definition': 'Uncovered.', 'example': 'Bare feet.'}
+        self.assertEqual(service.get_english_definition("bare")['example'], 'Bare feet.')
+        self.assertEqual(service.get_english_definition("unknown")['example'], 'Bare feet.')
+        self.assertEqual(mock_dictionary_api.call_count, 2)
+        self.assertEqual(service.get_cache_stats()['offline_dictionary'], {'hits': 2, 'misses': 1, 'entries': 2, 'loaded': 1})
+
+    def test_concurrent_identical_audio_requests_synthesize_once(self):
+        release = threading.Event()
+        def slow_synthesis(text, language, service):
+            release.wait(5)
+            return b'mp3 data'
+        with patch.object(self.service, '_synthesize_audio', side_effect=slow_synthesis) as mock_synthesize:
+            with ThreadPoolExecutor(max_workers=4) as pool:
+                futures = [pool.submit(self.service.get_audio, "Hello", "en") for _ in range(4)]
+                while self.service.get_cache_stats()['single_flight']['coalesced'] < 3:
+                    time.sleep(0.01)
+                release.set()
+                keys = {future.result() for future in futures}
+        self.assertEqual(len(keys), 1)
+        mock_synthesize.assert_called_once()
+
     def test_generate_audio_no_api_key(self):
         # Temporarily remove API key for this test
         with patch.dict(os.environ, {"GOOGLE_CLOUD_API_KEY": ""}):
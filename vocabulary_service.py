@@ -1,14 +1,29 @@
 import csv
 import os
+import re
+import json
 import requests
 import logging
 from googletrans import Translator
 import time
-from typing import List, Dict, Optional
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Any, Callable, Iterator, List, Dict, Optional, Tuple
 from google.cloud import translate_v2 as translate
 from google.cloud import texttospeech
 import base64
+import hashlib
+import tempfile
 from dotenv import load_dotenv
+from vocabulary_store import VocabularyStore, CsvVocabularyStore, SqliteVocabularyStore, write_atomic
+from search_index import FullTextIndex, PrefixIndex, FuzzyIndex
+from lookup_cache import PersistentCache, TieredCache
+from http_client import ProviderClient
+from resilience import TokenBucket, CircuitBreaker, LatencyTracker, SingleFlight
+from audio_presynthesis import AudioPresynthesizer
+from offline_dictionary import OfflineDictionary
+from add_word_jobs import AddWordJobQueue
+from quality_scan import TRANSLATION_SOURCES, fetch_replacements, is_placeholder
 
 # Load environment variables from .env file
 load_dotenv()
@@ -19,14 +34,92 @@ logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(
 # Check if running on Vercel (Vercel sets this env var to '1')
 IS_VERCEL = os.environ.get('VERCEL') == '1'
 
+# Dictionary lookups are cached on disk: found words for DICTIONARY_CACHE_TTL seconds,
+# words the API does not know (404) for DICTIONARY_CACHE_NEGATIVE_TTL seconds.
+DICTIONARY_CACHE_TTL = float(os.environ.get('DICTIONARY_CACHE_TTL', 30 * 24 * 3600))
+DICTIONARY_CACHE_NEGATIVE_TTL = float(os.environ.get('DICTIONARY_CACHE_NEGATIVE_TTL', 24 * 3600))
+DICTIONARY_CACHE_SIZE = int(os.environ.get('DICTIONARY_CACHE_SIZE', 10000))
+# Dictionary consulted before any network provider; its index is built into the cache directory.
+# Defaults to the bundled seed file; point it at a full word list in production, or set it empty to turn it off.
+OFFLINE_DICTIONARY_FILE = os.environ.get('OFFLINE_DICTIONARY_FILE', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'dictionary.tsv'))
+# Successful translations are remembered on disk (TRANSLATION_CACHE_TTL seconds, at most
+# TRANSLATION_CACHE_SIZE entries) and in each process (TRANSLATION_MEMORY_SIZE entries).
+TRANSLATION_CACHE_TTL = float(os.environ.get('TRANSLATION_CACHE_TTL', 90 * 24 * 3600))
+TRANSLATION_CACHE_SIZE = int(os.environ.get('TRANSLATION_CACHE_SIZE', 50000))
+TRANSLATION_MEMORY_SIZE = int(os.environ.get('TRANSLATION_MEMORY_SIZE', 1024))
+# Synthesized audio is stored in <cache dir>/audio/<key>.mp3, where the key is a SHA-256 hex digest.
+AUDIO_KEY_PATTERN = re.compile(r'[0-9a-f]{64}')
+# Size of the audio chunks relayed from a streaming TTS response to the client.
+AUDIO_STREAM_CHUNK_SIZE = 16 * 1024
+# Audio of newly added words is synthesized in the background (AUDIO_PRESYNTHESIS=0 turns this off)
+# for the AUDIO_PRESYNTHESIS_SERVICES TTS services, by AUDIO_PRESYNTHESIS_WORKERS threads.
+AUDIO_PRESYNTHESIS = os.environ.get('AUDIO_PRESYNTHESIS', '1') == '1'
+AUDIO_PRESYNTHESIS_SERVICES = os.environ.get('AUDIO_PRESYNTHESIS_SERVICES', 'google').split(',')
+AUDIO_PRESYNTHESIS_WORKERS = int(os.environ.get('AUDIO_PRESYNTHESIS_WORKERS', 2))
+
+# Limits per Google Cloud Translation v2 request: number of `q` segments and total characters.
+GOOGLE_TRANSLATE_MAX_SEGMENTS = 128
+GOOGLE_TRANSLATE_MAX_CHARS = 5000
+
+# Upstream HTTP calls: connections kept alive per provider, and retries of 429/5xx responses and connection errors.
+HTTP_POOL_SIZE = int(os.environ.get('HTTP_POOL_SIZE', 10))
+HTTP_MAX_RETRIES = int(os.environ.get('HTTP_MAX_RETRIES', 2))
+HTTP_CONNECT_TIMEOUT = float(os.environ.get('HTTP_CONNECT_TIMEOUT', 3.05))
+# Requests per second allowed to each provider by this process (`<PROVIDER>_RATE_LIMIT`, 0 = unlimited).
+RATE_LIMITS = {name: float(os.environ.get(f'{name.upper()}_RATE_LIMIT', default))
+               for name, default in (('dictionary', 10), ('google_translate', 20), ('googletrans', 5),
+                                     ('google_tts', 10), ('elevenlabs', 2))}
+# A provider's circuit opens after CIRCUIT_FAILURE_THRESHOLD consecutive failed calls; it is then
+# skipped (callers use their fallback) for CIRCUIT_RECOVERY_TIMEOUT seconds before one probe call.
+CIRCUIT_FAILURE_THRESHOLD = int(os.environ.get('CIRCUIT_FAILURE_THRESHOLD', 5))
+CIRCUIT_RECOVERY_TIMEOUT = float(os.environ.get('CIRCUIT_RECOVERY_TIMEOUT', 30))
+
+# Identical concurrent upstream calls (definitions, translations, audio) run once per worker; with
+# SINGLE_FLIGHT_SHARED=1 they are also serialized across workers, which then share the cached result.
+SINGLE_FLIGHT_SHARED = os.environ.get('SINGLE_FLIGHT_SHARED') == '1'
+
+# Hedged Vietnamese translation (TRANSLATION_HEDGE=1): if Google has not answered after the
+# TRANSLATION_HEDGE_PERCENTILE percentile of its recent response times (TRANSLATION_HEDGE_DELAY
+# seconds until enough responses were seen), googletrans is started in parallel and the first
+# acceptable translation of each segment wins.
+TRANSLATION_HEDGE = os.environ.get('TRANSLATION_HEDGE') == '1'
+TRANSLATION_HEDGE_PERCENTILE = float(os.environ.get('TRANSLATION_HEDGE_PERCENTILE', 95))
+TRANSLATION_HEDGE_DELAY = float(os.environ.get('TRANSLATION_HEDGE_DELAY', 1.0))
+
+# Independent upstream calls (e.g. googletrans fallbacks for several segments) run on a shared pool
+# of PIPELINE_WORKERS threads. Adding a word gives up after ADD_WORD_DEADLINE seconds.
+PIPELINE_WORKERS = int(os.environ.get('PIPELINE_WORKERS', 8))
+ADD_WORD_DEADLINE = float(os.environ.get('ADD_WORD_DEADLINE', 30))
+# Refreshable columns (as named by the page) and the vocabulary fields they hold.
+REFRESH_COLUMNS = {'definition': 'English Definition', 'example': 'English Example',
+                   'vietnamese_definition': 'Vietnamese Definition', 'vietnamese_example': 'Vietnamese Example'}
+
+# Background add_word jobs: threads per worker, how long job records are kept, and after how many
+# seconds without progress a queued or running job no longer blocks resubmitting the word.
+ADD_WORD_JOB_WORKERS = int(os.environ.get('ADD_WORD_JOB_WORKERS', 2))
+ADD_WORD_JOB_TTL = float(os.environ.get('ADD_WORD_JOB_TTL', 24 * 3600))
+ADD_WORD_JOB_STALE_AFTER = float(os.environ.get('ADD_WORD_JOB_STALE_AFTER', 600))
+
+# Marks the threads of the pipeline pool, which run nested parallel calls inline.
+_pipeline_thread = threading.local()
+
 class VocabularyService:
     """Manages vocabulary data, including CRUD operations, definitions, translations, and audio generation."""
-    def __init__(self, csv_file='vocabulary.csv'):
+    def __init__(self, csv_file='vocabulary.csv', journal: Optional[bool] = None,
+                 storage: Optional[str] = None, db_file: Optional[str] = None, cache_dir: Optional[str] = None):
         """Initializes the VocabularyService.
 
         Args:
             csv_file (str): The path to the CSV file used for storing vocabulary data.
                           Defaults to 'vocabulary.csv'.
+            journal (Optional[bool]): Whether to record edits in an append-only journal next to the CSV
+                          instead of rewriting the whole file. Defaults to the `VOCAB_JOURNAL` env var.
+            storage (Optional[str]): The storage backend, 'csv' or 'sqlite'. Defaults to the
+                          `VOCAB_STORAGE` env var, or 'csv' if it is not set.
+            db_file (Optional[str]): The SQLite database path used by the 'sqlite' backend. Defaults to
+                          the `VOCAB_DB_FILE` env var, or 'vocabulary.db' if it is not set.
+            cache_dir (Optional[str]): The directory for caches of API results. Defaults to the
+                          `VOCAB_CACHE_DIR` env var, or 'cache' ('/tmp/vocabulary_cache' on Vercel).
         """
         self.csv_file = csv_file
         self.translator = Translator()  # googletrans Translator for fallback
@@ -41,8 +134,145 @@ class VocabularyService:
         if not self.elevenlabs_api_key:
             logging.warning("ElevenLabs API key not set. ElevenLabs TTS will not be available.")
         
-        self._ensure_csv_exists() # Ensure CSV file is present with headers.
+        self.storage = (storage or os.environ.get('VOCAB_STORAGE') or 'csv').lower()
+        self.db_file = db_file or os.environ.get('VOCAB_DB_FILE', 'vocabulary.db')
+        if journal is None:
+            journal = os.environ.get('VOCAB_JOURNAL') == '1'
+        if self.storage == 'csv':
+            self._ensure_csv_exists() # Ensure CSV file is present with headers.
+        self.store = self._create_store(journal)
+        # Ranked full-text index over all five fields, kept in sync by the store.
+        self.search_index = FullTextIndex(self.headers)
+        self.store.add_listener(self.search_index)
+        # Sorted headwords for type-ahead suggestions.
+        self.suggest_index = PrefixIndex('English Word')
+        self.store.add_listener(self.suggest_index)
+        # Headwords within a small edit distance, for "did you mean" and fuzzy search.
+        self.fuzzy_index = FuzzyIndex('English Word')
+        self.store.add_listener(self.fuzzy_index)
+        self.cache_dir = os.path.abspath(cache_dir or os.environ.get('VOCAB_CACHE_DIR') or ('/tmp/vocabulary_cache' if IS_VERCEL else 'cache'))
+        self.dictionary_cache = self._create_cache('dictionary', DICTIONARY_CACHE_TTL, DICTIONARY_CACHE_SIZE)
+        # Loaded on the first lookup, so workers that never look up a definition do not read it.
+        self.offline_dictionary = OfflineDictionary(os.path.join(self.cache_dir, 'dictionary.idx'), OFFLINE_DICTIONARY_FILE) \
+            if OFFLINE_DICTIONARY_FILE else None
+        # Rate limiter and circuit breaker per upstream provider (googletrans included).
+        self.rate_limiters = {name: TokenBucket(rate) for name, rate in RATE_LIMITS.items()}
+        self.circuit_breakers = {name: CircuitBreaker(name, CIRCUIT_FAILURE_THRESHOLD, CIRCUIT_RECOVERY_TIMEOUT)
+                                 for name in RATE_LIMITS}
+        # One pooled client per upstream provider: (name, read timeout in seconds)
+        self.http = {name: ProviderClient(name, HTTP_CONNECT_TIMEOUT, read_timeout, HTTP_POOL_SIZE, HTTP_MAX_RETRIES,
+                                          rate_limiter=self.rate_limiters[name], circuit_breaker=self.circuit_breakers[name])
+                     for name, read_timeout in (('dictionary', 10), ('google_translate', 10), ('google_tts', 15), ('elevenlabs', 15))}
+        self.executor = ThreadPoolExecutor(max_workers=PIPELINE_WORKERS, thread_name_prefix='vocab-pipeline')
+        self.single_flight = SingleFlight(os.path.join(self.cache_dir, 'locks'))
+        # Response times of Google Translate requests, and counts of hedged translations.
+        self.google_translate_latency = LatencyTracker(default=TRANSLATION_HEDGE_DELAY)
+        self._hedge_lock = threading.Lock()
+        self._hedge_stats = {'batches': 0, 'hedged': 0, 'primary_wins': 0, 'hedge_wins': 0}
+        self.translation_memory = TieredCache(self._create_cache('translations', TRANSLATION_CACHE_TTL, TRANSLATION_CACHE_SIZE),
+                                              TRANSLATION_MEMORY_SIZE)
+        self.presynthesizer = AudioPresynthesizer(self, [name.strip() for name in AUDIO_PRESYNTHESIS_SERVICES],
+                                                  AUDIO_PRESYNTHESIS_WORKERS)
+        self.add_word_jobs = AddWordJobQueue(self, self._create_cache('add_word_jobs', ADD_WORD_JOB_TTL, 10000),
+                                             ADD_WORD_JOB_WORKERS, ADD_WORD_JOB_STALE_AFTER)
     
+    def _create_store(self, journal: bool) -> VocabularyStore:
+        """Creates the storage backend selected by `self.storage`.
+
+        Args:
+            journal (bool): Whether the CSV backend should use an append-only journal.
+
+        Returns:
+            VocabularyStore: The backend all persistence is delegated to.
+        """
+        if self.storage == 'sqlite':
+            logging.info(f"Using SQLite vocabulary storage: {self.db_file}")
+            return SqliteVocabularyStore(self.db_file, self.headers)
+        if self.storage != 'csv':
+            logging.warning(f"Unknown storage backend '{self.storage}'. Falling back to CSV.")
+            self.storage = 'csv'
+        return CsvVocabularyStore(self.csv_file, self.headers, journal=journal) # Resident, indexed copy of the CSV.
+    
+    def _create_cache(self, namespace: str, ttl: float, max_entries: int) -> Optional[PersistentCache]:
+        """Opens a cache in `cache_dir`, shared by all workers. Returns None (no caching) if that fails."""
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            return PersistentCache(os.path.join(self.cache_dir, 'lookups.db'), namespace, ttl, max_entries)
+        except Exception as e:
+            logging.warning(f"Could not open the '{namespace}' cache in {self.cache_dir}, continuing without it: {e}")
+            return None
+
+    @staticmethod
+    def _translation_key(text: str, source_language: Optional[str], target_language: str, provider: str) -> str:
+        """Returns the translation memory key for `text`: its hash, the language pair and the provider."""
+        digest = hashlib.sha256(text.encode('utf-8')).hexdigest()
+        return f"{digest}|{source_language or 'auto'}|{target_language}|{provider}"
+
+    @staticmethod
+    def _in_pipeline(call: Callable[[], Any]) -> Any:
+        _pipeline_thread.active = True
+        return call()
+
+    def _run_parallel(self, calls: List[Callable[[], Any]], deadline: Optional[float] = None) -> List[Any]:
+        """Runs independent `calls` concurrently on the shared pipeline pool.
+
+        Calls made from a pool thread run inline instead, so nested use cannot
+        exhaust the pool and deadlock. So does a single call without a deadline.
+
+        Args:
+            calls (List[Callable[[], Any]]): Functions without arguments.
+            deadline (Optional[float]): A `time.monotonic()` time by which all calls must have returned.
+
+        Returns:
+            List[Any]: The results, in the order of `calls`.
+
+        Raises:
+            TimeoutError: If the deadline passes first. The calls keep running in the background.
+            Exception: The first exception raised by a call (in the order of `calls`).
+        """
+        if getattr(_pipeline_thread, 'active', False) or (len(calls) <= 1 and deadline is None):
+            return [call() for call in calls]
+        futures = [self.executor.submit(self._in_pipeline, call) for call in calls]
+        timeout = None if deadline is None else max(deadline - time.monotonic(), 0)
+        _, not_done = wait(futures, timeout)
+        if not_done:
+            raise TimeoutError(f"{len(not_done)} of {len(futures)} calls did not finish before the deadline")
+        return [future.result() for future in futures]
+
+    def get_http_stats(self) -> Dict[str, Dict[str, int]]:
+        """Returns request, retry and connection reuse counts of this process, per upstream provider."""
+        return {name: client.stats() for name, client in self.http.items()}
+
+    def get_provider_status(self) -> Dict[str, Dict[str, Any]]:
+        """Returns the circuit breaker state and rate limiter counts of this process, per upstream provider."""
+        return {name: {'circuit': breaker.stats(), 'rate_limit': dict(self.rate_limiters[name].stats(), per_second=RATE_LIMITS[name])}
+                for name, breaker in self.circuit_breakers.items()}
+
+    def get_hedge_stats(self) -> Dict[str, Any]:
+        """Returns this process's hedged translation counts and the current hedging delay.
+
+        `batches` counts hedged-mode translations and `hedged` how many of them started
+        the fallback; `primary_wins` and `hedge_wins` count segments won by Google and googletrans.
+        """
+        with self._hedge_lock:
+            stats: Dict[str, Any] = dict(self._hedge_stats)
+        stats.update(enabled=TRANSLATION_HEDGE, delay=round(self.google_translate_latency.percentile(TRANSLATION_HEDGE_PERCENTILE), 3),
+                     latency_samples=len(self.google_translate_latency))
+        return stats
+
+    def _count_hedge(self, name: str, count: int = 1):
+        with self._hedge_lock:
+            self._hedge_stats[name] += count
+
+    def get_cache_stats(self) -> Dict[str, Dict[str, int]]:
+        """Returns the hit and miss counts of this process's translation memory and offline dictionary, its audio
+        presynthesis counts, and how many upstream calls were coalesced with an identical call in flight."""
+        stats = {'translations': self.translation_memory.stats(), 'audio_presynthesis': self.presynthesizer.stats(),
+                 'single_flight': self.single_flight.stats()}
+        if self.offline_dictionary is not None:
+            stats['offline_dictionary'] = self.offline_dictionary.stats()
+        return stats
+
     def _ensure_csv_exists(self):
         """Ensures the CSV file exists and has the correct headers.
         
@@ -67,18 +297,27 @@ class VocabularyService:
                 # or attempt to handle the error in another way.
     
     def get_csv_path(self) -> str:
-        """Returns the absolute path to the vocabulary CSV file."""
-        return os.path.abspath(self.csv_file)
+        """Returns the absolute path to a CSV file holding the complete vocabulary.
+
+        For the CSV backend this is the vocabulary file itself, with any pending
+        journal records compacted into it first. Other backends write an export file.
+        """
+        if IS_VERCEL and self.storage == 'csv':
+            return os.path.abspath(self.csv_file)
+        return os.path.abspath(self.store.export_csv())
     
     def get_english_definition(self, word: str) -> Optional[Dict[str, str]]:
         """Fetches or generates an English definition and example sentence for a given word.
 
-        It first attempts to use the Free Dictionary API (https://api.dictionaryapi.dev/) for a real definition and example.
+        Words in the bundled offline dictionary (`OFFLINE_DICTIONARY_FILE`) are answered without any network call.
+        Otherwise it attempts to use the Free Dictionary API (https://api.dictionaryapi.dev/) for a real definition and example.
         If that fails, it falls back to the Google Cloud Translation API by translating Vietnamese prompts for definition and example back to English.
 
         Args:
             word (str): The English word for which to get the definition and example.
 
+        Concurrent lookups of the same word share one lookup (see `single_flight`).
+
         Returns:
             Optional[Dict[str, str]]: A dictionary with 'definition' and 'example' keys
                                       if successful, otherwise None.
@@ -86,7 +325,16 @@ class VocabularyService:
         if not word:
             logging.warning("get_english_definition called with an empty word."); logging.getLogger().handlers[0].flush()
             return None
+        if self.offline_dictionary is not None:
+            offline_result = self.offline_dictionary.lookup(word)
+            if offline_result and offline_result['definition'] and offline_result['example']:
+                logging.info(f"[get_english_definition] Found '{word}' in the offline dictionary.")
+                return offline_result
+        return self.single_flight.do(f"definition|{word.strip().casefold()}", lambda: self._lookup_english_definition(word),
+                                     shared=SINGLE_FLIGHT_SHARED)
 
+    def _lookup_english_definition(self, word: str) -> Optional[Dict[str, str]]:
+        """Looks up the definition of `word` for `get_english_definition()`."""
         # Attempt 1: Use DictionaryAPI for definition and example
         logging.info(f"[get_english_definition] Trying DictionaryAPI for '{word}'"); logging.getLogger().handlers[0].flush()
         dict_result = self._get_fallback_definition(word)
@@ -102,8 +350,8 @@ class VocabularyService:
                 logging.info(f"[get_english_definition] Attempting Google Cloud fallback for '{word}'"); logging.getLogger().handlers[0].flush()
                 vietnamese_definition_prompt = f"Định nghĩa chi tiết và rõ ràng của từ tiếng Anh '{word}' dành cho người học ngôn ngữ."
                 vietnamese_example_prompt = f"Một câu ví dụ điển hình sử dụng từ tiếng Anh '{word}' trong ngữ cảnh thực tế."
-                definition_en = self.translate_text_with_google(vietnamese_definition_prompt, target_language='en')
-                example_en = self.translate_text_with_google(vietnamese_example_prompt, target_language='en')
+                definition_en, example_en = self.translate_batch_with_google([vietnamese_definition_prompt, vietnamese_example_prompt],
+                                                                             target_language='en')
                 logging.info(f"[get_english_definition] Google returned: def='{definition_en}', ex='{example_en}'"); logging.getLogger().handlers[0].flush()
                 if definition_en and example_en:
                     clean_definition = definition_en.replace(f"Detailed and clear definition of the English word '{word}' for language learners.", "").strip()
@@ -134,6 +382,7 @@ class VocabularyService:
         """Translates text using the Google Cloud Translation API (REST).
 
         Requires `GOOGLE_CLOUD_API_KEY` to be set in the environment.
+        Successful translations are kept in the translation memory and reused.
 
         Args:
             text (str): The text to translate.
@@ -149,39 +398,99 @@ class VocabularyService:
         if not text:
             logging.warning("translate_text_with_google called with empty text.")
             return ""
-            
+        return self.translate_batch_with_google([text], target_language, source_language)[0]
+
+    def translate_batch_with_google(self, texts: List[str], target_language: str = 'en',
+                                    source_language: Optional[str] = None) -> List[str]:
+        """Translates many texts with as few Google Cloud Translation API requests as possible.
+
+        The v2 endpoint accepts several `q` values per request, so segments are sent
+        together, in chunks of at most `GOOGLE_TRANSLATE_MAX_SEGMENTS` segments and
+        `GOOGLE_TRANSLATE_MAX_CHARS` characters. Segments found in the translation memory
+        and repeated segments are not sent at all.
+
+        Args:
+            texts (List[str]): The texts to translate.
+            target_language (str): The target language code (e.g., 'en', 'vi').
+            source_language (Optional[str]): The source language code. If None, Google attempts to detect it.
+
+        Returns:
+            List[str]: The translations, in the order of `texts`. A translation is an empty
+                       string if the text is empty or its request failed.
+        """
+        if not self.api_key:
+            logging.error("translate_batch_with_google called but GOOGLE_CLOUD_API_KEY is not set.")
+            return [''] * len(texts)
+        # Identical batches in flight (e.g. two tabs refreshing the same cell) share one request.
+        key = hashlib.sha256(json.dumps([texts, target_language, source_language], ensure_ascii=False).encode('utf-8')).hexdigest()
+        return list(self.single_flight.do(f"google_translate|{key}",
+                                          lambda: self._translate_batch_with_google(texts, target_language, source_language),
+                                          shared=SINGLE_FLIGHT_SHARED))
+
+    def _translate_batch_with_google(self, texts: List[str], target_language: str, source_language: Optional[str]) -> List[str]:
+        """Translates `texts` for `translate_batch_with_google()`, checking the translation memory first."""
+        translations = [''] * len(texts)
+
+        pending: Dict[str, List[int]] = {} # text -> positions in `texts`
+        for position, text in enumerate(texts):
+            if not text:
+                continue
+            found, translated_text = self.translation_memory.get(self._translation_key(text, source_language, target_language, 'google'))
+            if found:
+                logging.info(f"Google Cloud Translation: using translation memory for '{text[:30]}...'")
+                translations[position] = translated_text
+            else:
+                pending.setdefault(text, []).append(position)
+
+        chunk: List[str] = []
+        chunk_chars = 0
+        for text in pending:
+            if chunk and (len(chunk) >= GOOGLE_TRANSLATE_MAX_SEGMENTS or chunk_chars + len(text) > GOOGLE_TRANSLATE_MAX_CHARS):
+                self._translate_chunk_with_google(chunk, target_language, source_language, pending, translations)
+                chunk, chunk_chars = [], 0
+            chunk.append(text)
+            chunk_chars += len(text)
+        if chunk:
+            self._translate_chunk_with_google(chunk, target_language, source_language, pending, translations)
+        return translations
+
+    def _translate_chunk_with_google(self, chunk: List[str], target_language: str, source_language: Optional[str],
+                                     positions: Dict[str, List[int]], translations: List[str]):
+        """Translates `chunk` in one request and stores each result at its `positions` in `translations`."""
         url = f"https://translation.googleapis.com/language/translate/v2?key={self.api_key}"
-        payload = {
-            'q': text,
-            'target': target_language,
-            'format': 'text'
-        }
+        payload = [('q', text) for text in chunk]
+        payload += [('target', target_language), ('format', 'text')]
         if source_language:
-            payload['source'] = source_language
+            payload.append(('source', source_language))
             
         try:
-            response = requests.post(url, data=payload, timeout=10) # Increased timeout for robustness
+            started = time.monotonic()
+            response = self.http['google_translate'].post(url, data=payload)
             response.raise_for_status() # Raise HTTPError for bad responses (4XX or 5XX)
+            self.google_translate_latency.record(time.monotonic() - started)
             
             result = response.json()
-            if 'data' in result and 'translations' in result['data'] and result['data']['translations']:
-                translated_text = result['data']['translations'][0]['translatedText']
-                logging.info(f"Google Cloud Translation successful for text: '{text[:30]}...' -> '{translated_text[:30]}...'")
-                return translated_text
+            if 'data' in result and 'translations' in result['data'] and len(result['data']['translations']) == len(chunk):
+                for text, translation in zip(chunk, result['data']['translations']):
+                    translated_text = translation['translatedText']
+                    logging.info(f"Google Cloud Translation successful for text: '{text[:30]}...' -> '{translated_text[:30]}...'")
+                    if translated_text:
+                        self.translation_memory.set(self._translation_key(text, source_language, target_language, 'google'), translated_text)
+                    for position in positions[text]:
+                        translations[position] = translated_text
             else:
                 logging.error(f"Google Cloud Translation API call succeeded but response format was unexpected: {result}")
-                return ""
         except requests.exceptions.RequestException as e:
             logging.error(f"Google Cloud Translation API request failed: {e}")
-            return ""
         except Exception as e:
-            logging.error(f"An unexpected error occurred in translate_text_with_google: {e}")
-            return ""
+            logging.error(f"An unexpected error occurred in translate_batch_with_google: {e}")
     
     def _get_fallback_definition(self, word: str) -> Optional[Dict[str, str]]:
         """Fallback method to get word definition and example using the DictionaryAPI.dev.
 
         This method is used if the primary Google Cloud-based definition generation fails.
+        Results are kept in `dictionary_cache`, including words the API does not know
+        (for a shorter time), so repeated lookups do not call the API again.
 
         Args:
             word (str): The English word.
@@ -189,9 +498,15 @@ class VocabularyService:
         Returns:
             Optional[Dict[str, str]]: Dictionary with 'definition' and 'example', or None if failed.
         """
+        cache_key = word.lower().strip()
+        if self.dictionary_cache is not None:
+            found, cached = self.dictionary_cache.get(cache_key)
+            if found:
+                logging.info(f"DictionaryAPI.dev: Using cached result for '{word}'.")
+                return cached
         try:
-            url = f"https://api.dictionaryapi.dev/api/v2/entries/en/{word.lower().strip()}"
-            response = requests.get(url, timeout=10) # Increased timeout
+            url = f"https://api.dictionaryapi.dev/api/v2/entries/en/{cache_key}"
+            response = self.http['dictionary'].get(url)
             response.raise_for_status() # Checks for HTTP errors
             
             data = response.json()
@@ -216,13 +531,18 @@ class VocabularyService:
                                 pass # Decided against using phonetic text as example as it is unreliable
                 
                 logging.info(f"Successfully fetched definition for '{word}' using DictionaryAPI.dev.")
-                return {'definition': definition, 'example': example}
+                result = {'definition': definition, 'example': example}
+                if self.dictionary_cache is not None:
+                    self.dictionary_cache.set(cache_key, result)
+                return result
             else:
                 logging.warning(f"DictionaryAPI.dev: No data found or unexpected format for '{word}'. Response: {data}")
                 return None
         except requests.exceptions.HTTPError as e:
             if e.response.status_code == 404:
                 logging.warning(f"DictionaryAPI.dev: Word '{word}' not found (404). Details: {e}")
+                if self.dictionary_cache is not None:
+                    self.dictionary_cache.set(cache_key, None, DICTIONARY_CACHE_NEGATIVE_TTL)
             else:
                 logging.error(f"DictionaryAPI.dev: HTTP error for '{word}'. Status: {e.response.status_code}. Details: {e}")
             return None
@@ -238,6 +558,8 @@ class VocabularyService:
 
         Prioritizes Google Cloud Translation API if `GOOGLE_CLOUD_API_KEY` is set.
         Falls back to the `googletrans` library if the API key is not available or the API call fails.
+        Successful translations from either provider are kept in the translation memory;
+        failure messages are not.
 
         Args:
             text (str): The English text to translate.
@@ -245,30 +567,149 @@ class VocabularyService:
         Returns:
             str: The translated Vietnamese text, or a failure message if all attempts fail.
         """
-        if not text:
-            logging.warning("translate_to_vietnamese called with empty text."); logging.getLogger().handlers[0].flush()
-            return "(No text provided for translation)"
+        return self.translate_batch_to_vietnamese([text])[0]
+
+    def translate_batch_to_vietnamese(self, texts: List[str], deadline: Optional[float] = None) -> List[str]:
+        """Translates several English texts to Vietnamese, in one Google Cloud request where possible.
+
+        Uses `translate_batch_with_google()` if `GOOGLE_CLOUD_API_KEY` is set. Only the
+        segments it could not translate fall back to the `googletrans` library, in parallel.
+
+        Args:
+            texts (List[str]): The English texts to translate.
+            deadline (Optional[float]): A `time.monotonic()` time after which to give up with a `TimeoutError`.
+
+        Returns:
+            List[str]: The Vietnamese translations in the order of `texts`, with a failure
+                       message in place of each text that could not be translated.
+        """
+        translations = [''] * len(texts)
+        for position, text in enumerate(texts):
+            if not text:
+                logging.warning("translate_to_vietnamese called with empty text."); logging.getLogger().handlers[0].flush()
+                translations[position] = "(No text provided for translation)"
+
+        # Nested in the pipeline pool, hedging could not run in parallel: translate one after the other there.
+        if self.api_key and TRANSLATION_HEDGE and not getattr(_pipeline_thread, 'active', False):
+            return self._translate_batch_hedged(texts, translations, deadline)
 
         # Attempt 1: Google Cloud Translation API
         if self.api_key:
-            translated_text = self.translate_text_with_google(text, target_language='vi', source_language='en')
-            logging.info(f"[translate_to_vietnamese] Google returned: '{translated_text}' for '{text}'"); logging.getLogger().handlers[0].flush()
-            if translated_text:
-                return translated_text
-            logging.warning(f"[translate_to_vietnamese] Google Cloud failed for '{text[:30]}...'. Trying fallback."); logging.getLogger().handlers[0].flush()
+            segments = [text if not translations[position] else '' for position, text in enumerate(texts)]
+            google_translations = self._run_parallel(
+                [lambda: self.translate_batch_with_google(segments, target_language='vi', source_language='en')], deadline)[0]
+            for position, translated_text in enumerate(google_translations):
+                if translations[position]:
+                    continue
+                logging.info(f"[translate_to_vietnamese] Google returned: '{translated_text}' for '{texts[position]}'"); logging.getLogger().handlers[0].flush()
+                if translated_text:
+                    translations[position] = translated_text
+                else:
+                    logging.warning(f"[translate_to_vietnamese] Google Cloud failed for '{texts[position][:30]}...'. Trying fallback."); logging.getLogger().handlers[0].flush()
+
+        # Attempt 2: Fallback to googletrans library, only for the segments still missing
+        missing = [position for position, translation in enumerate(translations) if not translation]
+        fallback_translations = self._run_parallel(
+            [lambda text=texts[position]: self._translate_with_googletrans(text) for position in missing], deadline)
+        for position, translated_text in zip(missing, fallback_translations):
+            translations[position] = translated_text
+        return translations
+
+    def _translate_batch_hedged(self, texts: List[str], translations: List[str], deadline: Optional[float]) -> List[str]:
+        """Hedged version of `translate_batch_to_vietnamese()`: races googletrans against a slow Google response.
+
+        Google is asked first. If it has not answered within the hedging delay (see
+        `TRANSLATION_HEDGE_PERCENTILE`), every segment is also sent to googletrans. Each
+        segment takes the first acceptable translation; the other result is ignored.
+        Segments neither provider translated fall back to googletrans as usual.
 
-        # Attempt 2: Fallback to googletrans library
+        Args:
+            texts (List[str]): The English texts to translate.
+            translations (List[str]): Already known results (messages for empty texts), filled in place.
+            deadline (Optional[float]): A `time.monotonic()` time after which to give up with a `TimeoutError`.
+
+        Returns:
+            List[str]: `translations`, completed.
+        """
+        pending = [position for position, translation in enumerate(translations) if not translation]
+        segments = [text if not translations[position] else '' for position, text in enumerate(texts)]
+        self._count_hedge('batches')
+        primary = self.executor.submit(self._in_pipeline,
+                                       lambda: self.translate_batch_with_google(segments, target_language='vi', source_language='en'))
+        delay = self.google_translate_latency.percentile(TRANSLATION_HEDGE_PERCENTILE)
+        if deadline is not None:
+            delay = min(delay, max(deadline - time.monotonic(), 0))
+        hedges = {}
+        if not wait([primary], delay).done:
+            logging.info(f"[translate_to_vietnamese] Google has not answered after {delay:.2f}s, hedging with googletrans."); logging.getLogger().handlers[0].flush()
+            self._count_hedge('hedged')
+            hedges = {self.executor.submit(self._in_pipeline, lambda text=texts[position]: self._translate_with_googletrans(text)): position
+                      for position in pending}
+        hedge_failures: Dict[int, str] = {}
+        running = {primary, *hedges}
+        while running and any(not translations[position] for position in pending):
+            timeout = None if deadline is None else max(deadline - time.monotonic(), 0)
+            done, running = wait(running, timeout, return_when=FIRST_COMPLETED)
+            if not done:
+                raise TimeoutError(f"{len(running)} translation calls did not finish before the deadline")
+            for future in done:
+                if future is primary:
+                    try:
+                        google_translations = future.result()
+                    except Exception as e:
+                        logging.error(f"[translate_to_vietnamese] Google Cloud failed: {e}"); logging.getLogger().handlers[0].flush()
+                        continue
+                    won = [position for position in pending if not translations[position] and google_translations[position]]
+                    for position in won:
+                        translations[position] = google_translations[position]
+                    self._count_hedge('primary_wins', len(won))
+                else:
+                    position, translated_text = hedges[future], future.result()
+                    if is_placeholder('Vietnamese Definition', translated_text):
+                        hedge_failures[position] = translated_text
+                    elif not translations[position]:
+                        translations[position] = translated_text
+                        self._count_hedge('hedge_wins')
+        for future in running:
+            future.cancel() # Losers that have not started yet; running ones finish in the background
+
+        # Segments neither provider translated: report the hedge's failure, or fall back as usual.
+        for position, message in hedge_failures.items():
+            if not translations[position]:
+                translations[position] = message
+        missing = [position for position in pending if not translations[position]]
+        fallback_translations = self._run_parallel(
+            [lambda text=texts[position]: self._translate_with_googletrans(text) for position in missing], deadline)
+        for position, translated_text in zip(missing, fallback_translations):
+            translations[position] = translated_text
+        return translations
+
+    def _translate_with_googletrans(self, text: str) -> str:
+        """Translates English `text` to Vietnamese with the `googletrans` library, or returns a failure message."""
+        memory_key = self._translation_key(text, 'en', 'vi', 'googletrans')
+        found, translated_text = self.translation_memory.get(memory_key)
+        if found:
+            logging.info(f"[translate_to_vietnamese] Using translation memory for '{text[:30]}...'"); logging.getLogger().handlers[0].flush()
+            return translated_text
+        breaker = self.circuit_breakers['googletrans']
+        if not breaker.allow():
+            logging.warning(f"[translate_to_vietnamese] googletrans circuit open, not translating '{text[:30]}...'"); logging.getLogger().handlers[0].flush()
+            return f"[Translation failed for: {text[:30]}...]"
         try:
             logging.info(f"[translate_to_vietnamese] Falling back to googletrans for '{text[:30]}...'"); logging.getLogger().handlers[0].flush()
-            time.sleep(0.2)
+            self.rate_limiters['googletrans'].acquire()
             result = self.translator.translate(text, src='en', dest='vi')
             if result and result.text:
+                breaker.record_success()
                 logging.info(f"[translate_to_vietnamese] googletrans returned: '{result.text}'"); logging.getLogger().handlers[0].flush()
+                self.translation_memory.set(memory_key, result.text)
                 return result.text
             else:
+                breaker.record_failure()
                 logging.error(f"[translate_to_vietnamese] googletrans fallback failed for '{text[:30]}...': No text returned."); logging.getLogger().handlers[0].flush()
                 return f"[googletrans fallback error: No text] {text}"
         except Exception as fallback_error:
+            breaker.record_failure()
             logging.error(f"[translate_to_vietnamese] googletrans fallback translation failed for '{text[:30]}...': {fallback_error}"); logging.getLogger().handlers[0].flush()
             return f"[Translation failed for: {text[:30]}...]"
     
@@ -323,23 +764,193 @@ class VocabularyService:
             logging.error(f"Pronunciation guide generation failed for text '{text}': {e}")
             return f"/{text.lower()}/ (Error in generation)"
     
-    def generate_audio(self, text: str, language: str, service: str = 'google') -> Optional[str]:
-        """Generates audio using the specified TTS service and returns base64 encoded MP3 audio.
+    def _tts_settings(self, language: str, service: str) -> Dict:
+        """Returns the voice and audio settings used to synthesize `language` with `service` ('google' or 'elevenlabs')."""
+        if service == 'elevenlabs':
+            voice_id = 'HDA9tsk27wYi3uq0fPcK' if language.lower().startswith('en') else 'ueSxRO0nLF1bj93J2hVt'
+            return {'voice_id': voice_id, 'voice_settings': {'stability': 0.5, 'similarity_boost': 0.5}}
+
+        if language.lower().startswith('vi'):
+            voice_config = {
+                'languageCode': 'vi-VN',
+                'name': 'vi-VN-Standard-D',
+            }
+        elif language.lower().startswith('en'):
+            voice_config = {
+                'languageCode': 'en-US',
+                'name': 'en-US-Standard-C',
+            }
+        else:
+            logging.warning(f"Unsupported language '{language}' - defaulting to en-US")
+            voice_config = {'languageCode': 'en-US', 'name': 'en-US-Standard-C'}
+        return {'voice': voice_config, 'audioConfig': {'audioEncoding': 'MP3', 'speakingRate': 0.95}}
+
+    def audio_cache_key(self, text: str, language: str, service: str = 'google') -> str:
+        """Returns the content address of the audio for `text`: a hash of the text, service and voice settings."""
+        identity = {'text': text, 'service': service, 'settings': self._tts_settings(language, service)}
+        return hashlib.sha256(json.dumps(identity, sort_keys=True, ensure_ascii=False).encode('utf-8')).hexdigest()
+
+    def audio_file_path(self, key: str) -> Optional[str]:
+        """Returns the path of the cached MP3 file for `key` (see `audio_cache_key()`), or None if it is not cached."""
+        if not AUDIO_KEY_PATTERN.fullmatch(key or ''):
+            return None
+        path = os.path.join(self.cache_dir, 'audio', f"{key}.mp3")
+        return path if os.path.exists(path) else None
+
+    def get_audio(self, text: str, language: str, service: str = 'google') -> Optional[str]:
+        """Synthesizes `text` into an MP3 file in the audio cache, unless it is already there.
+
+        Files are content-addressed by `audio_cache_key()`, so the same text, voice and
+        rate are only synthesized once, by any worker, and a file never changes once written.
 
         Args:
             text (str): The text to synthesize.
             language (str): The language code ('en' for English, 'vi' for Vietnamese).
-            service (str): 'google', 'elevenlabs', or 'browser'.
+            service (str): 'google' or 'elevenlabs'.
 
         Returns:
-            Optional[str]: Base64 encoded MP3 audio content as a string, or None if generation fails or is browser.
+            Optional[str]: The cache key of the audio file (see `audio_file_path()`), or None if
+                           generation fails or `service` is 'browser'.
         """
         logging.info(f"Generating audio for text: '{text[:30]}...' in language '{language}' using service '{service}'")
         
         if service == 'browser':
             logging.info("Using browser TTS - no audio generation needed")
             return None
-            
+
+        key = self.audio_cache_key(text, language, service)
+        if self.audio_file_path(key):
+            logging.info(f"Using cached audio {key}")
+            return key
+        # Learners clicking the same word at once share one synthesis.
+        return self.single_flight.do(f"audio|{key}", lambda: self._store_audio(text, language, service, key),
+                                     shared=SINGLE_FLIGHT_SHARED)
+
+    def _store_audio(self, text: str, language: str, service: str, key: str) -> Optional[str]:
+        """Synthesizes the audio for `key` into the audio cache for `get_audio()`. Returns `key`, or None on failure."""
+        if self.audio_file_path(key): # Written by another worker while this one waited for it
+            return key
+        audio_bytes = self._synthesize_audio(text, language, service)
+        if audio_bytes is None:
+            return None
+        try:
+            os.makedirs(os.path.join(self.cache_dir, 'audio'), exist_ok=True)
+            write_atomic(os.path.join(self.cache_dir, 'audio', f"{key}.mp3"), audio_bytes)
+            return key
+        except OSError as e:
+            logging.error(f"Could not store audio {key} in the audio cache: {e}")
+            return None
+
+    def generate_audio(self, text: str, language: str, service: str = 'google') -> Optional[str]:
+        """Generates audio using the specified TTS service and returns base64 encoded MP3 audio.
+
+        The audio comes from the audio cache when possible (see `get_audio()`).
+
+        Args:
+            text (str): The text to synthesize.
+            language (str): The language code ('en' for English, 'vi' for Vietnamese).
+            service (str): 'google', 'elevenlabs', or 'browser'.
+
+        Returns:
+            Optional[str]: Base64 encoded MP3 audio content as a string, or None if generation fails or is browser.
+        """
+        key = self.get_audio(text, language, service)
+        if key is None:
+            return None
+        with open(self.audio_file_path(key), 'rb') as file:
+            return base64.b64encode(file.read()).decode('utf-8')
+
+    def stream_audio(self, text: str, language: str, service: str = 'elevenlabs') -> Tuple[Optional[str], Optional[Iterator[bytes]]]:
+        """Starts synthesizing `text`, returning the audio as it arrives instead of after the whole file.
+
+        ElevenLabs audio is requested from its streaming endpoint. The returned iterator
+        relays its MP3 chunks and writes them to the audio cache at the same time; the
+        file only becomes visible under its key once the stream completed. Google Cloud
+        TTS returns whole files, so it is synthesized with `get_audio()` instead.
+
+        Args:
+            text (str): The text to synthesize.
+            language (str): The language code ('en' for English, 'vi' for Vietnamese).
+            service (str): 'google' or 'elevenlabs'.
+
+        Returns:
+            Tuple[Optional[str], Optional[Iterator[bytes]]]: The audio cache key and an iterator over
+                the audio chunks; no iterator if the file is already cached (use `audio_file_path()`);
+                (None, None) if synthesis failed or `service` is 'browser'.
+        """
+        if service != 'elevenlabs':
+            return self.get_audio(text, language, service), None
+        key = self.audio_cache_key(text, language, service)
+        if self.audio_file_path(key):
+            logging.info(f"Using cached audio {key}")
+            return key, None
+        if not self.elevenlabs_api_key or not text:
+            logging.error("ElevenLabs streaming TTS needs an API key and text")
+            return None, None
+
+        settings = self._tts_settings(language, service)
+        url = f"https://api.elevenlabs.io/v1/text-to-speech/{settings['voice_id']}/stream"
+        headers = {'xi-api-key': self.elevenlabs_api_key, 'Content-Type': 'application/json', 'Accept': 'audio/mpeg'}
+        try:
+            logging.info(f"Making ElevenLabs streaming API request to {url}")
+            response = self.http['elevenlabs'].post(url, headers=headers, json={'text': text, 'voice_settings': settings['voice_settings']},
+                                                    stream=True)
+            response.raise_for_status()
+        except Exception as e:
+            logging.error(f"ElevenLabs streaming TTS error: {str(e)}")
+            return None, None
+        return key, self._relay_audio(response, key)
+
+    def _relay_audio(self, response: requests.Response, key: str) -> Iterator[bytes]:
+        """Yields the chunks of a streaming TTS response while writing them to the audio cache.
+
+        The chunks go to a temporary file that replaces `<key>.mp3` only after the last
+        chunk arrived, so an interrupted stream (upstream error or client disconnect)
+        never leaves a truncated file in the cache. A stream that ends before its
+        Content-Length counts as broken off. Upstream errors, unlike disconnects, are
+        reported to the ElevenLabs circuit breaker.
+        """
+        audio_dir = os.path.join(self.cache_dir, 'audio')
+        temp_path = None
+        length = response.headers.get('Content-Length', '')
+        # Decoded chunks of compressed responses do not add up to the Content-Length
+        expected_size = int(length) if str(length).isdigit() and not response.headers.get('Content-Encoding') else None
+        received = 0
+        try:
+            try:
+                os.makedirs(audio_dir, exist_ok=True)
+                fd, temp_path = tempfile.mkstemp(dir=audio_dir, prefix=f".{key}.", suffix='.part')
+                file = os.fdopen(fd, 'wb')
+            except OSError as e:
+                logging.error(f"Could not store audio {key} in the audio cache, streaming it only: {e}")
+                file = None
+            for chunk in response.iter_content(AUDIO_STREAM_CHUNK_SIZE):
+                if not chunk:
+                    continue
+                received += len(chunk)
+                if file is not None:
+                    file.write(chunk)
+                yield chunk
+            if expected_size is not None and received < expected_size:
+                raise requests.exceptions.ChunkedEncodingError(f"stream ended after {received} of {expected_size} bytes")
+            if file is not None:
+                file.close()
+                os.replace(temp_path, os.path.join(audio_dir, f"{key}.mp3"))
+                temp_path = None
+                logging.info(f"Stored streamed audio {key}")
+        except requests.exceptions.RequestException as e:
+            logging.error(f"ElevenLabs audio stream for {key} broke off: {e}")
+            self.circuit_breakers['elevenlabs'].record_failure()
+        finally:
+            response.close()
+            if temp_path is not None:
+                if file is not None:
+                    file.close()
+                os.remove(temp_path)
+
+    def _synthesize_audio(self, text: str, language: str, service: str) -> Optional[bytes]:
+        """Calls the Google Cloud or ElevenLabs TTS API and returns the MP3 audio, or None on failure."""
+        settings = self._tts_settings(language, service)
         if service == 'elevenlabs':
             if not self.elevenlabs_api_key:
                 logging.error("ElevenLabs API key not set")
@@ -350,7 +961,7 @@ class VocabularyService:
                 return None
                 
             try:
-                voice_id = 'HDA9tsk27wYi3uq0fPcK' if language.lower().startswith('en') else 'ueSxRO0nLF1bj93J2hVt'
+                voice_id = settings['voice_id']
                 logging.info(f"Using ElevenLabs voice ID: {voice_id}")
                 
                 url = f"https://api.elevenlabs.io/v1/text-to-speech/{voice_id}"
@@ -360,20 +971,15 @@ class VocabularyService:
                 }
                 payload = {
                     'text': text,
-                    'voice_settings': {
-                        'stability': 0.5,
-                        'similarity_boost': 0.5
-                    }
+                    'voice_settings': settings['voice_settings']
                 }
                 
                 logging.info(f"Making ElevenLabs API request to {url}")
-                response = requests.post(url, headers=headers, json=payload, timeout=15)
+                response = self.http['elevenlabs'].post(url, headers=headers, json=payload)
                 response.raise_for_status()
                 
-                audio_bytes = response.content
-                audio_b64 = base64.b64encode(audio_bytes).decode('utf-8')
                 logging.info("ElevenLabs TTS successful")
-                return audio_b64
+                return response.content
                 
             except Exception as e:
                 logging.error(f"ElevenLabs TTS error: {str(e)}")
@@ -389,36 +995,17 @@ class VocabularyService:
             return None
             
         url = f"https://texttospeech.googleapis.com/v1/text:synthesize?key={self.api_key}"
-        voice_config = {}
-        
-        if language.lower().startswith('vi'):
-            voice_config = {
-                'languageCode': 'vi-VN',
-                'name': 'vi-VN-Standard-D',
-            }
-        elif language.lower().startswith('en'):
-            voice_config = {
-                'languageCode': 'en-US',
-                'name': 'en-US-Standard-C',
-            }
-        else:
-            logging.warning(f"Unsupported language '{language}' - defaulting to en-US")
-            voice_config = {'languageCode': 'en-US', 'name': 'en-US-Standard-C'}
-            
-        logging.info(f"Using Google TTS voice config: {voice_config}")
+        logging.info(f"Using Google TTS voice config: {settings['voice']}")
         
         payload = {
             'input': {'text': text},
-            'voice': voice_config,
-            'audioConfig': {
-                'audioEncoding': 'MP3',
-                'speakingRate': 0.95
-            }
+            'voice': settings['voice'],
+            'audioConfig': settings['audioConfig']
         }
         
         try:
             logging.info(f"Making Google Cloud TTS API request")
-            response = requests.post(url, json=payload, timeout=15)
+            response = self.http['google_tts'].post(url, json=payload)
             response.raise_for_status()
             
             result = response.json()
@@ -426,7 +1013,7 @@ class VocabularyService:
             
             if audio_content:
                 logging.info("Google Cloud TTS successful")
-                return audio_content
+                return base64.b64decode(audio_content)
             else:
                 logging.error(f"No audioContent in response: {result}")
                 return None
@@ -440,18 +1027,59 @@ class VocabularyService:
             logging.error(f"Unexpected error in Google TTS: {str(e)}")
             return None
     
-    def add_word(self, english_word: str) -> bool:
-        """Adds a new English word to the vocabulary CSV file.
+    def fetch_entry(self, english_word: str, deadline: Optional[float] = None) -> Optional[Dict[str, str]]:
+        """Fetches the English definition and example of a word and translates them to Vietnamese.
+
+        Nothing is written to storage; `add_word()` and bulk imports do that.
+
+        The two stages run one after the other, because the texts to translate come from the
+        definition lookup: one lookup, then one batched Google request for the definition and
+        the example. Only the googletrans fallbacks of segments Google could not translate run
+        in parallel. Both stages count against the same `deadline`.
+
+        Args:
+            english_word (str): The English word, without surrounding whitespace.
+            deadline (Optional[float]): A `time.monotonic()` time after which to give up with a `TimeoutError`.
+
+        Returns:
+            Optional[Dict[str, str]]: The new vocabulary row, or None if no definition was found.
+        """
+        definition_data = self._run_parallel([lambda: self.get_english_definition(english_word)], deadline)[0]
+
+        if not definition_data or not definition_data.get('definition'):
+            logging.warning(f"No definition found for word: '{english_word}'. Word not added.")
+            return None
+
+        english_definition = definition_data['definition']
+        english_example = definition_data.get('example', "No example provided.") # Ensure example has a default
+
+        vietnamese_definition, vietnamese_example = self.translate_batch_to_vietnamese([english_definition, english_example], deadline)
+
+        if is_placeholder('Vietnamese Definition', vietnamese_definition):
+            logging.warning(f"Failed to translate definition for '{english_word}'. Using placeholder.")
+        if is_placeholder('Vietnamese Example', vietnamese_example):
+            logging.warning(f"Failed to translate example for '{english_word}'. Using placeholder.")
+
+        return dict(zip(self.headers, [english_word, english_definition, english_example,
+                                       vietnamese_definition, vietnamese_example]))
+
+    def add_word(self, english_word: str, if_absent: bool = False) -> bool:
+        """Adds a new English word to the vocabulary storage.
 
         This involves fetching its English definition/example, translating them to Vietnamese,
-        and then writing the new entry to the CSV.
+        and then writing the new entry to the storage backend (CSV by default). The upstream
+        calls run on the pipeline pool (see `fetch_entry()`), and the word is not added if
+        they take longer than `ADD_WORD_DEADLINE` seconds in total.
+        Once it is stored, its audio is queued for background synthesis (see `AUDIO_PRESYNTHESIS`).
 
-        Note: This method itself does not perform a duplicate check. Duplicate checking is expected
-        to be handled by the calling code (e.g., in the Flask app route) using `word_exists()`.
+        Note: By default this method does not perform a duplicate check. Pass `if_absent=True`
+        to insert the word only if it is not already present; the check and the write happen
+        atomically under the storage lock, so concurrent workers cannot both add the same word.
         On Vercel, this will log the attempt but not write to CSV due to read-only filesystem.
 
         Args:
             english_word (str): The English word to add.
+            if_absent (bool): Skip the write (and return False) if the word already exists.
 
         Returns:
             bool: True if the word was successfully processed (definition found), 
@@ -468,44 +1096,31 @@ class VocabularyService:
 
         try:
             logging.info(f"Attempting to add word: '{english_word}'")
-            definition_data = self.get_english_definition(english_word)
-            
-            if not definition_data or not definition_data.get('definition'):
-                logging.warning(f"No definition found for word: '{english_word}'. Word not added.")
+            new_row = self.fetch_entry(english_word, time.monotonic() + ADD_WORD_DEADLINE)
+            if new_row is None:
                 return False
-            
-            english_definition = definition_data['definition']
-            english_example = definition_data.get('example', "No example provided.") # Ensure example has a default
-            
-            vietnamese_definition = self.translate_to_vietnamese(english_definition)
-            vietnamese_example = self.translate_to_vietnamese(english_example)
-            
-            if vietnamese_definition.startswith("[Translation failed") or vietnamese_definition.startswith("[googletrans fallback error"):
-                logging.warning(f"Failed to translate definition for '{english_word}'. Using placeholder.")
-            if vietnamese_example.startswith("[Translation failed") or vietnamese_example.startswith("[googletrans fallback error"):
-                logging.warning(f"Failed to translate example for '{english_word}'. Using placeholder.")
-
-            new_row = [
-                english_word,
-                english_definition,
-                english_example,
-                vietnamese_definition,
-                vietnamese_example
-            ]
 
             if IS_VERCEL:
-                logging.info(f"On Vercel: Skipping CSV write for new word '{english_word}'. Data: {new_row}")
+                logging.info(f"On Vercel: Skipping CSV write for new word '{english_word}'. Data: {list(new_row.values())}")
                 # On Vercel, we consider it a success if we got the data, even if we can't write it.
                 # The UI will reflect the new word temporarily if it uses the response, but it won't persist.
                 return True 
             
-            with open(self.csv_file, 'a', newline='', encoding='utf-8') as file:
-                writer = csv.writer(file)
-                writer.writerow(new_row)
+            if if_absent:
+                if not self.store.insert_if_absent(new_row):
+                    logging.warning(f"Word '{english_word}' was added concurrently. Not adding a duplicate.")
+                    return False
+            else:
+                self.store.append(new_row)
             
-            logging.info(f"Successfully added word '{english_word}' to CSV: {self.csv_file}")
+            logging.info(f"Successfully added word '{english_word}' to {self.storage} storage.")
+            if AUDIO_PRESYNTHESIS:
+                self.presynthesizer.enqueue_row(new_row) # Make the first playback a cache hit
             return True
             
+        except TimeoutError as e:
+            logging.error(f"Timed out adding word '{english_word}' after {ADD_WORD_DEADLINE} seconds: {e}")
+            return False
         except IOError as e:
             # This specific IOError for read-only fs should be caught by IS_VERCEL check generally
             logging.error(f"IOError adding word '{english_word}' to CSV {self.csv_file}: {e}")
@@ -515,7 +1130,10 @@ class VocabularyService:
             return False
     
     def get_all_vocabulary(self) -> List[Dict[str, str]]:
-        """Retrieves all vocabulary entries from the CSV file.
+        """Retrieves all vocabulary entries.
+
+        Entries are served from the resident store, which parses the CSV file only
+        when it changed on disk since the last read.
 
         Returns:
             List[Dict[str, str]]: A list of dictionaries, where each dictionary
@@ -523,30 +1141,15 @@ class VocabularyService:
                                   Returns an empty list if the file doesn't exist or is empty,
                                   or if an error occurs.
         """
-        if not os.path.exists(self.csv_file):
+        if self.storage == 'csv' and not os.path.exists(self.csv_file):
             logging.warning(f"Vocabulary CSV file not found: {self.csv_file}. Returning empty list.")
             self._ensure_csv_exists() # Attempt to create it if missing
             return [] # Still return empty as it would have just been created
             
-        vocabulary = []
         try:
-            with open(self.csv_file, 'r', newline='', encoding='utf-8') as file:
-                reader = csv.DictReader(file)
-                # Ensure headers match expected, otherwise DictReader might behave unexpectedly
-                if reader.fieldnames != self.headers:
-                    logging.warning(f"CSV headers mismatch in {self.csv_file}. Expected: {self.headers}, Found: {reader.fieldnames}. Data might be skewed.")
-                    # Optionally, could try to process based on found headers or return error/empty
-                for row in reader:
-                    vocabulary.append(row)
-            logging.debug(f"Loaded {len(vocabulary)} vocabulary entries from {self.csv_file}")
-            return vocabulary
-        except FileNotFoundError:
-            # This case should ideally be caught by the os.path.exists check above,
-            # but as a safeguard / if _ensure_csv_exists fails silently.
-            logging.error(f"FileNotFoundError for {self.csv_file} in get_all_vocabulary despite initial check.")
-            return []
+            return self.store.all()
         except Exception as e:
-            logging.error(f"Error reading vocabulary from CSV {self.csv_file}: {e}")
+            logging.error(f"Error reading vocabulary from {self.storage} storage: {e}")
             return [] # Return empty list on other errors
     
     def word_exists(self, word: str) -> bool:
@@ -561,55 +1164,151 @@ class VocabularyService:
         if not word:
             return False
         try:
-            vocabulary = self.get_all_vocabulary()
-            word_lower = word.lower().strip()
-            return any(entry.get('English Word', '').lower() == word_lower for entry in vocabulary)
+            return self.store.exists(word)
         except Exception as e:
-            # This might catch errors from get_all_vocabulary if it has issues
+            # This might catch errors from the store if the CSV cannot be read
             logging.error(f"Error checking if word '{word}' exists: {e}")
             return False # Default to false on error to be safe (e.g. allow add attempt)
     
-    def search_vocabulary(self, query: str) -> List[Dict[str, str]]:
-        """Searches vocabulary entries by a query string (case-insensitive).
+    def search_vocabulary(self, query: str, limit: Optional[int] = None) -> List[Dict[str, str]]:
+        """Searches vocabulary entries by a query string, best matches first.
 
-        The search query is matched against the 'English Word', 'English Definition',
-        and 'English Example' fields.
+        See `search_vocabulary_ranked()` for how entries are matched and ranked.
 
         Args:
             query (str): The search term.
+            limit (Optional[int]): The maximum number of entries to return. None returns all matches.
 
         Returns:
             List[Dict[str, str]]: A list of matching vocabulary entries.
                                   Returns all entries if the query is empty.
         """
+        results, _ = self.search_vocabulary_ranked(query, limit)
+        return results
+
+    def search_vocabulary_ranked(self, query: str, limit: Optional[int] = None,
+                                 fuzzy: bool = False) -> Tuple[List[Dict[str, str]], int]:
+        """Searches vocabulary entries and ranks them with BM25.
+
+        The query is matched against all five fields. Case and Vietnamese diacritics
+        are ignored ("tieng" finds "tiếng"). An entry matches if the query occurs in one
+        of its fields, or if it contains every word of the query. Entries whose English
+        word equals (or starts with) the query are ranked first.
+
+        Args:
+            query (str): The search term, in English or Vietnamese.
+            limit (Optional[int]): The maximum number of entries to return. Only this many
+                                   results are selected (with a heap) instead of sorting all matches.
+            fuzzy (bool): Also match entries whose English word is within a small edit
+                          distance of the query, so misspellings like "recieve" find "receive".
+
+        Returns:
+            Tuple[List[Dict[str, str]], int]: The best matching entries and the total number of matches.
+                                              Returns all entries (unranked) if the query is empty.
+        """
         try:
-            vocabulary = self.get_all_vocabulary()
             if not query or not query.strip(): # If query is empty or just whitespace, return all
-                return vocabulary
+                vocabulary = self.get_all_vocabulary()
+                return (vocabulary if limit is None else vocabulary[:limit]), len(vocabulary)
                 
-            query_lower = query.lower().strip()
-            
-            filtered_results = []
-            for entry in vocabulary:
-                # Check against None or missing keys before lowercasing
-                english_word = entry.get('English Word', '')
-                english_def = entry.get('English Definition', '')
-                english_ex = entry.get('English Example', '')
-
-                if (query_lower in english_word.lower() or 
-                    query_lower in english_def.lower() or 
-                    query_lower in english_ex.lower()):
-                    filtered_results.append(entry)
+            self.store.refresh() # Picks up changes made by other workers before querying the index
+            near_keys = None
+            if fuzzy:
+                near_keys = {self.store.normalize(word): distance for word, distance in self.fuzzy_index.lookup(query)}
+            results, total, _ = self.search_index.rank(query, limit, near_keys)
             
-            logging.info(f"Search for '{query}' found {len(filtered_results)} results.")
-            return filtered_results
+            logging.info(f"Search for '{query}' found {total} results.")
+            return results, total
             
         except Exception as e:
             logging.error(f"Error searching vocabulary for query '{query}': {e}")
-            return [] # Return empty list on error
+            return [], 0 # Return empty list on error
+    
+    def get_vocabulary_page(self, query: str = '', after: Optional[str] = None, limit: int = 50,
+                            sort: Optional[str] = None, fuzzy: bool = False) -> Tuple[List[Dict[str, str]], Optional[str], int]:
+        """Returns one page of vocabulary entries, optionally filtered by a search query.
+
+        Pages use keyset cursors: pass the `next_cursor` of one page as `after` to get the next.
+        A cursor holds the sort key of the page's last entry, so paging continues in place even
+        if that entry is deleted. Only the requested page is selected and copied from the search
+        index, which also provides the total count, so the cost of a page does not grow with its position.
+
+        Args:
+            query (str): The search term (see `search_vocabulary_ranked()`). Empty lists all entries.
+            after (Optional[str]): The `next_cursor` of the previous page, or None for the first page.
+            limit (int): The page size.
+            sort (Optional[str]): 'relevance' (searches only), 'alphabetical' or 'insertion'.
+                                  Defaults to relevance for searches and insertion order otherwise.
+            fuzzy (bool): Also match English words close to the query (searches only).
+
+        Returns:
+            Tuple[List[Dict[str, str]], Optional[str], int]: The entries on the page, the cursor for the
+                                                             next page (None on the last page) and the
+                                                             total number of matching entries.
+        """
+        query = (query or '').strip()
+        limit = max(limit, 1)
+        if sort not in FullTextIndex.SORT_ORDERS or (sort == 'relevance' and not query):
+            sort = 'relevance' if query else 'insertion'
+        try:
+            self.store.refresh() # Picks up changes made by other workers before querying the index
+            if query:
+                near_keys = None
+                if fuzzy:
+                    near_keys = {self.store.normalize(word): distance for word, distance in self.fuzzy_index.lookup(query)}
+                results, total, next_cursor = self.search_index.rank(query, limit, near_keys, after, sort)
+            else:
+                results, total, next_cursor = self.search_index.page(after, limit, sort)
+            return results, next_cursor, total
+        except Exception as e:
+            logging.error(f"Error loading vocabulary page (query '{query}', after '{after}'): {e}")
+            return [], None, 0
+
+    def did_you_mean(self, word: str, limit: int = 3) -> List[str]:
+        """Returns existing English words that look like misspellings of (or by) `word`.
+
+        Candidates are found in a deletion dictionary over the stored words, within an
+        edit distance of 2 (1 for words of up to four letters), ignoring case and diacritics.
+        The word itself is never suggested.
+
+        Args:
+            word (str): The word about to be added or searched for.
+            limit (int): The maximum number of suggestions to return.
+
+        Returns:
+            List[str]: Up to `limit` existing words, closest first. Empty on error.
+        """
+        try:
+            self.store.refresh() # Picks up words added or deleted by other workers
+            key = self.store.normalize(word)
+            matches = [match for match, _ in self.fuzzy_index.lookup(word) if self.store.normalize(match) != key]
+            return matches[:limit]
+        except Exception as e:
+            logging.error(f"Error looking up words similar to '{word}': {e}")
+            return []
+
+    def suggest_words(self, prefix: str, limit: int = 10) -> List[str]:
+        """Returns existing English words starting with `prefix`, for autocompletion.
+
+        Case and diacritics are ignored. Uses a binary search over the sorted
+        headwords instead of a full search.
+
+        Args:
+            prefix (str): The text typed so far.
+            limit (int): The maximum number of completions to return.
+
+        Returns:
+            List[str]: Up to `limit` matching words in alphabetical order. Empty on error.
+        """
+        try:
+            self.store.refresh() # Picks up words added or deleted by other workers
+            return self.suggest_index.complete(prefix, limit)
+        except Exception as e:
+            logging.error(f"Error suggesting words for prefix '{prefix}': {e}")
+            return []
     
     def delete_word(self, word: str) -> bool:
-        """Deletes a word (case-insensitive) from the vocabulary CSV file.
+        """Deletes a word (case-insensitive) from the vocabulary storage.
 
         Args:
             word (str): The English word to delete.
@@ -630,29 +1329,12 @@ class VocabularyService:
             return True # Pretend it worked for the UI flash message
 
         try:
-            vocabulary = self.get_all_vocabulary()
-            if not vocabulary: # No words to delete from
-                return False
-
-            # Filter out the word to delete, comparing case-insensitively
-            updated_vocabulary = [
-                entry for entry in vocabulary 
-                if entry.get('English Word', '').lower() != word_to_delete_lower
-            ]
-            
-            if len(updated_vocabulary) == len(vocabulary):
+            if not self.store.delete(word_to_delete_lower):
                 # Word not found, so no changes made
                 logging.warning(f"Word '{word}' not found for deletion.")
                 return False
             
-            # Rewrite the CSV file with the updated vocabulary
-            with open(self.csv_file, 'w', newline='', encoding='utf-8') as file:
-                # Ensure fieldnames are correctly sourced from self.headers
-                writer = csv.DictWriter(file, fieldnames=self.headers)
-                writer.writeheader()
-                writer.writerows(updated_vocabulary)
-            
-            logging.info(f"Successfully deleted word: '{word}' from {self.csv_file}")
+            logging.info(f"Successfully deleted word: '{word}' from {self.storage} storage.")
             return True
             
         except IOError as e:
@@ -672,16 +1354,96 @@ class VocabularyService:
             Optional[Dict[str, str]]: The word's data if found, None otherwise.
         """
         try:
-            vocabulary = self.get_all_vocabulary()
-            word_lower = word.lower().strip()
-            for entry in vocabulary:
-                if entry.get('English Word', '').lower() == word_lower:
-                    return entry
-            return None
+            return self.store.get(word)
         except Exception as e:
             logging.error(f"Error getting word '{word}': {e}")
             return None
 
+    def update_words(self, updates: Dict[str, Dict[str, str]]) -> int:
+        """Update several words with a single storage write (one file rewrite, journal append or transaction).
+        On Vercel, this will log the attempt but not write to CSV due to read-only filesystem.
+
+        Args:
+            updates (Dict[str, Dict[str, str]]): The new data (some or all fields) by English word.
+
+        Returns:
+            int: The number of words updated (all of them on Vercel), 0 if the write failed.
+        """
+        if IS_VERCEL:
+            logging.info(f"On Vercel: Simulating update of {len(updates)} words. CSV not modified.")
+            return len(updates)
+
+        try:
+            return self.store.update_many(updates)
+        except Exception as e:
+            logging.error(f"Error updating {len(updates)} words: {e}")
+            return 0
+
+    def refresh_words(self, refresh_requests: List[Tuple[str, List[str]]], deadline: Optional[float] = None) -> List[Dict[str, Dict[str, Any]]]:
+        """Fetches new content for several cells of several words and stores it with a single write.
+
+        Each word gets one definition lookup, however many of its English columns are refreshed,
+        and all Vietnamese columns are translated with one batched call. A Vietnamese column is
+        translated from the new English text when that is refreshed in the same request. Results
+        that are placeholders (e.g. a failed translation) are not stored. The content is fetched like
+        the quality scanner's fixes (see `quality_scan.fetch_replacements()`).
+
+        Args:
+            refresh_requests (List[Tuple[str, List[str]]]): (word, columns) pairs; columns are keys of `REFRESH_COLUMNS`.
+            deadline (Optional[float]): A `time.monotonic()` time by which the definition lookups must be done.
+                          Defaults to `ADD_WORD_DEADLINE` seconds from now.
+
+        Returns:
+            List[Dict[str, Dict[str, Any]]]: Per request, the result of each column: {'success': True, 'content': ...}
+                          or {'success': False, 'message': ...}.
+        """
+        deadline = time.monotonic() + ADD_WORD_DEADLINE if deadline is None else deadline
+        rows = [self.get_word(word) for word, _ in refresh_requests]
+
+        def lookup_all(words: List[str]) -> List[Optional[Dict[str, str]]]:
+            try:
+                return self._run_parallel([lambda word=word: self.get_english_definition(word) for word in words], deadline)
+            except TimeoutError as e:
+                logging.error(f"Timed out refreshing definitions of {len(words)} words: {e}")
+            except Exception as e:
+                logging.error(f"Error refreshing definitions of {len(words)} words: {e}")
+            return [None] * len(words)
+
+        found = [(row, [REFRESH_COLUMNS[column] for column in columns if column in REFRESH_COLUMNS])
+                 for (_, columns), row in zip(refresh_requests, rows) if row]
+        replacements = iter(fetch_replacements(self, found, lookup_all, deadline))
+
+        results: List[Dict[str, Dict[str, Any]]] = []
+        updates: Dict[str, Dict[str, str]] = {}
+        for (word, columns), row in zip(refresh_requests, rows):
+            result: Dict[str, Dict[str, Any]] = {}
+            results.append(result)
+            new_data = next(replacements) if row else {}
+            for column in columns:
+                field = REFRESH_COLUMNS.get(column)
+                if field is None:
+                    result[column] = {'success': False, 'message': f"Unknown column '{column}'"}
+                elif not row:
+                    result[column] = {'success': False, 'message': 'Word not found'}
+                elif field in new_data:
+                    result[column] = {'success': True, 'content': new_data[field]}
+                elif field in TRANSLATION_SOURCES and is_placeholder(TRANSLATION_SOURCES[field],
+                                                                     new_data.get(TRANSLATION_SOURCES[field], row.get(TRANSLATION_SOURCES[field]))):
+                    result[column] = {'success': False, 'message': 'No English text to translate'}
+                else:
+                    result[column] = {'success': False, 'message': 'Failed to generate new content'}
+            if new_data:
+                updates[row['English Word']] = new_data
+
+        updates = {word: new_data for word, new_data in updates.items() if new_data}
+        if updates and self.update_words(updates) < len(updates):
+            logging.error(f"Failed to store refreshed content of {len(updates)} words")
+            for result in results:
+                for column, cell in result.items():
+                    if cell['success']:
+                        result[column] = {'success': False, 'message': 'Failed to update word in vocabulary'}
+        return results
+
     def update_word(self, word: str, new_data: Dict[str, str]) -> bool:
         """Update a word's data in the vocabulary.
         On Vercel, this will log the attempt but not write to CSV due to read-only filesystem.
@@ -700,23 +1462,7 @@ class VocabularyService:
             return True 
 
         try:
-            vocabulary = self.get_all_vocabulary()
-            word_lower = word.lower().strip()
-            updated = False
-            
-            for entry in vocabulary:
-                if entry.get('English Word', '').lower() == word_lower:
-                    entry.update(new_data)
-                    updated = True
-                    break
-            
-            if updated:
-                with open(self.csv_file, 'w', newline='', encoding='utf-8') as file:
-                    writer = csv.DictWriter(file, fieldnames=self.headers)
-                    writer.writeheader()
-                    writer.writerows(vocabulary)
-                return True
-            return False
+            return self.store.update(word, new_data)
         except Exception as e:
             logging.error(f"Error updating word '{word}': {e}")
             return False
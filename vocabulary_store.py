@@ -0,0 +1,876 @@
+import csv
+import os
+import json
+import logging
+import sqlite3
+import tempfile
+import threading
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from typing import List, Dict, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError: # Not available on Windows; cross-process locking is skipped there.
+    fcntl = None
+
+
+# Journal record written by `CsvVocabularyStore.compact()` before it swaps in the compacted CSV.
+COMPACTED = 'compacted'
+
+
+class VocabularyStore(ABC):
+    """Storage backend interface used by `VocabularyService`.
+
+    Rows are dictionaries keyed by the CSV headers. Words are matched
+    case-insensitively using `normalize()`.
+
+    Secondary indexes (e.g. for search) register as listeners. A listener has
+    `reset(rows)`, called with all rows when data is (re)loaded, and `put(key, row)`,
+    called after every change with the row now stored for `key` (None once removed).
+    """
+    def __init__(self, headers: List[str]):
+        self.headers = headers
+        self.key_column = headers[0]
+        self._listeners = []
+
+    def add_listener(self, listener):
+        """Registers a listener and feeds it the current rows."""
+        self._listeners.append(listener)
+        if not self.refresh(): # A reload already resets every listener
+            listener.reset(self.all())
+
+    def _notify_reset(self, rows: List[Dict[str, str]]):
+        for listener in self._listeners:
+            listener.reset(rows)
+
+    def _notify_put(self, key: str, row: Optional[Dict[str, str]]):
+        for listener in self._listeners:
+            listener.put(key, row)
+
+    @staticmethod
+    def normalize(word: Optional[str]) -> str:
+        """Returns the index key for a word (stripped and case-folded)."""
+        return (word or '').strip().casefold()
+
+    def refresh(self) -> bool:
+        """Picks up changes made outside this instance. Returns True if data was reloaded."""
+        return False
+
+    @abstractmethod
+    def all(self) -> List[Dict[str, str]]:
+        """Returns copies of all rows, in insertion order."""
+
+    @abstractmethod
+    def get(self, word: str) -> Optional[Dict[str, str]]:
+        """Returns a copy of the row for `word`, or None."""
+
+    def exists(self, word: str) -> bool:
+        """Checks whether `word` is in the vocabulary."""
+        return self.get(word) is not None
+
+    @abstractmethod
+    def __len__(self) -> int:
+        """Returns the number of rows."""
+
+    @abstractmethod
+    def append(self, row: Dict[str, str]):
+        """Adds a new row."""
+
+    @abstractmethod
+    def delete(self, word: str) -> bool:
+        """Removes `word`. Returns False if it was not found."""
+
+    @abstractmethod
+    def update(self, word: str, new_data: Dict[str, str]) -> bool:
+        """Updates the row for `word` with `new_data`. Returns False if it was not found."""
+
+    def update_many(self, updates: Dict[str, Dict[str, str]]) -> int:
+        """Updates the rows of several words.
+
+        Args:
+            updates (Dict[str, Dict[str, str]]): The new data (some or all fields) by word.
+
+        Returns:
+            int: The number of words found and updated.
+        """
+        return sum(self.update(word, new_data) for word, new_data in updates.items())
+
+    @abstractmethod
+    def insert_if_absent(self, row: Dict[str, str]) -> bool:
+        """Atomically adds `row` unless its word already exists.
+
+        Returns:
+            bool: True if the row was added, False if the word was already present.
+        """
+
+    def insert_many(self, rows: List[Dict[str, str]], ignore_existing: bool = False) -> int:
+        """Adds several rows.
+
+        Args:
+            rows (List[Dict[str, str]]): The rows to add.
+            ignore_existing (bool): Skip rows whose word already exists.
+
+        Returns:
+            int: The number of rows added.
+        """
+        if ignore_existing:
+            return sum(self.insert_if_absent(row) for row in rows)
+        for row in rows:
+            self.append(row)
+        return len(rows)
+
+    @abstractmethod
+    def export_csv(self) -> str:
+        """Returns the path of a CSV file holding the complete, current vocabulary."""
+
+
+class CsvVocabularyStore(VocabularyStore):
+    """Keeps the vocabulary CSV resident in memory with a case-insensitive word index.
+
+    The CSV file is parsed once and reused for every read. The file's
+    (mtime, size, inode) signature is checked before each access and the data is
+    reloaded only when the file was changed by someone else (another worker, a manual
+    edit, ...). Writes made through the store update the in-memory copy directly.
+
+    In journaled mode, changes are not written into the CSV file. Each add, update
+    or delete is appended as one JSON line to `<csv_file>.journal` and replayed on
+    top of the CSV when loading. Once the journal passes a size or ratio threshold
+    a background thread folds it back into a compacted CSV file.
+
+    Access is safe across processes (e.g. several gunicorn workers): readers take a
+    shared `fcntl` lock on `<csv_file>.lock` while loading, writers take an exclusive
+    one, and whole-file rewrites go to a temporary file that atomically replaces the
+    CSV via `os.replace`, so a reader never sees a half-written file.
+    """
+    def __init__(self, csv_file: str, headers: List[str], journal: bool = False,
+                 compact_bytes: int = 1024 * 1024, compact_ratio: float = 0.5):
+        """Initializes the store. Nothing is read until the first access.
+
+        Args:
+            csv_file (str): The path to the vocabulary CSV file.
+            headers (List[str]): The expected CSV column names. The first one is the word column.
+            journal (bool): Whether to record changes in an append-only journal instead of
+                            rewriting the CSV file on every update and delete.
+            compact_bytes (int): Journal size (in bytes) that triggers a background compaction.
+            compact_ratio (float): Journal records per vocabulary row that trigger a background compaction.
+        """
+        super().__init__(headers)
+        self.csv_file = csv_file
+        self.journal_enabled = journal
+        self.journal_file = f"{csv_file}.journal"
+        self.lock_file = f"{csv_file}.lock"
+        self.compact_bytes = compact_bytes
+        self.compact_ratio = compact_ratio
+        self._rows: List[Dict[str, str]] = []
+        self._index: Dict[str, List[Dict[str, str]]] = {}
+        self._signature: Optional[Tuple[int, int, int]] = None
+        self._journal_inode: Optional[int] = None
+        self._journal_offset = 0
+        self._journal_records = 0
+        self._compaction_thread: Optional[threading.Thread] = None
+        self._lock = threading.RLock()
+        self._file_lock_held: Optional[bool] = None # None, or True/False for an exclusive/shared lock
+        self._loading = False # Listeners are reset once a load completes instead of per record
+
+    @contextmanager
+    def _file_lock(self, exclusive: bool):
+        """Holds an advisory lock on the lock file for the duration of the block.
+
+        Nested use from the same thread reuses the lock already held; upgrading a
+        shared lock to an exclusive one is not supported. Must be called with `_lock` held.
+        """
+        if self._file_lock_held is not None:
+            if exclusive and not self._file_lock_held:
+                raise RuntimeError("Cannot upgrade a shared vocabulary lock to an exclusive lock")
+            yield
+            return
+        if fcntl is None:
+            yield
+            return
+        try:
+            lock_fd = os.open(self.lock_file, os.O_RDWR | os.O_CREAT, 0o644)
+        except OSError as e:
+            # e.g. a read-only filesystem, where nobody can write concurrently anyway
+            logging.debug(f"Could not open lock file {self.lock_file}, continuing without it: {e}")
+            yield
+            return
+        try:
+            fcntl.flock(lock_fd, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            self._file_lock_held = exclusive
+            yield
+        finally:
+            self._file_lock_held = None
+            fcntl.flock(lock_fd, fcntl.LOCK_UN)
+            os.close(lock_fd)
+
+    @staticmethod
+    def _stat_signature(path: str) -> Optional[Tuple[int, int, int]]:
+        """Returns (mtime_ns, size, inode) of `path`, or None if it does not exist."""
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+
+    def _file_signature(self) -> Optional[Tuple[int, int, int]]:
+        """Returns the signature of the CSV file."""
+        return self._stat_signature(self.csv_file)
+
+    def _load(self, signature: Optional[Tuple[int, int, int]]):
+        """Parses the CSV file (and replays the journal) to rebuild the in-memory rows and index."""
+        rows = []
+        if signature is not None:
+            with open(self.csv_file, 'r', newline='', encoding='utf-8') as file:
+                reader = csv.DictReader(file)
+                if reader.fieldnames != self.headers:
+                    logging.warning(f"CSV headers mismatch in {self.csv_file}. Expected: {self.headers}, Found: {reader.fieldnames}. Data might be skewed.")
+                rows = list(reader)
+        self._rows = rows
+        self._index = {}
+        for row in rows:
+            self._index.setdefault(self.normalize(row.get(self.key_column)), []).append(row)
+        self._signature = signature
+        self._journal_inode = None
+        self._journal_offset = 0
+        self._journal_records = 0
+        if self.journal_enabled:
+            self._loading = True
+            try:
+                self._replay_journal()
+            finally:
+                self._loading = False
+        self._notify_reset(self._rows)
+        logging.debug(f"Loaded {len(self._rows)} vocabulary entries from {self.csv_file}")
+
+    def _journal_is_current(self) -> bool:
+        """Checks whether every record of the journal file has been applied."""
+        journal_signature = self._stat_signature(self.journal_file)
+        if journal_signature is None:
+            return self._journal_offset == 0
+        return journal_signature[2] == self._journal_inode and journal_signature[1] == self._journal_offset
+
+    def _replay_journal(self) -> bool:
+        """Applies journal records that were appended since the last replay.
+
+        Returns:
+            bool: False if the journal was replaced or truncated and a full reload is needed.
+        """
+        try:
+            file = open(self.journal_file, 'rb')
+        except FileNotFoundError:
+            return self._journal_offset == 0
+        with file:
+            stat = os.fstat(file.fileno())
+            inode = stat.st_ino
+            if self._journal_inode is not None and inode != self._journal_inode:
+                return False
+            if stat.st_size < self._journal_offset:
+                return False
+            file.seek(self._journal_offset)
+            data = file.read()
+        if self._journal_inode is None:
+            self._journal_inode = inode
+        # Only consume complete lines; a partially written record is picked up next time.
+        complete = data[:data.rfind(b'\n') + 1]
+        records = [] # (journal offset, record)
+        position = self._journal_offset
+        for line in complete.splitlines(keepends=True):
+            start, position = position, position + len(line)
+            if not line.strip():
+                continue
+            try:
+                records.append((start, json.loads(line)))
+            except ValueError as e:
+                logging.error(f"Skipping unreadable journal record in {self.journal_file}: {e}")
+        # A compaction that died after swapping in the CSV left the records it folded in the journal;
+        # its marker names that CSV and where the records it did not fold begin.
+        folded_until = 0
+        for start, record in records:
+            if record.get('op') == COMPACTED and tuple(record.get('csv') or ()) == self._signature:
+                folded_until = record.get('offset', 0)
+        for start, record in records:
+            if start < folded_until or record.get('op') == COMPACTED:
+                continue
+            self._apply(record)
+            self._journal_records += 1
+        self._journal_offset += len(complete)
+        return True
+
+    def refresh(self) -> bool:
+        """Reloads the CSV file if it changed on disk since it was last read.
+
+        In journaled mode, records appended to the journal by someone else are
+        replayed incrementally without re-parsing the CSV file.
+
+        Returns:
+            bool: True if the data was (re)loaded, False if the resident copy was current.
+        """
+        with self._lock:
+            if self._is_current(self._file_signature()):
+                return False
+            with self._file_lock(exclusive=False):
+                signature = self._file_signature()
+                if self._csv_is_current(signature):
+                    if not self.journal_enabled or self._journal_is_current():
+                        return False
+                    if self._replay_journal():
+                        return True
+                self._load(signature)
+                return True
+
+    def _csv_is_current(self, signature: Optional[Tuple[int, int, int]]) -> bool:
+        """Checks whether the resident rows were loaded from the CSV file with `signature`."""
+        return signature == self._signature and (signature is not None or not self._rows)
+
+    def _is_current(self, signature: Optional[Tuple[int, int, int]]) -> bool:
+        """Checks whether the resident rows reflect the CSV file and the whole journal."""
+        return self._csv_is_current(signature) and (not self.journal_enabled or self._journal_is_current())
+
+    def all(self) -> List[Dict[str, str]]:
+        """Returns copies of all rows, in file order."""
+        with self._lock:
+            self.refresh()
+            return [dict(row) for row in self._rows]
+
+    def get(self, word: str) -> Optional[Dict[str, str]]:
+        """Returns a copy of the first row for `word` (case-insensitive), or None."""
+        with self._lock:
+            self.refresh()
+            matches = self._index.get(self.normalize(word))
+            return dict(matches[0]) if matches else None
+
+    def exists(self, word: str) -> bool:
+        """Checks whether `word` (case-insensitive) is in the vocabulary."""
+        with self._lock:
+            self.refresh()
+            return bool(self._index.get(self.normalize(word)))
+
+    def __len__(self) -> int:
+        with self._lock:
+            self.refresh()
+            return len(self._rows)
+
+    def append(self, row: Dict[str, str]):
+        """Appends a row to the CSV file (or the journal) and to the in-memory index."""
+        with self._lock, self._file_lock(exclusive=True):
+            self.refresh()
+            self._append(row)
+
+    def insert_if_absent(self, row: Dict[str, str]) -> bool:
+        """Appends `row` unless its word exists, checking and writing under one exclusive lock."""
+        with self._lock, self._file_lock(exclusive=True):
+            self.refresh()
+            if self._index.get(self.normalize(row.get(self.key_column))):
+                return False
+            self._append(row)
+            return True
+
+    def insert_many(self, rows: List[Dict[str, str]], ignore_existing: bool = False) -> int:
+        """Appends several rows with a single write, under one exclusive lock.
+
+        Args:
+            rows (List[Dict[str, str]]): The rows to add.
+            ignore_existing (bool): Skip rows whose word already exists (or appears earlier in `rows`).
+
+        Returns:
+            int: The number of rows added.
+        """
+        with self._lock, self._file_lock(exclusive=True):
+            self.refresh()
+            if ignore_existing:
+                new_rows, seen = [], set()
+                for row in rows:
+                    key = self.normalize(row.get(self.key_column))
+                    if key not in seen and not self._index.get(key):
+                        seen.add(key)
+                        new_rows.append(row)
+                rows = new_rows
+            self._append(*rows)
+            return len(rows)
+
+    def _append(self, *rows: Dict[str, str]):
+        """Writes new rows; the caller holds the exclusive lock and has refreshed."""
+        rows = [{header: row.get(header, '') for header in self.headers} for row in rows]
+        if not rows:
+            return
+        if self.journal_enabled:
+            self._write_journal(*({'op': 'add', 'row': row} for row in rows))
+        else:
+            with open(self.csv_file, 'a', newline='', encoding='utf-8') as file:
+                writer = csv.DictWriter(file, fieldnames=self.headers)
+                writer.writerows(rows)
+            self._signature = self._file_signature()
+        for row in rows:
+            self._apply({'op': 'add', 'row': row})
+
+    def delete(self, word: str) -> bool:
+        """Removes every row for `word` (case-insensitive).
+
+        Returns:
+            bool: True if at least one row was removed, False if the word was not found.
+        """
+        with self._lock, self._file_lock(exclusive=True):
+            self.refresh()
+            key = self.normalize(word)
+            matches = self._index.get(key)
+            if not matches:
+                return False
+            record = {'op': 'delete', 'word': key}
+            if self.journal_enabled:
+                self._write_journal(record)
+            else:
+                self._rewrite([row for row in self._rows if not any(row is match for match in matches)])
+            self._apply(record)
+            return True
+
+    def update(self, word: str, new_data: Dict[str, str]) -> bool:
+        """Updates the first row for `word` (case-insensitive).
+
+        Returns:
+            bool: True if the word was found and updated, False otherwise.
+        """
+        with self._lock, self._file_lock(exclusive=True):
+            self.refresh()
+            key = self.normalize(word)
+            matches = self._index.get(key)
+            if not matches:
+                return False
+            record = {'op': 'update', 'word': key, 'data': new_data}
+            if self.journal_enabled:
+                self._write_journal(record)
+            else:
+                row = matches[0]
+                updated = dict(row)
+                updated.update(new_data)
+                self._rewrite([updated if existing is row else existing for existing in self._rows])
+            self._apply(record)
+            return True
+
+    def update_many(self, updates: Dict[str, Dict[str, str]]) -> int:
+        """Updates the first row of several words (case-insensitive) with a single write, under one exclusive lock.
+
+        Returns:
+            int: The number of words found and updated.
+        """
+        with self._lock, self._file_lock(exclusive=True):
+            self.refresh()
+            records = [{'op': 'update', 'word': self.normalize(word), 'data': new_data}
+                       for word, new_data in updates.items() if self._index.get(self.normalize(word))]
+            if not records:
+                return 0
+            if self.journal_enabled:
+                self._write_journal(*records)
+            else:
+                updated_rows = {}
+                for record in records:
+                    row = self._index[record['word']][0]
+                    updated_rows.setdefault(id(row), dict(row)).update(record['data'])
+                self._rewrite([updated_rows.get(id(existing), existing) for existing in self._rows])
+            for record in records:
+                self._apply(record)
+            return len(records)
+
+    def _apply(self, record: Dict):
+        """Applies one change record (add, update or delete) to the in-memory rows and index."""
+        op = record.get('op')
+        changed_keys = []
+        if op == 'add':
+            row = {header: record['row'].get(header, '') for header in self.headers}
+            self._rows.append(row)
+            key = self.normalize(row[self.key_column])
+            self._index.setdefault(key, []).append(row)
+            changed_keys.append(key)
+        elif op == 'delete':
+            matches = self._index.pop(record['word'], None)
+            if matches:
+                self._rows = [row for row in self._rows if not any(row is match for match in matches)]
+                changed_keys.append(record['word'])
+        elif op == 'update':
+            key = record['word']
+            matches = self._index.get(key)
+            if not matches:
+                return
+            row = matches[0]
+            row.update(record['data'])
+            changed_keys.append(key)
+            new_key = self.normalize(row.get(self.key_column))
+            if new_key != key:
+                matches.remove(row)
+                if not matches:
+                    del self._index[key]
+                self._index.setdefault(new_key, []).append(row)
+                changed_keys.append(new_key)
+        else:
+            logging.warning(f"Ignoring unknown journal operation: {op}")
+        if not self._loading:
+            for key in changed_keys:
+                matches = self._index.get(key)
+                self._notify_put(key, matches[0] if matches else None)
+
+    def _write_journal(self, *records: Dict):
+        """Appends change records to the journal and schedules a compaction if it grew too large."""
+        with open(self.journal_file, 'ab') as file:
+            file.write(b''.join(json.dumps(record, ensure_ascii=False).encode('utf-8') + b'\n' for record in records))
+            file.flush()
+            self._journal_offset = file.tell()
+            self._journal_inode = os.fstat(file.fileno()).st_ino
+        self._journal_records += len(records)
+        if self._needs_compaction():
+            self._start_background_compaction()
+
+    def _needs_compaction(self) -> bool:
+        """Checks the journal against the size and ratio thresholds."""
+        if self._journal_records == 0:
+            return False
+        return (self._journal_offset >= self.compact_bytes or
+                self._journal_records >= max(1, len(self._rows)) * self.compact_ratio)
+
+    def _start_background_compaction(self):
+        """Starts a compaction thread unless one is already running."""
+        if self._compaction_thread and self._compaction_thread.is_alive():
+            return
+        self._compaction_thread = threading.Thread(target=self._compact_in_background, name='vocabulary-compactor', daemon=True)
+        self._compaction_thread.start()
+
+    def _compact_in_background(self):
+        try:
+            self.compact()
+        except Exception as e:
+            logging.error(f"Background compaction of {self.journal_file} failed: {e}")
+
+    def compact(self):
+        """Folds the journal into the CSV file so the CSV holds the fully materialized vocabulary.
+
+        The snapshot is written without holding any lock; records appended to the
+        journal meanwhile are carried over to the new, shortened journal. If another
+        process compacted first, this compaction is abandoned.
+        """
+        if not self.journal_enabled:
+            return
+        with self._lock:
+            self.refresh()
+            if self._journal_records == 0:
+                return
+            snapshot = [dict(row) for row in self._rows]
+            snapshot_signature = self._signature
+            snapshot_inode = self._journal_inode
+            snapshot_offset = self._journal_offset
+        temp_file = write_temp_csv(self.csv_file, self.headers, snapshot)
+        try:
+            with self._lock, self._file_lock(exclusive=True):
+                journal_signature = self._stat_signature(self.journal_file)
+                if (self._file_signature() != snapshot_signature or journal_signature is None
+                        or journal_signature[2] != snapshot_inode):
+                    logging.info(f"{self.journal_file} was compacted concurrently; skipping.")
+                    return
+                with open(self.journal_file, 'rb') as file:
+                    file.seek(snapshot_offset)
+                    tail = file.read()
+                # Swapping the CSV and shortening the journal are two steps. Should the process die in
+                # between, this marker tells the next load which records the new CSV already holds
+                # (os.replace keeps the signature of the temporary file).
+                marker = {'op': COMPACTED, 'csv': list(self._stat_signature(temp_file)), 'offset': snapshot_offset}
+                with open(self.journal_file, 'ab') as file:
+                    file.write(json.dumps(marker).encode('utf-8') + b'\n')
+                    file.flush()
+                    os.fsync(file.fileno())
+                os.replace(temp_file, self.csv_file)
+                write_atomic(self.journal_file, tail)
+                # Rebuild from the compacted files; the tail records are replayed on top.
+                self._load(self._file_signature())
+        finally:
+            if os.path.exists(temp_file):
+                os.remove(temp_file)
+        logging.info(f"Compacted {self.journal_file} into {self.csv_file}")
+
+    def export_csv(self) -> str:
+        """Compacts any pending journal records and returns the CSV file path."""
+        self.compact()
+        return self.csv_file
+
+    def _rewrite(self, rows: List[Dict[str, str]]):
+        """Atomically replaces the CSV file with `rows` and records the new signature."""
+        write_csv(self.csv_file, self.headers, rows)
+        self._signature = self._file_signature()
+
+
+class SqliteVocabularyStore(VocabularyStore):
+    """Stores the vocabulary in an SQLite database (WAL mode).
+
+    Words are kept unique case-insensitively through an indexed `word_key` column,
+    so lookups, updates and deletes touch a single row instead of the whole file.
+    The table has a stable integer rowid and one TEXT column per field, and, when
+    the SQLite build supports FTS5, an external-content `vocabulary_fts` table is
+    kept in sync by triggers for full-text queries. A `vocabulary_meta.version`
+    counter, bumped by triggers on every change, lets `refresh()` notice writes made
+    by other processes.
+    """
+    COLUMNS = ['english_word', 'english_definition', 'english_example', 'vietnamese_definition', 'vietnamese_example']
+
+    def __init__(self, db_file: str, headers: List[str]):
+        """Initializes the store and creates the schema if needed.
+
+        Args:
+            db_file (str): The path to the SQLite database file.
+            headers (List[str]): The vocabulary field names, in the order of `COLUMNS`.
+        """
+        super().__init__(headers)
+        if len(headers) != len(self.COLUMNS):
+            raise ValueError(f"Expected {len(self.COLUMNS)} headers, got {len(headers)}")
+        self.db_file = db_file
+        self._local = threading.local()
+        self._lock = threading.RLock()
+        self._version: Optional[int] = None
+        self._create_schema()
+
+    def _connection(self) -> sqlite3.Connection:
+        """Returns this thread's connection to the database (in autocommit mode)."""
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(self.db_file, timeout=30, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        return connection
+
+    @contextmanager
+    def _transaction(self):
+        """Runs the block in a write transaction and keeps listeners in sync.
+
+        The block gets the connection and a list to which it appends the
+        (key, row) changes it made; listeners are told about them after the commit.
+        If another process changed the database since this instance last looked,
+        listeners are reset from the full table instead.
+        """
+        with self._lock:
+            connection = self._connection()
+            changes = []
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                before = self._read_version(connection)
+                yield connection, changes
+                after = self._read_version(connection)
+                connection.execute("COMMIT")
+            except BaseException:
+                connection.execute("ROLLBACK")
+                raise
+            stale = before != self._version
+            self._version = after
+            if stale:
+                self._notify_reset(self.all())
+            else:
+                for key, row in changes:
+                    self._notify_put(key, row)
+
+    @staticmethod
+    def _read_version(connection: sqlite3.Connection) -> int:
+        return connection.execute("SELECT version FROM vocabulary_meta WHERE id = 1").fetchone()[0]
+
+    def _create_schema(self):
+        columns = ", ".join(f"{column} TEXT NOT NULL DEFAULT ''" for column in self.COLUMNS)
+        connection = self._connection()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            connection.execute(f"CREATE TABLE IF NOT EXISTS vocabulary (id INTEGER PRIMARY KEY AUTOINCREMENT, word_key TEXT NOT NULL, {columns})")
+            connection.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_vocabulary_word_key ON vocabulary (word_key)")
+            connection.execute("CREATE TABLE IF NOT EXISTS vocabulary_meta (id INTEGER PRIMARY KEY CHECK (id = 1), version INTEGER NOT NULL)")
+            connection.execute("INSERT OR IGNORE INTO vocabulary_meta (id, version) VALUES (1, 0)")
+            for event in ('INSERT', 'UPDATE', 'DELETE'):
+                connection.execute(f"CREATE TRIGGER IF NOT EXISTS vocabulary_version_{event.lower()} AFTER {event} ON vocabulary BEGIN "
+                                   f"UPDATE vocabulary_meta SET version = version + 1 WHERE id = 1; END")
+            try:
+                field_list = ", ".join(self.COLUMNS)
+                new_values = ", ".join(f"new.{column}" for column in self.COLUMNS)
+                old_values = ", ".join(f"old.{column}" for column in self.COLUMNS)
+                connection.execute(f"CREATE VIRTUAL TABLE IF NOT EXISTS vocabulary_fts USING fts5({field_list}, content='vocabulary', content_rowid='id')")
+                connection.execute(f"CREATE TRIGGER IF NOT EXISTS vocabulary_fts_insert AFTER INSERT ON vocabulary BEGIN "
+                                   f"INSERT INTO vocabulary_fts (rowid, {field_list}) VALUES (new.id, {new_values}); END")
+                connection.execute(f"CREATE TRIGGER IF NOT EXISTS vocabulary_fts_delete AFTER DELETE ON vocabulary BEGIN "
+                                   f"INSERT INTO vocabulary_fts (vocabulary_fts, rowid, {field_list}) VALUES ('delete', old.id, {old_values}); END")
+                connection.execute(f"CREATE TRIGGER IF NOT EXISTS vocabulary_fts_update AFTER UPDATE ON vocabulary BEGIN "
+                                   f"INSERT INTO vocabulary_fts (vocabulary_fts, rowid, {field_list}) VALUES ('delete', old.id, {old_values}); "
+                                   f"INSERT INTO vocabulary_fts (rowid, {field_list}) VALUES (new.id, {new_values}); END")
+            except sqlite3.OperationalError as e:
+                logging.warning(f"SQLite FTS5 is not available, full-text table not created: {e}")
+            connection.execute("COMMIT")
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+
+    def _to_row(self, record) -> Dict[str, str]:
+        return dict(zip(self.headers, record))
+
+    def _select_row(self, connection: sqlite3.Connection, key: str) -> Optional[Dict[str, str]]:
+        record = connection.execute(
+            f"SELECT {', '.join(self.COLUMNS)} FROM vocabulary WHERE word_key = ?", (key,)).fetchone()
+        return self._to_row(record) if record else None
+
+    def refresh(self) -> bool:
+        """Resets listeners from the full table if the database changed outside this instance."""
+        with self._lock:
+            version = self._read_version(self._connection())
+            if version == self._version:
+                return False
+            self._version = version
+            self._notify_reset(self.all())
+            return True
+
+    def all(self) -> List[Dict[str, str]]:
+        records = self._connection().execute(f"SELECT {', '.join(self.COLUMNS)} FROM vocabulary ORDER BY id").fetchall()
+        return [self._to_row(record) for record in records]
+
+    def get(self, word: str) -> Optional[Dict[str, str]]:
+        return self._select_row(self._connection(), self.normalize(word))
+
+    def exists(self, word: str) -> bool:
+        return self._connection().execute(
+            "SELECT 1 FROM vocabulary WHERE word_key = ?", (self.normalize(word),)).fetchone() is not None
+
+    def __len__(self) -> int:
+        return self._connection().execute("SELECT COUNT(*) FROM vocabulary").fetchone()[0]
+
+    def append(self, row: Dict[str, str]):
+        """Inserts a row. Raises `sqlite3.IntegrityError` if the word already exists."""
+        self.insert_many([row])
+
+    def insert_if_absent(self, row: Dict[str, str]) -> bool:
+        return self.insert_many([row], ignore_existing=True) > 0
+
+    def insert_many(self, rows: List[Dict[str, str]], ignore_existing: bool = False) -> int:
+        """Inserts several rows in one transaction.
+
+        Args:
+            rows (List[Dict[str, str]]): The rows to insert.
+            ignore_existing (bool): Skip rows whose word already exists instead of failing.
+
+        Returns:
+            int: The number of rows inserted.
+        """
+        verb = "INSERT OR IGNORE" if ignore_existing else "INSERT"
+        placeholders = ", ".join("?" for _ in range(len(self.COLUMNS) + 1))
+        with self._transaction() as (connection, changes):
+            for row in rows:
+                row = {header: row.get(header) or '' for header in self.headers}
+                key = self.normalize(row[self.key_column])
+                cursor = connection.execute(f"{verb} INTO vocabulary (word_key, {', '.join(self.COLUMNS)}) VALUES ({placeholders})",
+                                            [key] + [row[header] for header in self.headers])
+                if cursor.rowcount > 0:
+                    changes.append((key, row))
+        return len(changes)
+
+    def delete(self, word: str) -> bool:
+        key = self.normalize(word)
+        with self._transaction() as (connection, changes):
+            deleted = connection.execute("DELETE FROM vocabulary WHERE word_key = ?", (key,)).rowcount > 0
+            if deleted:
+                changes.append((key, None))
+        return deleted
+
+    def update(self, word: str, new_data: Dict[str, str]) -> bool:
+        return self.update_many({word: new_data}) > 0
+
+    def update_many(self, updates: Dict[str, Dict[str, str]]) -> int:
+        """Updates the rows of several words in one transaction.
+
+        Returns:
+            int: The number of words found (an update without known fields only checks that the word exists).
+        """
+        updated = 0
+        with self._transaction() as (connection, changes):
+            for word, new_data in updates.items():
+                updated += self._update_row(connection, changes, word, new_data)
+        return updated
+
+    def _update_row(self, connection: sqlite3.Connection, changes: List, word: str, new_data: Dict[str, str]) -> bool:
+        """Updates one row inside a transaction, recording the change for the listeners."""
+        key = self.normalize(word)
+        assignments = {column: new_data[header] for header, column in zip(self.headers, self.COLUMNS) if header in new_data}
+        if not assignments:
+            return connection.execute("SELECT 1 FROM vocabulary WHERE word_key = ?", (key,)).fetchone() is not None
+        if 'english_word' in assignments:
+            assignments['word_key'] = self.normalize(assignments['english_word'])
+        new_key = assignments.get('word_key', key)
+        set_clause = ", ".join(f"{column} = ?" for column in assignments)
+        cursor = connection.execute(f"UPDATE vocabulary SET {set_clause} WHERE word_key = ?",
+                                    list(assignments.values()) + [key])
+        if cursor.rowcount == 0:
+            return False
+        if new_key != key:
+            changes.append((key, None))
+        changes.append((new_key, self._select_row(connection, new_key)))
+        return True
+
+    def import_csv(self, csv_file: str) -> Tuple[int, int]:
+        """Imports the rows of a vocabulary CSV file. Words already in the database are skipped.
+
+        Args:
+            csv_file (str): The path to the CSV file to import.
+
+        Returns:
+            Tuple[int, int]: The number of rows imported and the number skipped as duplicates.
+        """
+        rows = CsvVocabularyStore(csv_file, self.headers).all()
+        imported = self.insert_many(rows, ignore_existing=True)
+        return imported, len(rows) - imported
+
+    def export_csv(self) -> str:
+        """Writes the database content to `<db_file>.export.csv` and returns its path."""
+        export_file = f"{self.db_file}.export.csv"
+        write_csv(export_file, self.headers, self.all())
+        return export_file
+
+
+def _temp_file_for(path: str) -> Tuple[int, str]:
+    """Creates a temporary file next to `path` (same filesystem, so `os.replace` is atomic).
+
+    The temporary file gets the permissions of `path` if it exists.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, temp_path = tempfile.mkstemp(prefix=f".{os.path.basename(path)}.", suffix='.tmp', dir=directory)
+    try:
+        os.chmod(temp_path, os.stat(path).st_mode & 0o777)
+    except FileNotFoundError:
+        os.chmod(temp_path, 0o644)
+    return fd, temp_path
+
+
+def write_temp_csv(path: str, headers: List[str], rows: List[Dict[str, str]]) -> str:
+    """Writes a header row and `rows` to a new temporary file next to `path` and returns its path."""
+    fd, temp_path = _temp_file_for(path)
+    try:
+        with os.fdopen(fd, 'w', newline='', encoding='utf-8') as file:
+            writer = csv.DictWriter(file, fieldnames=headers)
+            writer.writeheader()
+            writer.writerows(rows)
+            file.flush()
+            os.fsync(file.fileno())
+    except BaseException:
+        os.remove(temp_path)
+        raise
+    return temp_path
+
+
+def write_csv(path: str, headers: List[str], rows: List[Dict[str, str]]):
+    """Atomically replaces the CSV file at `path` with a header row and `rows`."""
+    temp_path = write_temp_csv(path, headers, rows)
+    try:
+        os.replace(temp_path, path)
+    except BaseException:
+        os.remove(temp_path)
+        raise
+
+
+def write_atomic(path: str, data: bytes):
+    """Atomically replaces the file at `path` with `data`."""
+    fd, temp_path = _temp_file_for(path)
+    try:
+        with os.fdopen(fd, 'wb') as file:
+            file.write(data)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise